@@ -0,0 +1,142 @@
+"""Passage des étudiants à l'année académique suivante.
+
+Les promotions de l'année suivante sont créées par ``INSERT ... SELECT``
+(mêmes noms, plus le niveau supérieur de chaque promotion LMD), puis les
+étudiants de chaque niveau passent au niveau suivant avec un seul ``UPDATE``
+par niveau, le tout dans une seule transaction. Les étudiants du dernier
+niveau et des promotions hors LMD restent dans leur promotion.
+"""
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from migrations import LMD_LEVELS
+
+
+@dataclass
+class RolloverPlan:
+    from_year: int
+    to_year: int
+    promotions_to_create: int = 0
+    moves: List[Tuple[str, str, int]] = field(default_factory=list)  # (niveau, niveau suivant, étudiants)
+    staying: int = 0  # dernier niveau et promotions hors LMD
+
+    @property
+    def students_to_move(self):
+        return sum(count for _, _, count in self.moves)
+
+    def summary(self):
+        lines = [
+            f"Passage {self.from_year} → {self.to_year}",
+            f"• {self.promotions_to_create} promotion(s) à créer pour {self.to_year}",
+        ]
+        lines += [f"• {level} → {next_level} : {count} étudiant(s)" for level, next_level, count in self.moves if count]
+        lines.append(f"• {self.students_to_move} étudiant(s) à déplacer, {self.staying} inchangé(s)")
+        return "\n".join(lines)
+
+
+def level_steps():
+    """Couples (niveau, niveau suivant) : Licence 3 → Master 1, Master 2 → Doctorat 1, etc."""
+    return list(zip(LMD_LEVELS, LMD_LEVELS[1:]))
+
+
+def _candidate_promotions():
+    """Promotions attendues l'année suivante : (requête, paramètres).
+
+    Mêmes noms que l'année de départ (pour les nouveaux inscrits) et, pour
+    chaque promotion LMD, celle du niveau supérieur dans le même département.
+    """
+    queries = ["SELECT p.name AS name, p.department_id AS department_id FROM promotions p WHERE p.year = %s"]
+    params = ["from_year"]
+    for level, next_level in level_steps():
+        queries.append(
+            "SELECT %s || SUBSTR(p.name, %s) AS name, p.department_id AS department_id "
+            "FROM promotions p WHERE p.year = %s AND p.name LIKE %s"
+        )
+        params += [next_level, len(level) + 1, "from_year", f"{level} - %"]
+    return "\nUNION\n".join(queries), params
+
+
+def _missing_promotions(from_year, to_year):
+    """Promotions attendues qui n'existent pas encore : (requête, paramètres)"""
+    candidates, params = _candidate_promotions()
+    query = f"""
+        SELECT c.name, c.department_id FROM ({candidates}) c
+        WHERE NOT EXISTS (
+            SELECT 1 FROM promotions n
+            WHERE n.year = %s AND n.name = c.name AND n.department_id = c.department_id
+        )
+    """
+    return query, [from_year if param == "from_year" else param for param in params] + [to_year]
+
+
+def latest_year(db):
+    """Année académique la plus récente (None s'il n'y a aucune promotion)"""
+    return db.execute_query("SELECT MAX(year) AS year FROM promotions")[0]['year']
+
+
+def preview_rollover(db, from_year=None):
+    """Simulation : ce que ferait ``run_rollover``, sans rien modifier"""
+    from_year = from_year or latest_year(db)
+    plan = RolloverPlan(from_year, from_year + 1)
+
+    query, params = _missing_promotions(plan.from_year, plan.to_year)
+    plan.promotions_to_create = db.execute_query(f"SELECT COUNT(*) AS n FROM ({query}) m", params)[0]['n']
+
+    # Effectifs par nom de promotion en une requête, répartis ensuite par niveau
+    counts = db.execute_query("""
+        SELECT p.name, COUNT(s.id) AS student_count
+        FROM promotions p JOIN students s ON s.promotion_id = p.id
+        WHERE p.year = %s
+        GROUP BY p.name
+    """, (from_year,))
+    by_level = dict.fromkeys(LMD_LEVELS, 0)
+    for row in counts:
+        level = next((level for level in LMD_LEVELS if row['name'].startswith(f"{level} - ")), None)
+        if level is None:
+            plan.staying += row['student_count']
+        else:
+            by_level[level] += row['student_count']
+
+    plan.moves = [(level, next_level, by_level[level]) for level, next_level in level_steps()]
+    plan.staying += by_level[LMD_LEVELS[-1]]
+    return plan
+
+
+def run_rollover(db, from_year=None):
+    """Crée les promotions de l'année suivante et y fait passer les étudiants.
+
+    Tout est fait dans une seule transaction ; retourne le RolloverPlan avec
+    les nombres réellement traités. À appeler hors du thread de l'interface.
+    """
+    from_year = from_year or latest_year(db)
+    plan = RolloverPlan(from_year, from_year + 1)
+
+    with db.transaction():
+        query, params = _missing_promotions(plan.from_year, plan.to_year)
+        plan.promotions_to_create = db.execute_query(
+            f"INSERT INTO promotions (name, year, department_id) SELECT name, %s, department_id FROM ({query}) m",
+            [plan.to_year] + params
+        )
+
+        # Un UPDATE par niveau : les promotions cibles (année suivante) ne sont
+        # jamais sources, l'ordre des niveaux est donc indifférent
+        for level, next_level in level_steps():
+            moved = db.execute_query("""
+                UPDATE students SET promotion_id = (
+                    SELECT n.id FROM promotions p
+                    JOIN promotions n ON n.department_id = p.department_id
+                        AND n.year = %s AND n.name = %s || SUBSTR(p.name, %s)
+                    WHERE p.id = students.promotion_id
+                ), updated_at = CURRENT_TIMESTAMP
+                WHERE promotion_id IN (SELECT id FROM promotions WHERE year = %s AND name LIKE %s)
+            """, (plan.to_year, next_level, len(level) + 1, plan.from_year, f"{level} - %"))
+            plan.moves.append((level, next_level, moved))
+
+        plan.staying = db.execute_query("""
+            SELECT COUNT(*) AS n FROM students s JOIN promotions p ON s.promotion_id = p.id
+            WHERE p.year = %s
+        """, (plan.from_year,))[0]['n']
+
+    print(f"✅ Passage {plan.from_year} → {plan.to_year} : {plan.students_to_move} étudiant(s) déplacé(s), "
+          f"{plan.promotions_to_create} promotion(s) créée(s)")
+    return plan
@@ -0,0 +1,236 @@
+"""Sauvegarde à chaud de la base SQLite et des photos des étudiants.
+
+    python backup.py                      # dans data/backups
+    python backup.py /media/cle/backups --pages 256
+
+Chaque sauvegarde est un dossier horodaté contenant la copie de la base et
+un manifeste (manifest.json). La base est copiée avec l'API de sauvegarde en
+ligne de sqlite3, quelques pages à la fois avec une courte pause entre deux
+pas : l'application reste utilisable pendant la copie. Les photos sont
+rangées par empreinte SHA-256 dans un magasin commun à toutes les
+sauvegardes (photos/) : une photo inchangée n'est jamais recopiée, et
+seules les photos nouvelles ou modifiées sont relues.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+DEFAULT_DESTINATION = os.path.join("data", "backups")
+PHOTOS_DIR = os.path.join("data", "images", "students")
+DATABASE_FILE = "student_manager.db"
+PHOTO_INDEX = "index.json"
+
+
+@dataclass
+class BackupReport:
+    path: str
+    database_pages: int = 0
+    photos_total: int = 0
+    photos_copied: int = 0
+    bytes_copied: int = 0
+    elapsed: float = 0.0
+
+    def summary(self):
+        return (
+            f"Sauvegarde : {self.path}\n"
+            f"• Base : {self.database_pages} page(s)\n"
+            f"• Photos : {self.photos_copied} copiée(s) sur {self.photos_total} "
+            f"({self.bytes_copied / 1024 / 1024:.1f} Mo)\n"
+            f"• Durée : {self.elapsed:.1f} s"
+        )
+
+
+def sqlite_path():
+    """Chemin de la base SQLite configurée (même variable que le pool de connexions)"""
+    return os.getenv("SQLITE_PATH", "./data/student_manager.db")
+
+
+class _BackupRestarted(Exception):
+    pass
+
+
+def backup_database(source_path, target_path, pages=1024, pause=0.01, progress=None, max_restarts=3):
+    """Copie la base avec l'API de sauvegarde en ligne, ``pages`` pages par pas.
+
+    Entre deux pas, la base est libre pour les autres connexions (``pause``
+    secondes). ``progress(restantes, total)`` est appelé après chaque pas.
+    Une écriture pendant la copie la fait recommencer : après
+    ``max_restarts`` reprises, le reste est copié en un seul pas (en mode WAL,
+    la lecture ne bloque pas les écritures). Retourne le nombre de pages.
+    """
+    copied = 0
+    restarts = 0
+    previous = None
+
+    def step(status, remaining, total):
+        nonlocal copied, restarts, previous
+        copied = total
+        if previous is not None and remaining > previous:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _BackupRestarted()
+        previous = remaining
+        if progress:
+            progress(remaining, total)
+        if remaining and pause:
+            time.sleep(pause)
+
+    source = sqlite3.connect(f"file:{os.path.abspath(source_path)}?mode=ro", uri=True)
+    target = sqlite3.connect(target_path)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=step)
+        except _BackupRestarted:
+            print("⚠️ Base modifiée pendant la copie : fin de la sauvegarde en un seul pas")
+            previous = None
+            source.backup(target, pages=-1, progress=step)
+    finally:
+        target.close()
+        source.close()
+    return copied
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backup_photos(photos_dir, store_dir, report):
+    """Copie les photos nouvelles ou modifiées dans le magasin par empreinte.
+
+    Retourne le manifeste {chemin relatif: empreinte}. L'index du magasin
+    garde (taille, date de modification, empreinte) de chaque fichier déjà
+    vu : un fichier inchangé n'est même pas relu.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    index_path = os.path.join(store_dir, PHOTO_INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as handle:
+            index = json.load(handle)
+
+    manifest = {}
+    for root, _, files in os.walk(photos_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, photos_dir).replace(os.sep, "/")
+            stat = os.stat(path)
+            known = index.get(relative)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                digest = known[2]
+            else:
+                digest = file_digest(path)
+                index[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+
+            extension = os.path.splitext(name)[1].lower()
+            stored = os.path.join(store_dir, digest[:2], digest + extension)
+            if not os.path.exists(stored):
+                os.makedirs(os.path.dirname(stored), exist_ok=True)
+                shutil.copy2(path, stored + ".tmp")
+                os.replace(stored + ".tmp", stored)
+                report.photos_copied += 1
+                report.bytes_copied += stat.st_size
+            manifest[relative] = digest + extension
+            report.photos_total += 1
+
+    # Oublier les fichiers supprimés depuis la dernière sauvegarde
+    index = {relative: entry for relative, entry in index.items() if relative in manifest}
+    with open(index_path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(index, handle)
+    os.replace(index_path + ".tmp", index_path)
+    return manifest
+
+
+def new_snapshot_dir(destination):
+    """Crée le dossier horodaté de la sauvegarde (suffixé si la seconde est déjà prise)"""
+    name = f"backup_{datetime.now():%Y%m%d_%H%M%S}"
+    for attempt in range(1, 100):
+        snapshot = os.path.join(destination, name if attempt == 1 else f"{name}_{attempt}")
+        try:
+            os.makedirs(snapshot)
+            return snapshot
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Trop de sauvegardes dans la même seconde : {name}")
+
+
+def create_backup(destination=DEFAULT_DESTINATION, database_path=None, photos_dir=PHOTOS_DIR,
+                  pages=1024, pause=0.01, progress=None, db_engine=None):
+    """Crée une sauvegarde horodatée dans ``destination`` et retourne un BackupReport.
+
+    Avec PostgreSQL, seules les photos sont sauvegardées (la base se
+    sauvegarde avec pg_dump).
+    """
+    started = time.perf_counter()
+    db_engine = (db_engine or os.getenv("DB_ENGINE", "sqlite")).lower()
+    snapshot = new_snapshot_dir(destination)
+    report = BackupReport(snapshot)
+
+    database_file = None
+    if db_engine == "postgresql":
+        print("⚠️ PostgreSQL : la base n'est pas copiée, utilisez pg_dump")
+    else:
+        database_file = DATABASE_FILE
+        target = os.path.join(snapshot, DATABASE_FILE)
+        report.database_pages = backup_database(
+            database_path or sqlite_path(), target + ".tmp", pages, pause, progress
+        )
+        os.replace(target + ".tmp", target)
+
+    photos = {}
+    if os.path.isdir(photos_dir):
+        photos = backup_photos(photos_dir, os.path.join(destination, "photos"), report)
+
+    report.elapsed = time.perf_counter() - started
+    manifest = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "database": database_file,
+        "database_pages": report.database_pages,
+        "photos_dir": photos_dir,
+        "photos": photos,
+    }
+    with open(os.path.join(snapshot, "manifest.json"), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, ensure_ascii=False)
+
+    print(f"✅ Sauvegarde créée : {snapshot} ({report.photos_copied}/{report.photos_total} photo(s) copiée(s))")
+    return report
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Sauvegarde à chaud de la base et des photos")
+    parser.add_argument("destination", nargs="?", default=DEFAULT_DESTINATION,
+                        help=f"dossier des sauvegardes (défaut : {DEFAULT_DESTINATION})")
+    parser.add_argument("--database", help="base SQLite à sauvegarder (défaut : SQLITE_PATH)")
+    parser.add_argument("--photos", default=PHOTOS_DIR, help=f"dossier des photos (défaut : {PHOTOS_DIR})")
+    parser.add_argument("--pages", type=int, default=1024, help="pages copiées par pas (défaut : 1024)")
+    parser.add_argument("--pause", type=float, default=0.01, help="pause entre deux pas, en secondes")
+    args = parser.parse_args(argv)
+
+    def show_progress(remaining, total):
+        print(f"\r📦 Base : {total - remaining}/{total} pages", end="" if remaining else "\n", flush=True)
+
+    try:
+        report = create_backup(args.destination, args.database, args.photos,
+                               args.pages, args.pause, show_progress)
+    except Exception as e:
+        print(f"❌ Erreur lors de la sauvegarde: {e}")
+        return 1
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
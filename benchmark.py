@@ -0,0 +1,405 @@
+"""Jeu de données synthétique et mesure des performances de bout en bout.
+
+    python benchmark.py                                # 10k, 100k et 1M étudiants
+    python benchmark.py --sizes 10000 --output bench.json
+
+Chaque taille est mesurée dans un processus séparé. Avec SQLite, chaque
+taille a sa propre base (data/benchmark/students_<taille>.db, réutilisée
+d'une exécution à l'autre) ; avec DB_ENGINE=postgresql, la base DB_NAME ne
+doit contenir que des étudiants de benchmark (matricules BENCH...). Les
+étudiants sont répartis sur les promotions de la structure initiale, avec
+des photos générées. L'interface tourne sur la plateforme Qt « offscreen »
+et les résultats sont écrits en JSON pour comparer les versions.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import chain
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+BENCHMARK_DIR = os.path.join("data", "benchmark")
+REGISTRATION_PREFIX = "BENCH"
+
+LAST_NAMES = [
+    "Mukendi", "Kabila", "Tshisekedi", "Mbuyi", "Kasongo", "Ilunga", "Kalala", "Mutombo",
+    "Ngoy", "Kabongo", "Lukusa", "Mulumba", "Tshibangu", "Banza", "Nkulu", "Mwamba",
+    "Kanku", "Mbala", "Lumbala", "Kazadi", "Makiese", "Nsimba", "Lutete", "Mavungu",
+]
+POSTNOMS = [
+    "Kalonji", "Mpoyi", "Kabeya", "Tshimanga", "Mukeba", "Ntumba", "Kapinga", "Bukasa",
+    "Muamba", "Kanyinda", "Nzuzi", "Luzolo", "Matondo", "Diambu", "Kiese", "Makengo",
+]
+FIRST_NAMES = [
+    "Jean", "Marie", "Joseph", "Grâce", "Patrick", "Esther", "Christian", "Rachel",
+    "Emmanuel", "Sarah", "Daniel", "Ruth", "Olivier", "Naomie", "Trésor", "Divine",
+    "Glodi", "Merveille", "Héritier", "Prisca", "Junior", "Gloire", "Fiston", "Exaucée",
+]
+COMMUNES = ["Lemba", "Limete", "Ngaliema", "Kintambo", "Matete", "Kalamu", "Bandalungwa", "Gombe"]
+PHOTO_COLORS = [(52, 101, 164), (78, 154, 6), (204, 0, 0), (117, 80, 123), (193, 125, 17), (46, 52, 54)]
+
+
+def timings(samples):
+    """Résumé des mesures en millisecondes"""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 2),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+# --- Génération du jeu de données -------------------------------------------
+
+def generate_photos(count, directory):
+    """Crée (une seule fois) ``count`` photos d'identité et retourne leurs chemins"""
+    from PIL import Image, ImageDraw
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for number in range(count):
+        path = os.path.join(directory, f"student_bench_{number:04d}.jpg")
+        if not os.path.exists(path):
+            color = PHOTO_COLORS[number % len(PHOTO_COLORS)]
+            image = Image.new("RGB", (300, 300), (236, 236, 236))
+            draw = ImageDraw.Draw(image)
+            draw.ellipse((95, 40, 205, 150), fill=color)
+            draw.rectangle((60, 170, 240, 300), fill=color)
+            image.save(path, quality=85)
+        paths.append(path)
+    return paths
+
+
+def generate_students(db, count, photos, batch_size=10_000, seed=42):
+    """Insère ``count`` étudiants répartis (inégalement) sur les promotions existantes"""
+    from migrations import bulk_insert
+    from reference_cache import get_reference_cache
+    from student_import import STUDENT_COLUMNS, normalize
+
+    promotions = [promotion['id'] for promotion in get_reference_cache(db).promotions()]
+    if not promotions:
+        raise RuntimeError("Aucune promotion dans la base : impossible de répartir les étudiants")
+
+    rng = random.Random(seed)
+    # Des promotions plus chargées que d'autres, comme dans la réalité
+    weights = [rng.uniform(0.2, 3.0) for _ in promotions]
+
+    for start in range(0, count, batch_size):
+        rows = []
+        for number in range(start, min(start + batch_size, count)):
+            last_name = rng.choice(LAST_NAMES)
+            first_name = rng.choice(FIRST_NAMES)
+            rows.append((
+                last_name, rng.choice(POSTNOMS), first_name,
+                f"{normalize(first_name)}.{normalize(last_name)}.{number}@unikin.ac.cd",
+                f"+2438{rng.randrange(10 ** 8):08d}",
+                f"{rng.randrange(1, 300)}, avenue {rng.choice(LAST_NAMES)}, {rng.choice(COMMUNES)}",
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                f"+2439{rng.randrange(10 ** 8):08d}",
+                f"{REGISTRATION_PREFIX}{number:07d}",
+                rng.choice(photos) if photos and rng.random() < 0.8 else None,
+                rng.choices(promotions, weights)[0],
+            ))
+        with db.transaction() as cursor:
+            bulk_insert(db, cursor, "students", STUDENT_COLUMNS, rows)
+        print(f"📦 {start + len(rows)}/{count} étudiants générés")
+
+
+def prepare_dataset(db, count, photo_count):
+    """Génère le jeu de données si nécessaire ; retourne la durée de génération en secondes"""
+    total = db.execute_query("SELECT COUNT(*) AS n FROM students")[0]['n']
+    generated = db.execute_query(
+        "SELECT COUNT(*) AS n FROM students WHERE registration_number LIKE %s", (REGISTRATION_PREFIX + "%",)
+    )[0]['n']
+    if total != generated:
+        raise RuntimeError(
+            f"La base contient {total - generated} étudiant(s) hors benchmark : utilisez une base dédiée"
+        )
+    if generated == count:
+        print(f"📦 Jeu de données de {count} étudiants réutilisé")
+        return None
+    if generated:
+        db.execute_query("DELETE FROM students WHERE registration_number LIKE %s", (REGISTRATION_PREFIX + "%",))
+
+    started = time.perf_counter()
+    photos = generate_photos(photo_count, os.path.join(BENCHMARK_DIR, "photos"))
+    generate_students(db, count, photos)
+    return round(time.perf_counter() - started, 2)
+
+
+# --- Mesures -----------------------------------------------------------------
+
+class Benchmark:
+    """Pilote la fenêtre principale hors écran et chronomètre ses opérations"""
+
+    def __init__(self, window, repeat=5, timeout_ms=600_000):
+        from PySide6.QtCore import QEventLoop, QTimer
+
+        self.window = window
+        self.repeat = repeat
+        self.results = {}
+        self.loop = QEventLoop()
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(timeout_ms)
+        self.timer.timeout.connect(self.loop.quit)
+        self.watched_model = None
+        self.error = None
+
+    def wait_for_page(self):
+        """Attend la prochaine page de la liste (chargée en arrière-plan)"""
+        model = self.window.model
+        # Une seule connexion par modèle (chaque rechargement crée un nouveau modèle)
+        if model is not self.watched_model:
+            model.page_loaded.connect(self.on_page_loaded)
+            model.load_failed.connect(self.on_load_failed)
+            self.watched_model = model
+        self.error = None
+        self.timer.start()
+        self.loop.exec()
+        self.timer.stop()
+        if self.error:
+            raise RuntimeError(self.error)
+
+    def on_page_loaded(self, count, has_more):
+        self.loop.quit()
+
+    def on_load_failed(self, error):
+        self.error = error
+        self.loop.quit()
+
+    def measure(self, name, action, setup=None, wait=True):
+        samples = []
+        for run in range(self.repeat):
+            if setup:
+                setup(run)
+            started = time.perf_counter()
+            action(run)
+            if wait:
+                self.wait_for_page()
+            samples.append((time.perf_counter() - started) * 1000)
+        self.results[name] = timings(samples)
+        print(f"⏱️ {name} : {self.results[name]['median_ms']} ms (médiane)")
+
+    def select(self, combo, run):
+        """Choisit un élément de la liste (hors « Tous ») différent à chaque passage"""
+        if combo.count() > 1:
+            combo.setCurrentIndex(1 + run % (combo.count() - 1))
+
+    def reset_filters(self, run=None):
+        window = self.window
+        for combo in (window.faculty_filter, window.department_filter, window.promotion_filter):
+            combo.blockSignals(True)
+            combo.setCurrentIndex(0)
+            combo.blockSignals(False)
+        window.search_edit.blockSignals(True)
+        window.search_edit.clear()
+        window.search_edit.blockSignals(False)
+        window.load_data()
+        self.wait_for_page()
+
+    def search(self, text):
+        # Sans passer par le minuteur de saisie : seule la requête est mesurée
+        self.window.search_edit.blockSignals(True)
+        self.window.search_edit.setText(text)
+        self.window.search_edit.blockSignals(False)
+        self.window.on_filter_changed()
+
+    def run_listing(self):
+        from PySide6.QtCore import QModelIndex
+
+        window = self.window
+        self.wait_for_page()  # premier chargement lancé par la fenêtre
+        self.measure("load_data", lambda run: window.load_data())
+        self.measure("refresh_data", lambda run: window.refresh_data())
+
+        self.measure("filter_faculty", lambda run: self.select(window.faculty_filter, run),
+                     setup=self.reset_filters)
+        self.measure("filter_department", lambda run: self.select(window.department_filter, run),
+                     setup=lambda run: (self.reset_filters(), self.select(window.faculty_filter, run),
+                                        self.wait_for_page()))
+        self.measure("filter_promotion", lambda run: self.select(window.promotion_filter, run),
+                     setup=self.reset_filters)
+        self.measure("scroll_next_page", lambda run: window.model.fetchMore(QModelIndex()),
+                     setup=self.reset_filters)
+
+        self.measure("search_name", lambda run: self.search(LAST_NAMES[run % len(LAST_NAMES)]),
+                     setup=self.reset_filters)
+        self.measure("search_registration", lambda run: self.search(f"{REGISTRATION_PREFIX}{run * 7919:07d}"),
+                     setup=self.reset_filters)
+        self.reset_filters()
+
+    def run_images(self):
+        from PySide6.QtCore import Qt
+        from image_utils import ImageUtils
+
+        window = self.window
+        model = window.model
+        window.students_table.resize(1200, 700)
+
+        def decorate(run):
+            for row in range(model.rowCount(None)):
+                model.data(model.index(row, 1), Qt.DecorationRole)
+
+        def details(run):
+            for student in model.students[:50]:
+                window.display_student_details(student)
+
+        self.measure("photo_column", decorate, wait=False)
+        self.measure("render_table", lambda run: window.students_table.viewport().grab(), wait=False)
+        self.measure("student_details_x50", details, wait=False)
+        photos = [student['photo_path'] for student in model.students if student['photo_path']][:50]
+        self.measure("load_image_x50", lambda run: [ImageUtils.load_image(path) for path in photos], wait=False)
+
+    def run_pdf(self, include_all=False):
+        db = self.window.db
+        reference = self.window.reference.load()
+        counts = {
+            row['promotion_id']: row['student_count']
+            for row in db.execute_query("SELECT promotion_id, student_count FROM enrollment_counters")
+        }
+        largest = max(reference.promotions(), key=lambda promotion: counts.get(promotion['id'], 0))
+        cases = [("generate_students_list_promotion", {"promotion_id": largest['id']})]
+        if include_all:
+            cases.append(("generate_students_list_all", {}))
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "liste.pdf")
+
+            def generate(filters):
+                # Même chemin que MainWindow.print_students_list
+                query, params = db.build_students_query(
+                    order_by="s.faculty_name, s.department_name, s.promotion_name, s.last_name, s.first_name",
+                    **filters
+                )
+                self.window.pdf_generator.generate_students_list(
+                    chain.from_iterable(db.stream_query(query, params)), output_path
+                )
+
+            for name, filters in cases:
+                self.measure(name, lambda run, filters=filters: generate(filters), wait=False)
+            self.results["generate_students_list_promotion"]["students"] = counts.get(largest['id'], 0)
+
+
+def run_size(count, photo_count, repeat, pdf_all):
+    """Exécuté dans le processus enfant : prépare les données et mesure une taille"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import __version__ as pyside_version
+    from PySide6.QtWidgets import QApplication
+    from database import Database
+    from query_profiler import get_profiler
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    db = Database()
+    generation_s = prepare_dataset(db, count, photo_count)
+
+    from ui_main_window import MainWindow
+
+    profiler = get_profiler()
+    profiler.reset()
+    window = MainWindow()
+    benchmark = Benchmark(window, repeat=repeat)
+    try:
+        benchmark.run_listing()
+        benchmark.run_images()
+        benchmark.run_pdf(include_all=pdf_all)
+    finally:
+        window.executor.shutdown()
+
+    return {
+        "students": count,
+        "engine": db.db_engine,
+        "generation_s": generation_s,
+        "timings": benchmark.results,
+        "top_queries": [
+            {
+                "fingerprint": stats.fingerprint,
+                "count": stats.count,
+                "total_ms": round(stats.total_ms, 2),
+                "average_ms": round(stats.average_ms, 3),
+                "p95_ms": round(stats.percentile_ms(95), 2),
+                "rows": stats.rows,
+            }
+            for stats in profiler.top(15)
+        ],
+        "pyside": pyside_version,
+        "qt_platform": app.platformName(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout de la gestion des étudiants")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="nombres d'étudiants à générer (défaut : 10000 100000 1000000)")
+    parser.add_argument("--photos", type=int, default=200, help="nombre de photos distinctes (défaut : 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="répétitions de chaque mesure (défaut : 5)")
+    parser.add_argument("--pdf-all", action="store_true", help="mesurer aussi le PDF de toute la liste")
+    parser.add_argument("--output", help="fichier JSON des résultats (défaut : sortie standard)")
+    parser.add_argument("--run", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        result = run_size(args.run, args.photos, args.repeat, args.pdf_all)
+        with open(args.result_file, "w", encoding="utf-8") as handle:
+            json.dump(result, handle)
+        return 0
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [],
+    }
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    for count in args.sizes:
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        if env.get("DB_ENGINE", "sqlite").lower() != "postgresql":
+            env["SQLITE_PATH"] = os.path.join(BENCHMARK_DIR, f"students_{count}.db")
+
+        with tempfile.TemporaryDirectory() as directory:
+            result_file = os.path.join(directory, "result.json")
+            command = [
+                sys.executable, os.path.abspath(__file__), "--run", str(count), "--result-file", result_file,
+                "--photos", str(args.photos), "--repeat", str(args.repeat),
+            ] + (["--pdf-all"] if args.pdf_all else [])
+            # Les messages de l'application vont sur la sortie d'erreur : la sortie standard reste du JSON
+            completed = subprocess.run(command, env=env, stdout=sys.stderr)
+            if completed.returncode != 0:
+                print(f"❌ Benchmark de {count} étudiants interrompu (code {completed.returncode})", file=sys.stderr)
+                report["results"].append({"students": count, "error": completed.returncode})
+                continue
+            with open(result_file, encoding="utf-8") as handle:
+                report["results"].append(json.load(handle))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,401 +1,798 @@
 import os
 import sqlite3
+import threading
+import queue
+import time
+import uuid
+from contextlib import contextmanager
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_batch
 from dotenv import load_dotenv
 import re
+from migrations import run_migrations, STUDENT_LISTING_INDEXES
+from query_profiler import get_profiler
 
 load_dotenv()
 
+# Profil de performance SQLite : pragma -> (variable .env, valeur par défaut).
+# WAL permet de lire (liste, impression, export) pendant qu'un autre
+# utilisateur écrit ; synchronous=NORMAL est sûr en WAL.
+SQLITE_PRAGMAS = {
+    "busy_timeout": ("SQLITE_BUSY_TIMEOUT", "5000"),    # ms d'attente si la base est verrouillée
+    "journal_mode": ("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": ("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": ("SQLITE_CACHE_SIZE", "-65536"),      # négatif : en Kio (64 Mio)
+    "mmap_size": ("SQLITE_MMAP_SIZE", "268435456"),     # 256 Mio
+    "temp_store": ("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+_PRAGMA_VALUE = re.compile(r"^-?\w+$")
+
+
+def sqlite_pragmas():
+    """Pragmas SQLite à appliquer, lus depuis l'environnement"""
+    pragmas = {}
+    for pragma, (variable, default) in SQLITE_PRAGMAS.items():
+        value = os.getenv(variable, default).strip()
+        if not _PRAGMA_VALUE.match(value):
+            raise ValueError(f"Valeur invalide pour {variable} : {value!r}")
+        pragmas[pragma] = value
+    return pragmas
+
+
+class ConnectionPool:
+    """Pool de connexions partagé par toute l'application.
+
+    Chaque thread qui emprunte une connexion la garde (affinité de thread)
+    tant qu'il ne l'a pas rendue autant de fois qu'il l'a empruntée : les
+    appels imbriqués réutilisent donc la même connexion.
+    """
+
+    def __init__(self, db_engine=None, size=None, timeout=None, read_only=False):
+        self.db_engine = (db_engine or os.getenv("DB_ENGINE", "sqlite")).lower()
+        self.size = max(1, int(size or os.getenv("DB_POOL_SIZE", "5")))
+        self.read_only = read_only
+        self.timeout = float(timeout or os.getenv("DB_POOL_TIMEOUT", "30"))
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.initialized = False
+        self.init_lock = threading.RLock()
+
+    def _open(self):
+        """Ouvre une nouvelle connexion physique"""
+        if self.db_engine == "postgresql":
+            host = os.getenv("DB_HOST", "localhost")
+            port = os.getenv("DB_PORT", "5432")
+            if self.read_only:
+                # Réplique de lecture si configurée, sinon le serveur principal
+                host = os.getenv("DB_READ_HOST") or host
+                port = os.getenv("DB_READ_PORT") or port
+            connection = psycopg2.connect(
+                host=host,
+                database=os.getenv("DB_NAME", "university_db"),
+                user=os.getenv("DB_USER", "postgres"),
+                password=os.getenv("DB_PASSWORD", ""),
+                port=port
+            )
+            # Configuration pour PostgreSQL
+            connection.autocommit = False
+            if self.read_only:
+                connection.set_session(readonly=True)
+        else:  # SQLite par défaut
+            db_path = os.getenv("SQLITE_PATH", "./data/student_manager.db")
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            # La connexion peut changer de thread, mais le pool garantit
+            # qu'un seul thread l'utilise à la fois
+            connection = sqlite3.connect(db_path, check_same_thread=False)
+            # Lignes brutes (tuples), converties en Row par Database
+            # Configuration pour SQLite
+            connection.isolation_level = None  # Auto-commit désactivé
+            for pragma, value in sqlite_pragmas().items():
+                connection.execute(f"PRAGMA {pragma} = {value}")
+        return connection
+
+    def _checkout(self):
+        """Sort une connexion libre du pool, en ouvre une ou attend qu'une se libère"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.size:
+                connection = self._open()
+                self._all.append(connection)
+                return connection
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(
+                f"Aucune connexion disponible dans le pool après {self.timeout:.0f}s "
+                f"(DB_POOL_SIZE={self.size})"
+            )
+
+    def _checkin(self, connection):
+        """Remet une connexion dans le pool"""
+        if self.db_engine == "postgresql" and connection.closed:
+            # Connexion perdue : on libère sa place dans le pool
+            with self._lock:
+                if connection in self._all:
+                    self._all.remove(connection)
+            return
+        self._idle.put(connection)
+
+    def acquire(self):
+        """Emprunte une connexion (celle du thread courant si elle existe déjà)"""
+        local = self._local
+        if getattr(local, "connection", None) is not None:
+            local.depth += 1
+            return local.connection
+
+        local.connection = self._checkout()
+        local.depth = 1
+        return local.connection
+
+    def release(self, connection):
+        """Rend une connexion empruntée par le thread courant"""
+        local = self._local
+        if getattr(local, "connection", None) is not connection:
+            raise RuntimeError("Cette connexion n'appartient pas au thread courant")
+        local.depth -= 1
+        if local.depth > 0:
+            return
+        local.connection = None
+        self._checkin(connection)
+
+    def in_transaction(self):
+        """Vrai si le thread courant est dans un bloc ``Database.transaction()``"""
+        return getattr(self._local, "transaction_depth", 0) > 0
+
+    def enter_transaction(self):
+        """Incrémente la profondeur de transaction du thread courant et la retourne"""
+        self._local.transaction_depth = getattr(self._local, "transaction_depth", 0) + 1
+        return self._local.transaction_depth
+
+    def exit_transaction(self):
+        self._local.transaction_depth -= 1
+
+    def acquire_dedicated(self):
+        """Emprunte une connexion réservée à un seul usage (ex. un curseur de streaming),
+        distincte de celle du thread courant"""
+        return self._checkout()
+
+    def release_dedicated(self, connection):
+        """Rend une connexion obtenue avec ``acquire_dedicated``"""
+        self._checkin(connection)
+
+    def close(self):
+        """Ferme toutes les connexions du pool"""
+        with self._lock:
+            connections, self._all = self._all, []
+        self._idle = queue.LifoQueue()
+        for connection in connections:
+            connection.close()
+        self.initialized = False
+
+
+# Types de requêtes
+READ = "read"
+WRITE = "write"
+WRITE_RETURNING = "write_returning"
+
+_READ_KEYWORDS = {"SELECT", "WITH", "PRAGMA", "EXPLAIN", "VALUES", "SHOW"}
+_LEADING_COMMENTS = re.compile(r"^\s*(?:(?:--[^\n]*\n|/\*.*?\*/)\s*)*", re.S)
+_DATA_CHANGE = re.compile(r"\b(INSERT|UPDATE|DELETE)\b", re.I)
+_RETURNING = re.compile(r"\bRETURNING\b", re.I)
+
+STATEMENT_CACHE_SIZE = 512
+_statement_cache = {}
+
+
+class Row(tuple):
+    """Ligne de résultat compacte : les valeurs sont dans un tuple et les noms
+    de colonnes dans un index partagé par toutes les lignes du même résultat.
+
+    Se lit comme un dictionnaire (``row['last_name']``, ``get``, ``keys``,
+    ``dict(row)``) ou par position (``row[0]``).
+    """
+
+    __slots__ = ()
+    _columns = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self._columns
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._columns, self)
+
+    def __repr__(self):
+        return f"Row({dict(self.items())!r})"
+
+
+_row_types = {}
+
+
+def row_type(columns):
+    """Classe de ligne pour ces colonnes, créée une seule fois par jeu de colonnes"""
+    cls = _row_types.get(columns)
+    if cls is None:
+        index = {name: position for position, name in enumerate(columns)}
+        cls = _row_types[columns] = type("Row", (Row,), {"__slots__": (), "_columns": columns, "_index": index})
+    return cls
+
+
+class CompiledStatement:
+    """Requête analysée une seule fois : texte adapté au moteur, type et colonnes"""
+
+    __slots__ = ("sql", "kind", "shape")
+
+    def __init__(self, query, db_engine):
+        # Conversion des paramètres pour SQLite
+        self.sql = query if db_engine == "postgresql" else query.replace('%s', '?')
+        self.kind = self.classify(query)
+        self.shape = None  # (colonnes, classe des lignes) du dernier résultat
+
+    @staticmethod
+    def classify(query):
+        """Détermine si la requête lit, écrit, ou écrit et renvoie des lignes"""
+        text = _LEADING_COMMENTS.sub("", query)
+        keyword = text.split(None, 1)[0].upper() if text.strip() else ""
+        if keyword in _READ_KEYWORDS and not (keyword == "WITH" and _DATA_CHANGE.search(text)):
+            return READ
+        if _RETURNING.search(text):
+            return WRITE_RETURNING
+        return WRITE
+
+    def describe(self, cursor):
+        """Classe des lignes du résultat.
+
+        Les noms de colonnes sont relus à chaque exécution : après un
+        changement de schéma (ex. ``SELECT *`` sur une vue recréée), les
+        nouveaux noms sont pris même si leur nombre n'a pas changé. Le couple
+        (colonnes, classe) est remplacé d'une seule affectation, sans état
+        intermédiaire visible par les autres threads.
+        """
+        columns = tuple(desc[0] for desc in cursor.description)
+        shape = self.shape
+        if shape is None or shape[0] != columns:
+            shape = self.shape = (columns, row_type(columns))
+        return shape[1]
+
+
+# Colonnes et source de la liste des étudiants : la projection student_listing
+# contient déjà les noms de promotion, département et faculté (migration 5)
+STUDENT_LISTING_COLUMNS = "s.*"
+STUDENT_LISTING_JOINS = "FROM student_listing s"
+
+# Colonnes de tri de la liste des étudiants ; la dernière (l'id) départage
+# les ex-æquo pour que la clé de pagination soit unique
+STUDENT_SORT_KEYS = {
+    "name": ("s.last_name", "s.first_name", "s.id"),
+    "registration_number": ("s.registration_number", "s.id"),
+    "id": ("s.id",),
+}
+
+_shared_pool = None
+_shared_read_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Retourne le pool de connexions partagé (créé au premier appel)"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ConnectionPool()
+        return _shared_pool
+
+
+def get_read_pool():
+    """Pool partagé des lectures routées (listes, impression, recherche).
+
+    Sur PostgreSQL : des connexions distinctes en session lecture seule, sur
+    DB_READ_HOST/DB_READ_PORT si définis (réplique) ou sur le serveur
+    principal. DB_READ_POOL_SIZE=0, ou SQLite (lectures déjà concurrentes en
+    mode WAL), utilisent le pool principal.
+    """
+    global _shared_read_pool
+    pool = get_pool()
+    with _shared_pool_lock:
+        if _shared_read_pool is None:
+            size = int(os.getenv("DB_READ_POOL_SIZE", "2"))
+            if pool.db_engine == "postgresql" and size > 0:
+                _shared_read_pool = ConnectionPool(pool.db_engine, size=size, read_only=True)
+            else:
+                _shared_read_pool = pool
+        return _shared_read_pool
+
+
 class Database:
-    def __init__(self):
-        self.connection = None
-        self.db_engine = os.getenv("DB_ENGINE", "sqlite").lower()
+    def __init__(self, pool=None, read_pool=None):
+        self.pool = pool or get_pool()
+        # Un pool fourni explicitement sert aussi aux lectures, sauf pool de lecture dédié
+        self.read_pool = read_pool or (self.pool if pool else get_read_pool())
+        self.db_engine = self.pool.db_engine
+        self.profiler = get_profiler()
         self.connect()
 
+    def pool_for(self, use_read_pool=False):
+        """Pool à utiliser pour une requête.
+
+        Le pool de lecture n'est pas utilisé dans un bloc ``transaction()`` :
+        le thread doit y relire ses propres écritures.
+        """
+        if use_read_pool and not self.pool.in_transaction():
+            return self.read_pool
+        return self.pool
+
     def get_param_style(self):
         """Retourne le style de paramètre selon le moteur de base de données"""
         return "%s" if self.db_engine == "postgresql" else "?"
 
-    def connect(self):
-        try:
-            if self.db_engine == "postgresql":
-                self.connection = psycopg2.connect(
-                    host=os.getenv("DB_HOST", "localhost"),
-                    database=os.getenv("DB_NAME", "university_db"),
-                    user=os.getenv("DB_USER", "postgres"),
-                    password=os.getenv("DB_PASSWORD", ""),
-                    port=os.getenv("DB_PORT", "5432")
-                )
-                # Configuration pour PostgreSQL
-                self.connection.autocommit = False
-            else:  # SQLite par défaut
-                db_path = os.getenv("SQLITE_PATH", "./data/student_manager.db")
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
-                self.connection = sqlite3.connect(db_path)
-                self.connection.row_factory = sqlite3.Row  # dict-like results
-                # Configuration pour SQLite
-                self.connection.isolation_level = None  # Auto-commit désactivé
-
-            self.create_tables()
-            self.insert_default_data()
-        except Exception as e:
-            print(f"❌ Erreur de connexion à la base de données: {e}")
-            raise
-
-    def create_tables(self):
-        cursor = None
+    @contextmanager
+    def connection(self):
+        """Emprunte une connexion au pool le temps d'un bloc ``with``"""
+        connection = self.pool.acquire()
         try:
-            cursor = self.connection.cursor()
-
-            # Différence SERIAL vs AUTOINCREMENT
-            auto_inc = "SERIAL PRIMARY KEY" if self.db_engine == "postgresql" else "INTEGER PRIMARY KEY AUTOINCREMENT"
-
-            # Création des tables
-            tables = [
-                f"""
-                CREATE TABLE IF NOT EXISTS faculties (
-                    id {auto_inc},
-                    name VARCHAR(100) NOT NULL UNIQUE,
-                    code VARCHAR(10) NOT NULL UNIQUE,
-                    description TEXT
-                )
-                """,
-                f"""
-                CREATE TABLE IF NOT EXISTS departments (
-                    id {auto_inc},
-                    name VARCHAR(100) NOT NULL,
-                    code VARCHAR(10) NOT NULL,
-                    faculty_id INTEGER REFERENCES faculties(id),
-                    UNIQUE(name, faculty_id)
-                )
-                """,
-                f"""
-                CREATE TABLE IF NOT EXISTS promotions (
-                    id {auto_inc},
-                    name VARCHAR(100) NOT NULL,
-                    year INTEGER NOT NULL,
-                    department_id INTEGER REFERENCES departments(id),
-                    UNIQUE(name, department_id, year)
-                )
-                """,
-                f"""
-                CREATE TABLE IF NOT EXISTS students (
-                    id {auto_inc},
-                    first_name VARCHAR(100) NOT NULL,
-                    last_name VARCHAR(100) NOT NULL,
-                    postnom VARCHAR(100) NOT NULL,
-                    email VARCHAR(150) UNIQUE,
-                    phone VARCHAR(20),
-                    address TEXT,
-                    emergency_contact VARCHAR(100),
-                    emergency_phone VARCHAR(20),
-                    registration_number VARCHAR(20) UNIQUE NOT NULL,
-                    photo_path VARCHAR(255),
-                    promotion_id INTEGER REFERENCES promotions(id),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            ]
-
-            for table_sql in tables:
-                cursor.execute(table_sql)
-
-            self.connection.commit()
-            
-        except Exception as e:
-            print(f"❌ Erreur lors de la création des tables: {e}")
-            if self.connection:
-                self.connection.rollback()
-            raise
+            yield connection
         finally:
-            if cursor:
+            self.pool.release(connection)
+
+    def connect(self):
+        """Prépare le schéma une seule fois par pool"""
+        if self.pool.initialized:
+            return
+        with self.pool.init_lock:
+            if self.pool.initialized:
+                return
+            try:
+                self.migrate()
+                self.pool.initialized = True
+                if self.db_engine != "postgresql":
+                    settings = ", ".join(f"{name}={value}" for name, value in self.sqlite_settings().items())
+                    print(f"⚙️ SQLite : {settings}")
+            except Exception as e:
+                print(f"❌ Erreur de connexion à la base de données: {e}")
+                raise
+
+    def migrate(self):
+        """Met le schéma à jour (une seule requête si aucune migration n'est en attente)"""
+        with self.connection() as connection:
+            run_migrations(self, connection)
+
+    def sqlite_settings(self):
+        """Valeurs effectives des pragmas du profil SQLite"""
+        with self.connection() as connection:
+            return {
+                pragma: connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+                for pragma in SQLITE_PRAGMAS
+            }
+
+    @staticmethod
+    def students_filter_clause(faculty_id=None, department_id=None, promotion_id=None):
+        """Conditions SQL des filtres de la liste (alias s), à ajouter après un WHERE"""
+        clause = ""
+        params = []
+
+        if faculty_id and faculty_id != -1:
+            clause += " AND s.faculty_id = %s"
+            params.append(faculty_id)
+
+        if department_id and department_id != -1:
+            clause += " AND s.department_id = %s"
+            params.append(department_id)
+
+        if promotion_id and promotion_id != -1:
+            clause += " AND s.promotion_id = %s"
+            params.append(promotion_id)
+
+        return clause, params
+
+    def _students_filter_query(self, faculty_id=None, department_id=None, promotion_id=None):
+        """Requête de la liste des étudiants avec les filtres, sans tri (-1 ou None = tous)"""
+        clause, params = self.students_filter_clause(faculty_id, department_id, promotion_id)
+        query = f"""
+            SELECT {STUDENT_LISTING_COLUMNS}
+            {STUDENT_LISTING_JOINS}
+            WHERE 1=1{clause}
+        """
+        return query, params
+
+    def build_students_query(self, faculty_id=None, department_id=None, promotion_id=None,
+                             order_by="s.last_name, s.first_name, s.id"):
+        """Construit la requête de la liste des étudiants selon les filtres (-1 ou None = tous)"""
+        query, params = self._students_filter_query(faculty_id, department_id, promotion_id)
+        query += f" ORDER BY {order_by}"
+        return query, params
+
+    def fetch_students_page(self, faculty_id=None, department_id=None, promotion_id=None,
+                            sort_key="name", descending=False, after=None, limit=200):
+        """Retourne la page suivante de la liste des étudiants (pagination par clé).
+
+        ``after`` est la clé de la dernière ligne déjà chargée (voir
+        ``students_page_key``) ou None pour la première page. Le coût ne dépend
+        que de ``limit`` : pas d'OFFSET, la recherche part de l'index de tri.
+        """
+        columns = STUDENT_SORT_KEYS[sort_key]
+        query, params = self._students_filter_query(faculty_id, department_id, promotion_id)
+
+        if after is not None:
+            placeholders = ", ".join("%s" for _ in columns)
+            query += f" AND ({', '.join(columns)}) {'<' if descending else '>'} ({placeholders})"
+            params.extend(after)
+
+        direction = " DESC" if descending else ""
+        query += " ORDER BY " + ", ".join(column + direction for column in columns)
+        query += " LIMIT %s"
+        params.append(limit)
+        return self.execute_query(query, params, use_read_pool=True)
+
+    @staticmethod
+    def students_page_key(student, sort_key="name"):
+        """Clé de pagination d'une ligne renvoyée par ``fetch_students_page``"""
+        return tuple(student[column.split(".", 1)[1]] for column in STUDENT_SORT_KEYS[sort_key])
+
+    def explain(self, query, params=None):
+        """Retourne le plan d'exécution d'une requête sous forme de lignes de texte"""
+        if self.db_engine == "postgresql":
+            prefix = "EXPLAIN "
+        else:
+            prefix = "EXPLAIN QUERY PLAN "
+            query = query.replace('%s', '?')
+
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(prefix + query, params or ())
+                # PostgreSQL : une colonne de texte ; SQLite : (id, parent, notused, detail)
+                return [row[-1] for row in cursor.fetchall()]
+            finally:
                 cursor.close()
+                if self.db_engine == "postgresql":
+                    connection.rollback()
+
+    def check_listing_indexes(self, faculty_id=None, department_id=None, promotion_id=None):
+        """Vérifie avec EXPLAIN que la liste filtrée passe par les index attendus.
+
+        Retourne (plan, index_manquants) : le plan brut et les index attendus
+        pour ces filtres qui n'y apparaissent pas.
+        """
+        expected = []
+        if promotion_id and promotion_id != -1:
+            expected = ["idx_student_listing_promotion"]
+        elif department_id and department_id != -1:
+            expected = ["idx_student_listing_department"]
+        elif faculty_id and faculty_id != -1:
+            expected = ["idx_student_listing_faculty"]
+
+        query, params = self.build_students_query(faculty_id, department_id, promotion_id)
+        plan = self.explain(query, params)
+        plan_text = "\n".join(plan)
+        missing = [name for name in expected if name in STUDENT_LISTING_INDEXES and name not in plan_text]
+        return plan, missing
+
+    def student_changes_version(self, use_read_pool=False):
+        """Position actuelle dans le journal des modifications d'étudiants.
+
+        SQLite : dernière version du journal (0 si vide) ; un seul écrivain à
+        la fois, les versions sont donc validées dans l'ordre. PostgreSQL :
+        une version (BIGSERIAL) est attribuée à l'insertion mais visible au
+        commit, une transaction peut donc valider la version 41 après la 42.
+        La position y est le plus ancien identifiant de transaction encore en
+        cours (xmin de l'instantané) : toutes les transactions antérieures
+        sont terminées.
+
+        Lue sur le pool de lecture avant une page qui y est lue aussi : une
+        réplique en retard donne une position plus ancienne, et
+        ``changes_since`` rattrapera la différence.
+        """
+        if self.db_engine == "postgresql":
+            query = "SELECT txid_snapshot_xmin(txid_current_snapshot()) AS version"
+        else:
+            query = "SELECT COALESCE(MAX(version), 0) AS version FROM student_changes"
+        return self.execute_query(query, use_read_pool=use_read_pool)[0]['version']
+
+    def changes_since(self, version, limit=500):
+        """Étudiants modifiés depuis ``version`` : (nouvelle_version, lignes, ids_supprimés).
 
-    def insert_default_data(self):
-        """Insère les données par défaut de l'UNIKIN si elles n'existent pas"""
+        ``version`` est une position de ``student_changes_version`` ou d'un
+        appel précédent. Sur PostgreSQL, les transactions à partir de cette
+        position sont relues : une transaction encore en cours lors d'un appel
+        est retrouvée au suivant, quel que soit l'ordre des commits (un
+        étudiant déjà transmis peut revenir, sans effet).
+
+        Les lignes sont lues dans student_listing (tenue à jour par triggers) ;
+        un étudiant absent de la projection est considéré comme supprimé.
+        Retourne None si plus de ``limit`` étudiants ont changé : il vaut
+        alors mieux tout recharger.
+        """
+        if self.db_engine == "postgresql":
+            # Position et modifications lues dans le même instantané
+            changes = self.execute_query("""
+                SELECT w.position, c.student_id
+                FROM (SELECT txid_snapshot_xmin(txid_current_snapshot()) AS position) w
+                LEFT JOIN (
+                    SELECT student_id FROM student_changes
+                    WHERE txid >= %s
+                    GROUP BY student_id
+                    LIMIT %s
+                ) c ON TRUE
+            """, (version, limit + 1))
+            new_version = changes[0]['position']
+            ids = [change['student_id'] for change in changes if change['student_id'] is not None]
+        else:
+            changes = self.execute_query("""
+                SELECT student_id, MAX(version) AS version FROM student_changes
+                WHERE version > %s
+                GROUP BY student_id
+                LIMIT %s
+            """, (version, limit + 1))
+            new_version = max((change['version'] for change in changes), default=version)
+            ids = [change['student_id'] for change in changes]
+
+        if len(ids) > limit:
+            return None
+        if not ids:
+            return new_version, [], []
+
+        rows = self.students_by_ids(ids)
+        found = {row['id'] for row in rows}
+        deleted = [student_id for student_id in ids if student_id not in found]
+        return new_version, rows, deleted
+
+    def students_by_ids(self, ids, chunk_size=500, use_read_pool=False):
+        """Lignes de student_listing des étudiants demandés (par lots de ``chunk_size`` ids)"""
+        rows = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = list(ids[start:start + chunk_size])
+            placeholders = ", ".join("%s" for _ in chunk)
+            rows += self.execute_query(
+                f"SELECT * FROM student_listing WHERE id IN ({placeholders})", chunk, use_read_pool=use_read_pool
+            )
+        return rows
+
+    def execute_for_ids(self, query, ids, params=(), chunk_size=500):
+        """Exécute une écriture ``... WHERE id IN ({ids})`` pour une liste d'ids.
+
+        Les ids sont passés par lots de ``chunk_size`` (limite du nombre de
+        paramètres), dans une seule transaction : un seul commit. Retourne le
+        nombre de lignes modifiées.
+        """
+        total = 0
+        with self.transaction():
+            for start in range(0, len(ids), chunk_size):
+                chunk = list(ids[start:start + chunk_size])
+                placeholders = ", ".join("%s" for _ in chunk)
+                total += self.execute_query(query.format(ids=placeholders), tuple(params) + tuple(chunk))
+        return total
+
+    def compile_statement(self, query):
+        """Retourne la version compilée (et mise en cache) d'une requête"""
+        key = (self.db_engine, query)
+        statement = _statement_cache.get(key)
+        if statement is None:
+            if len(_statement_cache) >= STATEMENT_CACHE_SIZE:
+                _statement_cache.clear()
+            statement = _statement_cache[key] = CompiledStatement(query, self.db_engine)
+        return statement
+
+    def execute_query(self, query, params=None, return_id=False, use_read_pool=False):
+        """Exécute une requête SQL avec gestion propre des transactions.
+
+        Dans un bloc ``transaction()``, les écritures ne sont validées qu'à la
+        fin du bloc ; sinon chaque écriture est validée immédiatement.
+        ``use_read_pool`` envoie une lecture sur le pool de lecture (voir
+        ``get_read_pool``) pour ne pas occuper les connexions des écritures.
+        """
+        statement = self.compile_statement(query)
+        started = time.perf_counter() if self.profiler.enabled else None
+        pool = self.pool_for(use_read_pool)
+        connection = pool.acquire()
+        autocommit = not pool.in_transaction()
         cursor = None
         try:
-            cursor = self.connection.cursor()
-            
-            # Vérifier si des données existent déjà
-            cursor.execute("SELECT COUNT(*) FROM faculties")
-            faculty_count = cursor.fetchone()[0]
-            
-            if faculty_count == 0:
-                print("📦 Insertion des données par défaut de l'UNIKIN...")
-                
-                # Insertion des facultés de l'UNIKIN
-                faculties = [
-                    ("Droit", "DROIT", "Faculté de Droit"),
-                    ("Sciences Économiques et de Gestion", "ECO-GEST", "Faculté des Sciences Économiques et de Gestion"),
-                    ("Lettres et Sciences Humaines", "LET-SH", "Faculté des Lettres et Sciences Humaines"),
-                    ("Médecine", "MED", "Faculté de Médecine"),
-                    ("Médecine Vétérinaire", "MED-VET", "Faculté de Médecine Vétérinaire"),
-                    ("Pétrole, Gaz et Énergies Nouvelles", "PÉTROLE", "Faculté de Pétrole, Gaz et Énergies Nouvelles"),
-                    ("Polytechnique", "POLY", "Faculté Polytechnique"),
-                    ("Psychologie et Sciences de l'Éducation", "PSY-EDU", "Faculté de Psychologie et des Sciences de l'Éducation"),
-                    ("Sciences", "SCI", "Faculté des Sciences"),
-                    ("Sciences Agronomiques", "AGRO", "Faculté des Sciences Agronomiques"),
-                    ("Sciences Pharmaceutiques", "PHARMA", "Faculté des Sciences Pharmaceutiques"),
-                    ("Sciences Sociales, Administratives et Politiques", "SOCIO", "Faculté des Sciences Sociales, Administratives et Politiques"),
-                    ("Médecine Dentaire", "MED-DENT", "Faculté de Médecine Dentaire")
-                ]
-                
-                faculty_ids = {}
-                param_style = self.get_param_style()
-                
-                for name, code, description in faculties:
-                    query = f"INSERT INTO faculties (name, code, description) VALUES ({param_style}, {param_style}, {param_style})"
-                    if self.db_engine == "postgresql":
-                        query += " RETURNING id"
-                    
-                    cursor.execute(query, (name, code, description))
-                    
-                    if self.db_engine == "postgresql":
-                        faculty_id = cursor.fetchone()[0]
-                    else:
-                        faculty_id = cursor.lastrowid
-                    faculty_ids[name] = faculty_id
-                
-                # Insertion des départements
-                departments = [
-                    # Droit
-                    ("Droit privé et judiciaire", "D-PRIV", "Droit"),
-                    ("Droit pénal et criminologie", "D-PENAL", "Droit"),
-                    ("Droit international public", "D-INT", "Droit"),
-                    ("Droits de l'Homme", "D-DH", "Droit"),
-                    ("Droit économique et social", "D-ECO", "Droit"),
-                    ("Droit public interne", "D-PUB", "Droit"),
-                    ("Droit de l'environnement", "D-ENV", "Droit"),
-                    
-                    # Sciences Économiques et de Gestion
-                    ("Économie politique", "ECO-POL", "Sciences Économiques et de Gestion"),
-                    ("Gestion des entreprises", "GEST-ENT", "Sciences Économiques et de Gestion"),
-                    ("Sciences commerciales et financières", "SCI-COM", "Sciences Économiques et de Gestion"),
-                    ("Informatique de Gestion et Anglais des Affaires (IGAF)", "IGAF", "Sciences Économiques et de Gestion"),
-                    ("Gestion et Anglais de Affaires (GAF)", "GAF", "Sciences Économiques et de Gestion"),
-                    
-                    # Lettres et Sciences Humaines
-                    ("Lettres", "LETTRES", "Lettres et Sciences Humaines"),
-                    ("Langues", "LANGUES", "Lettres et Sciences Humaines"),
-                    ("Histoire", "HIST", "Lettres et Sciences Humaines"),
-                    ("Philosophie", "PHILO", "Lettres et Sciences Humaines"),
-                    ("Anglais et Informatique des Affaires (AIA)", "AIA", "Lettres et Sciences Humaines"),
-                    
-                    # Médecine
-                    ("Médecine générale", "MED-G", "Médecine"),
-                    ("Chirurgie", "CHIR", "Médecine"),
-                    ("Pédiatrie", "PED", "Médecine"),
-                    ("Gynécologie-obstétrique", "GYN-OBS", "Médecine"),
-                    ("Médecine interne", "MED-INT", "Médecine"),
-                    ("Biologie clinique", "BIO-CLIN", "Médecine"),
-                    
-                    # Médecine Vétérinaire
-                    ("Santé animale", "SANTE-ANIM", "Médecine Vétérinaire"),
-                    ("Production animale", "PROD-ANIM", "Médecine Vétérinaire"),
-                    ("Pathologie vétérinaire", "PATHO-VET", "Médecine Vétérinaire"),
-                    
-                    # Pétrole, Gaz et Énergies Nouvelles
-                    ("Ingénierie pétrolière", "ING-PET", "Pétrole, Gaz et Énergies Nouvelles"),
-                    ("Gaz et énergies renouvelables", "GAZ-ENER", "Pétrole, Gaz et Énergies Nouvelles"),
-                    ("Gestion des ressources énergétiques", "GEST-ENER", "Pétrole, Gaz et Énergies Nouvelles"),
-                    
-                    # Polytechnique
-                    ("Génie civil", "GC", "Polytechnique"),
-                    ("Génie électrique", "GE", "Polytechnique"),
-                    ("Génie mécanique", "GM", "Polytechnique"),
-                    ("Génie informatique et technologique", "GI", "Polytechnique"),
-                    
-                    # Psychologie et Sciences de l'Éducation
-                    ("Psychologie clinique", "PSY-CLIN", "Psychologie et Sciences de l'Éducation"),
-                    ("Sciences de l'éducation", "SCI-EDU", "Psychologie et Sciences de l'Éducation"),
-                    ("Gestion des entreprises et organisation du travail", "GEST-ORG", "Psychologie et Sciences de l'Éducation"),
-                    
-                    # Sciences
-                    ("Mathématiques, Statistique et Informatique", "MSI", "Sciences"),
-                    ("Physique et Technologie", "PHY-TECH", "Sciences"),
-                    ("Chimie et Industries", "CHIM-IND", "Sciences"),
-                    ("Sciences de la Vie et Environnement", "SVE", "Sciences"),
-                    ("Géosciences (Géologie et Géographie)", "GEO", "Sciences"),
-                    ("Sciences et Gestion de l'Environnement", "SGE", "Sciences"),
-                    
-                    # Sciences Agronomiques
-                    ("Phytotechnie", "PHYTO", "Sciences Agronomiques"),
-                    ("Zootechnie", "ZOO", "Sciences Agronomiques"),
-                    ("Économie agricole", "ECO-AGRI", "Sciences Agronomiques"),
-                    ("Agroécologie", "AGRO-ECO", "Sciences Agronomiques"),
-                    ("Gestion des ressources naturelles", "GEST-RN", "Sciences Agronomiques"),
-                    
-                    # Sciences Pharmaceutiques
-                    ("Pharmacie clinique", "PHAR-CLIN", "Sciences Pharmaceutiques"),
-                    ("Pharmacologie", "PHARMA", "Sciences Pharmaceutiques"),
-                    ("Chimie pharmaceutique", "CHIM-PHAR", "Sciences Pharmaceutiques"),
-                    
-                    # Sciences Sociales, Administratives et Politiques
-                    ("Sociologie", "SOCIO", "Sciences Sociales, Administratives et Politiques"),
-                    ("Anthropologie", "ANTHRO", "Sciences Sociales, Administratives et Politiques"),
-                    ("Administration publique", "ADM-PUB", "Sciences Sociales, Administratives et Politiques"),
-                    ("Sciences politiques", "SCI-POL", "Sciences Sociales, Administratives et Politiques"),
-                    
-                    # Médecine Dentaire
-                    ("Odontologie conservatrice", "ODON-CONS", "Médecine Dentaire"),
-                    ("Chirurgie buccale", "CHIR-BUC", "Médecine Dentaire"),
-                    ("Orthodontie", "ORTHO", "Médecine Dentaire")
-                ]
-                
-                department_ids = {}
-                for name, code, faculty_name in departments:
-                    faculty_id = faculty_ids[faculty_name]
-                    query = f"INSERT INTO departments (name, code, faculty_id) VALUES ({param_style}, {param_style}, {param_style})"
-                    if self.db_engine == "postgresql":
-                        query += " RETURNING id"
-                    
-                    cursor.execute(query, (name, code, faculty_id))
-                    
+            cursor = connection.cursor()
+            cursor.execute(statement.sql, params or ())
+
+            # Pour les requêtes de lecture, retourner les résultats
+            if statement.kind == READ:
+                rows = cursor.fetchall()
+                result = list(map(statement.describe(cursor), rows))
+                row_count = len(rows)
+
+            # INSERT/UPDATE ... RETURNING : lire les lignes avant le commit
+            elif statement.kind == WRITE_RETURNING:
+                rows = cursor.fetchall()
+                make_row = statement.describe(cursor)
+                if autocommit:
+                    connection.commit()
+                if return_id:
+                    result = rows[0][0] if rows else None
+                else:
+                    result = list(map(make_row, rows))
+                row_count = len(rows)
+
+            else:
+                # Commit pour les autres types de requêtes
+                if autocommit:
+                    connection.commit()
+                row_count = cursor.rowcount
+
+                # Pour les INSERT avec retour d'ID
+                if return_id:
                     if self.db_engine == "postgresql":
-                        department_id = cursor.fetchone()[0]
+                        cursor.execute("SELECT LASTVAL()")
+                        result = cursor.fetchone()[0]
                     else:
-                        department_id = cursor.lastrowid
-                    department_ids[name] = department_id
-                
-                # Insertion des promotions LMD pour l'année en cours
-                from datetime import datetime
-                current_year = datetime.now().year
-                
-                for department_name in department_ids:
-                    department_id = department_ids[department_name]
-                    
-                    # Niveaux LMD
-                    lmd_levels = [
-                        "Licence 1", "Licence 2", "Licence 3",
-                        "Master 1", "Master 2", 
-                        "Doctorat 1", "Doctorat 2", "Doctorat 3"
-                    ]
-                    
-                    for level in lmd_levels:
-                        query = f"INSERT INTO promotions (name, year, department_id) VALUES ({param_style}, {param_style}, {param_style})"
-                        cursor.execute(query, (f"{level} - {department_name}", current_year, department_id))
-                
-                self.connection.commit()
-                print("✅ Données par défaut de l'UNIKIN insérées avec succès!")
+                        result = cursor.lastrowid
+                else:
+                    # Pour UPDATE/DELETE, retourner le nombre de lignes affectées
+                    result = cursor.rowcount
             
         except Exception as e:
-            print(f"❌ Erreur lors de l'insertion des données par défaut: {e}")
-            if self.connection:
-                self.connection.rollback()
+            # Rollback en cas d'erreur (dans une transaction, c'est elle qui annule)
+            if autocommit:
+                connection.rollback()
+            print(f"❌ Erreur lors de l'exécution de la requête: {e}")
+            print(f"📋 Requête: {statement.sql}")
+            print(f"🔧 Paramètres: {params}")
+            raise
         finally:
+            # Toujours fermer le curseur et rendre la connexion au pool
             if cursor:
                 cursor.close()
+            if (self.db_engine == "postgresql" and not connection.closed
+                    and (pool is not self.pool or (autocommit and statement.kind == READ))):
+                # Termine la transaction de lecture (hors bloc transaction()) :
+                # pas de session inactive en transaction
+                connection.rollback()
+            pool.release(connection)
 
-    def execute_query(self, query, params=None, return_id=False):
-        """Exécute une requête SQL avec gestion propre des transactions"""
-        cursor = None
-        try:
-            # Conversion des paramètres pour SQLite
-            if self.db_engine != "postgresql":
-                query = query.replace('%s', '?')
-            
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
+        if started is not None:
+            self.profile(statement, params, (time.perf_counter() - started) * 1000, row_count)
+        return result
 
-            # Pour les requêtes SELECT, retourner les résultats
-            if query.strip().upper().startswith("SELECT"):
-                rows = cursor.fetchall()
-                if self.db_engine == "postgresql":
-                    columns = [desc[0] for desc in cursor.description]
-                    result = [dict(zip(columns, row)) for row in rows]
-                else:
-                    result = [dict(row) for row in rows]
-                return result
+    def profile(self, statement, params, elapsed_ms, row_count):
+        """Transmet une exécution au profileur et journalise les requêtes lentes"""
+        row_count = max(row_count, 0)
+        if not self.profiler.record(statement.sql, params, elapsed_ms, row_count):
+            return
+        plan = None
+        # Hors transaction seulement : sur PostgreSQL, explain() termine la transaction
+        if self.profiler.explain and statement.kind == READ and not self.pool.in_transaction():
+            try:
+                plan = self.explain(statement.sql, params)
+            except Exception as e:
+                plan = [f"EXPLAIN impossible : {e}"]
+        self.profiler.record_slow(statement.sql, params, elapsed_ms, row_count, plan)
 
-            # Commit pour les autres types de requêtes
-            self.connection.commit()
+    def stream_query(self, query, params=None, batch_size=1000, use_read_pool=False):
+        """Exécute une requête de lecture et produit ses lignes par lots.
 
-            # Pour les INSERT avec retour d'ID
-            if return_id:
-                if self.db_engine == "postgresql":
-                    cursor.execute("SELECT LASTVAL()")
-                    result = cursor.fetchone()[0]
-                else:
-                    result = cursor.lastrowid
-                return result
+        PostgreSQL utilise un curseur nommé (côté serveur) et SQLite itère sur
+        le curseur : seul le lot courant est en mémoire. La requête utilise sa
+        propre connexion, libérée à la fin de l'itération.
+        """
+        statement = self.compile_statement(query)
+        pool = self.pool_for(use_read_pool)
+        connection = pool.acquire_dedicated()
+        cursor = None
+        try:
+            if self.db_engine == "postgresql":
+                cursor = connection.cursor(name=f"stream_{uuid.uuid4().hex}")
+                cursor.itersize = batch_size
+            else:
+                cursor = connection.cursor()
+            cursor.execute(statement.sql, params or ())
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield list(map(statement.describe(cursor), rows))
 
-            # Pour UPDATE/DELETE, retourner le nombre de lignes affectées
-            return cursor.rowcount
-            
         except Exception as e:
-            # Rollback en cas d'erreur
-            if self.connection:
-                self.connection.rollback()
             print(f"❌ Erreur lors de l'exécution de la requête: {e}")
-            print(f"📋 Requête: {query}")
+            print(f"📋 Requête: {statement.sql}")
             print(f"🔧 Paramètres: {params}")
             raise
         finally:
-            # Toujours fermer le curseur
             if cursor:
                 cursor.close()
+            if self.db_engine == "postgresql" and not connection.closed:
+                # Termine la transaction de lecture ouverte par le curseur nommé
+                connection.rollback()
+            pool.release_dedicated(connection)
 
-    def execute_query_with_transaction(self, query, params=None, return_id=False):
-        """Version alternative avec gestion explicite des transactions"""
+    @contextmanager
+    def transaction(self):
+        """Regroupe plusieurs écritures dans une seule transaction (un seul commit).
+
+        Le bloc reçoit un curseur sur la connexion du thread courant ; les
+        appels à ``execute_query`` et ``executemany`` faits dans le bloc en font
+        partie. Tout est validé à la sortie du bloc, ou annulé si une exception
+        s'en échappe. Un bloc imbriqué crée un point de sauvegarde : son échec
+        n'annule que ses propres écritures.
+        """
+        connection = self.pool.acquire()
+        depth = None
         cursor = None
+        begun = False
         try:
-            # Début de transaction explicite pour SQLite
-            if self.db_engine != "postgresql":
-                self.connection.execute("BEGIN TRANSACTION")
-            
-            # Conversion des paramètres pour SQLite
-            if self.db_engine != "postgresql":
-                query = query.replace('%s', '?')
-            
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-
-            # Pour les requêtes SELECT, retourner les résultats
-            if query.strip().upper().startswith("SELECT"):
-                rows = cursor.fetchall()
-                if self.db_engine == "postgresql":
-                    columns = [desc[0] for desc in cursor.description]
-                    result = [dict(zip(columns, row)) for row in rows]
-                else:
-                    result = [dict(row) for row in rows]
-                return result
-
-            # Commit de la transaction
-            self.connection.commit()
+            # Chaque étape n'est défaite par le finally que si elle a eu lieu
+            # (ex. cursor() échoue sur une connexion PostgreSQL fermée)
+            depth = self.pool.enter_transaction()
+            savepoint = f"transaction_{depth}"
+            cursor = connection.cursor()
+            if depth > 1:
+                cursor.execute(f"SAVEPOINT {savepoint}")
+            elif self.db_engine != "postgresql" and not connection.in_transaction:
+                # SQLite est en auto-commit : transaction explicite, verrou
+                # d'écriture pris dès le début pour éviter les conflits
+                cursor.execute("BEGIN IMMEDIATE")
+            begun = True
 
-            # Pour les INSERT avec retour d'ID
-            if return_id:
-                if self.db_engine == "postgresql":
-                    cursor.execute("SELECT LASTVAL()")
-                    result = cursor.fetchone()[0]
-                else:
-                    result = cursor.lastrowid
-                return result
+            yield cursor
 
-            return cursor.rowcount
-            
-        except Exception as e:
-            # Rollback en cas d'erreur
-            if self.connection:
-                self.connection.rollback()
-            print(f"❌ Erreur lors de l'exécution de la requête: {e}")
+            if depth > 1:
+                cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+            else:
+                connection.commit()
+        except BaseException:
+            if begun and depth > 1:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+            elif begun:
+                connection.rollback()
             raise
         finally:
-            if cursor:
+            if cursor is not None:
                 cursor.close()
+            if depth is not None:
+                self.pool.exit_transaction()
+            self.pool.release(connection)
 
-    def close(self):
-        """Ferme la connexion à la base de données"""
-        if self.connection:
+    def executemany(self, query, params_seq, page_size=1000):
+        """Exécute une requête d'écriture pour chaque jeu de paramètres, en une transaction"""
+        statement = self.compile_statement(query)
+        with self.transaction() as cursor:
             try:
-                self.connection.close()
-                print("✅ Connexion à la base de données fermée")
+                if self.db_engine == "postgresql":
+                    # Regroupe les requêtes par pages : un aller-retour par page
+                    execute_batch(cursor, statement.sql, params_seq, page_size=page_size)
+                else:
+                    cursor.executemany(statement.sql, params_seq)
             except Exception as e:
-                print(f"❌ Erreur lors de la fermeture de la connexion: {e}")
+                print(f"❌ Erreur lors de l'exécution de la requête: {e}")
+                print(f"📋 Requête: {statement.sql}")
+                raise
 
-    def __del__(self):
-        """Destructeur pour fermer la connexion"""
-        self.close()
+    def close(self):
+        """Ferme les connexions du pool (à appeler une seule fois, à la fermeture de l'application)"""
+        try:
+            self.pool.close()
+            if self.read_pool is not self.pool:
+                self.read_pool.close()
+            print("✅ Connexion à la base de données fermée")
+        except Exception as e:
+            print(f"❌ Erreur lors de la fermeture de la connexion: {e}")
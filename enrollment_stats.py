@@ -0,0 +1,54 @@
+"""Effectifs par faculté, département, promotion et année académique.
+
+Les nombres viennent de la table ``enrollment_counters`` (une ligne par
+promotion, tenue à jour par triggers, voir la migration 6) et la hiérarchie
+du cache de référence : le calcul dépend du nombre de promotions, pas du
+nombre d'étudiants.
+"""
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from reference_cache import get_reference_cache
+
+
+@dataclass
+class EnrollmentStatistics:
+    total: int = 0
+    by_faculty: List[Tuple[str, int]] = field(default_factory=list)
+    by_department: List[Tuple[str, str, int]] = field(default_factory=list)
+    by_promotion: List[Tuple[str, str, str, int, int]] = field(default_factory=list)
+    by_year: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def enrollment_statistics(db, reference=None):
+    """Retourne les effectifs regroupés (une seule requête sur enrollment_counters)"""
+    data = (reference or get_reference_cache(db)).load()
+    counts = {
+        row['promotion_id']: row['student_count']
+        for row in db.execute_query(
+            "SELECT promotion_id, student_count FROM enrollment_counters", use_read_pool=True
+        )
+    }
+
+    stats = EnrollmentStatistics()
+    faculty_counts = {}
+    department_counts = {}
+    year_counts = {}
+    for promotion in data.promotions():
+        count = counts.get(promotion['id'], 0)
+        stats.total += count
+        faculty_counts[promotion['faculty_id']] = faculty_counts.get(promotion['faculty_id'], 0) + count
+        department_counts[promotion['department_id']] = department_counts.get(promotion['department_id'], 0) + count
+        year_counts[promotion['year']] = year_counts.get(promotion['year'], 0) + count
+        stats.by_promotion.append((
+            promotion['faculty_name'], promotion['department_name'],
+            promotion['name'], promotion['year'], count
+        ))
+
+    stats.by_faculty = [(faculty['name'], faculty_counts.get(faculty['id'], 0)) for faculty in data.faculties()]
+    stats.by_department = sorted(
+        (department['faculty_name'], department['name'], department_counts.get(department['id'], 0))
+        for department in data.departments()
+    )
+    stats.by_year = sorted(year_counts.items(), reverse=True)
+    return stats
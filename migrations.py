@@ -0,0 +1,794 @@
+"""Migrations versionnées du schéma de la base de données.
+
+Chaque migration est appliquée une seule fois, dans sa propre transaction,
+et enregistrée dans la table ``schema_version``. Pour faire évoluer le
+schéma (nouvelle table, colonne ou index), ajouter une fonction et
+l'inscrire à la fin de ``MIGRATIONS`` avec le numéro suivant.
+"""
+import re
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+# Niveaux LMD
+LMD_LEVELS = [
+    "Licence 1", "Licence 2", "Licence 3",
+    "Master 1", "Master 2",
+    "Doctorat 1", "Doctorat 2", "Doctorat 3"
+]
+
+# Matricule attribué : MAT{année}-{id de la faculté sur 3 chiffres}-{numéro d'ordre sur 5 chiffres}
+# (ex. MAT2025-002-00001). Champs de largeur fixe séparés par des tirets : la
+# lecture n'est jamais ambiguë, et les matricules saisis avant (ex.
+# MAT202509001, année et mois d'inscription) ne peuvent pas y ressembler.
+REGISTRATION_PATTERN = re.compile(r"^MAT(\d{4})-(\d{3})-(\d{5})$")
+
+
+def registration_key(registration_number):
+    """(année, faculté, numéro) d'un matricule au format attribué, sinon None"""
+    match = REGISTRATION_PATTERN.match(registration_number or "")
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+
+def bulk_insert(db, cursor, table, columns, rows, page_size=1000):
+    """Insère plusieurs lignes en un minimum d'allers-retours"""
+    column_list = ", ".join(columns)
+    if db.db_engine == "postgresql":
+        # Une requête INSERT multi-lignes par page au lieu d'une par ligne
+        execute_values(cursor, f"INSERT INTO {table} ({column_list}) VALUES %s", rows, page_size=page_size)
+    else:
+        placeholders = ", ".join("?" for _ in columns)
+        cursor.executemany(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})", rows)
+
+
+def create_base_tables(db, cursor):
+    """Tables facultés, départements, promotions et étudiants"""
+    # Différence SERIAL vs AUTOINCREMENT
+    auto_inc = "SERIAL PRIMARY KEY" if db.db_engine == "postgresql" else "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    # Création des tables
+    tables = [
+        f"""
+        CREATE TABLE IF NOT EXISTS faculties (
+            id {auto_inc},
+            name VARCHAR(100) NOT NULL UNIQUE,
+            code VARCHAR(10) NOT NULL UNIQUE,
+            description TEXT
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS departments (
+            id {auto_inc},
+            name VARCHAR(100) NOT NULL,
+            code VARCHAR(10) NOT NULL,
+            faculty_id INTEGER REFERENCES faculties(id),
+            UNIQUE(name, faculty_id)
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS promotions (
+            id {auto_inc},
+            name VARCHAR(100) NOT NULL,
+            year INTEGER NOT NULL,
+            department_id INTEGER REFERENCES departments(id),
+            UNIQUE(name, department_id, year)
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS students (
+            id {auto_inc},
+            first_name VARCHAR(100) NOT NULL,
+            last_name VARCHAR(100) NOT NULL,
+            postnom VARCHAR(100) NOT NULL,
+            email VARCHAR(150) UNIQUE,
+            phone VARCHAR(20),
+            address TEXT,
+            emergency_contact VARCHAR(100),
+            emergency_phone VARCHAR(20),
+            registration_number VARCHAR(20) UNIQUE NOT NULL,
+            photo_path VARCHAR(255),
+            promotion_id INTEGER REFERENCES promotions(id),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    ]
+
+    for table_sql in tables:
+        cursor.execute(table_sql)
+
+
+def insert_default_data(db, cursor):
+    """Insère les données par défaut de l'UNIKIN si elles n'existent pas"""
+    # Vérifier si des données existent déjà
+    cursor.execute("SELECT COUNT(*) FROM faculties")
+    faculty_count = cursor.fetchone()[0]
+
+    if faculty_count == 0:
+        print("📦 Insertion des données par défaut de l'UNIKIN...")
+
+        # Insertion des facultés de l'UNIKIN
+        faculties = [
+            ("Droit", "DROIT", "Faculté de Droit"),
+            ("Sciences Économiques et de Gestion", "ECO-GEST", "Faculté des Sciences Économiques et de Gestion"),
+            ("Lettres et Sciences Humaines", "LET-SH", "Faculté des Lettres et Sciences Humaines"),
+            ("Médecine", "MED", "Faculté de Médecine"),
+            ("Médecine Vétérinaire", "MED-VET", "Faculté de Médecine Vétérinaire"),
+            ("Pétrole, Gaz et Énergies Nouvelles", "PÉTROLE", "Faculté de Pétrole, Gaz et Énergies Nouvelles"),
+            ("Polytechnique", "POLY", "Faculté Polytechnique"),
+            ("Psychologie et Sciences de l'Éducation", "PSY-EDU", "Faculté de Psychologie et des Sciences de l'Éducation"),
+            ("Sciences", "SCI", "Faculté des Sciences"),
+            ("Sciences Agronomiques", "AGRO", "Faculté des Sciences Agronomiques"),
+            ("Sciences Pharmaceutiques", "PHARMA", "Faculté des Sciences Pharmaceutiques"),
+            ("Sciences Sociales, Administratives et Politiques", "SOCIO", "Faculté des Sciences Sociales, Administratives et Politiques"),
+            ("Médecine Dentaire", "MED-DENT", "Faculté de Médecine Dentaire")
+        ]
+
+        bulk_insert(db, cursor, "faculties", ("name", "code", "description"), faculties)
+
+        # Une seule requête pour récupérer les identifiants générés
+        cursor.execute("SELECT id, name FROM faculties")
+        faculty_ids = {name: faculty_id for faculty_id, name in cursor.fetchall()}
+
+        # Insertion des départements
+        departments = [
+            # Droit
+            ("Droit privé et judiciaire", "D-PRIV", "Droit"),
+            ("Droit pénal et criminologie", "D-PENAL", "Droit"),
+            ("Droit international public", "D-INT", "Droit"),
+            ("Droits de l'Homme", "D-DH", "Droit"),
+            ("Droit économique et social", "D-ECO", "Droit"),
+            ("Droit public interne", "D-PUB", "Droit"),
+            ("Droit de l'environnement", "D-ENV", "Droit"),
+
+            # Sciences Économiques et de Gestion
+            ("Économie politique", "ECO-POL", "Sciences Économiques et de Gestion"),
+            ("Gestion des entreprises", "GEST-ENT", "Sciences Économiques et de Gestion"),
+            ("Sciences commerciales et financières", "SCI-COM", "Sciences Économiques et de Gestion"),
+            ("Informatique de Gestion et Anglais des Affaires (IGAF)", "IGAF", "Sciences Économiques et de Gestion"),
+            ("Gestion et Anglais de Affaires (GAF)", "GAF", "Sciences Économiques et de Gestion"),
+
+            # Lettres et Sciences Humaines
+            ("Lettres", "LETTRES", "Lettres et Sciences Humaines"),
+            ("Langues", "LANGUES", "Lettres et Sciences Humaines"),
+            ("Histoire", "HIST", "Lettres et Sciences Humaines"),
+            ("Philosophie", "PHILO", "Lettres et Sciences Humaines"),
+            ("Anglais et Informatique des Affaires (AIA)", "AIA", "Lettres et Sciences Humaines"),
+
+            # Médecine
+            ("Médecine générale", "MED-G", "Médecine"),
+            ("Chirurgie", "CHIR", "Médecine"),
+            ("Pédiatrie", "PED", "Médecine"),
+            ("Gynécologie-obstétrique", "GYN-OBS", "Médecine"),
+            ("Médecine interne", "MED-INT", "Médecine"),
+            ("Biologie clinique", "BIO-CLIN", "Médecine"),
+
+            # Médecine Vétérinaire
+            ("Santé animale", "SANTE-ANIM", "Médecine Vétérinaire"),
+            ("Production animale", "PROD-ANIM", "Médecine Vétérinaire"),
+            ("Pathologie vétérinaire", "PATHO-VET", "Médecine Vétérinaire"),
+
+            # Pétrole, Gaz et Énergies Nouvelles
+            ("Ingénierie pétrolière", "ING-PET", "Pétrole, Gaz et Énergies Nouvelles"),
+            ("Gaz et énergies renouvelables", "GAZ-ENER", "Pétrole, Gaz et Énergies Nouvelles"),
+            ("Gestion des ressources énergétiques", "GEST-ENER", "Pétrole, Gaz et Énergies Nouvelles"),
+
+            # Polytechnique
+            ("Génie civil", "GC", "Polytechnique"),
+            ("Génie électrique", "GE", "Polytechnique"),
+            ("Génie mécanique", "GM", "Polytechnique"),
+            ("Génie informatique et technologique", "GI", "Polytechnique"),
+
+            # Psychologie et Sciences de l'Éducation
+            ("Psychologie clinique", "PSY-CLIN", "Psychologie et Sciences de l'Éducation"),
+            ("Sciences de l'éducation", "SCI-EDU", "Psychologie et Sciences de l'Éducation"),
+            ("Gestion des entreprises et organisation du travail", "GEST-ORG", "Psychologie et Sciences de l'Éducation"),
+
+            # Sciences
+            ("Mathématiques, Statistique et Informatique", "MSI", "Sciences"),
+            ("Physique et Technologie", "PHY-TECH", "Sciences"),
+            ("Chimie et Industries", "CHIM-IND", "Sciences"),
+            ("Sciences de la Vie et Environnement", "SVE", "Sciences"),
+            ("Géosciences (Géologie et Géographie)", "GEO", "Sciences"),
+            ("Sciences et Gestion de l'Environnement", "SGE", "Sciences"),
+
+            # Sciences Agronomiques
+            ("Phytotechnie", "PHYTO", "Sciences Agronomiques"),
+            ("Zootechnie", "ZOO", "Sciences Agronomiques"),
+            ("Économie agricole", "ECO-AGRI", "Sciences Agronomiques"),
+            ("Agroécologie", "AGRO-ECO", "Sciences Agronomiques"),
+            ("Gestion des ressources naturelles", "GEST-RN", "Sciences Agronomiques"),
+
+            # Sciences Pharmaceutiques
+            ("Pharmacie clinique", "PHAR-CLIN", "Sciences Pharmaceutiques"),
+            ("Pharmacologie", "PHARMA", "Sciences Pharmaceutiques"),
+            ("Chimie pharmaceutique", "CHIM-PHAR", "Sciences Pharmaceutiques"),
+
+            # Sciences Sociales, Administratives et Politiques
+            ("Sociologie", "SOCIO", "Sciences Sociales, Administratives et Politiques"),
+            ("Anthropologie", "ANTHRO", "Sciences Sociales, Administratives et Politiques"),
+            ("Administration publique", "ADM-PUB", "Sciences Sociales, Administratives et Politiques"),
+            ("Sciences politiques", "SCI-POL", "Sciences Sociales, Administratives et Politiques"),
+
+            # Médecine Dentaire
+            ("Odontologie conservatrice", "ODON-CONS", "Médecine Dentaire"),
+            ("Chirurgie buccale", "CHIR-BUC", "Médecine Dentaire"),
+            ("Orthodontie", "ORTHO", "Médecine Dentaire")
+        ]
+
+        bulk_insert(
+            db, cursor, "departments", ("name", "code", "faculty_id"),
+            [(name, code, faculty_ids[faculty_name]) for name, code, faculty_name in departments]
+        )
+
+        cursor.execute("SELECT id, name, faculty_id FROM departments")
+        department_ids = {(name, faculty_id): department_id for department_id, name, faculty_id in cursor.fetchall()}
+
+        # Insertion des promotions LMD pour l'année en cours
+        current_year = datetime.now().year
+        promotions = [
+            (f"{level} - {name}", current_year, department_ids[(name, faculty_ids[faculty_name])])
+            for name, code, faculty_name in departments
+            for level in LMD_LEVELS
+        ]
+        bulk_insert(db, cursor, "promotions", ("name", "year", "department_id"), promotions)
+
+        print("✅ Données par défaut de l'UNIKIN insérées avec succès!")
+
+
+# Index secondaires de la liste des étudiants (clés étrangères des jointures
+# et clé de tri) ; le même DDL fonctionne sur SQLite et PostgreSQL.
+# Depuis student_listing (migration 5), la liste ne lit plus ces tables :
+# idx_students_name est supprimé par la migration 11. Les index des clés
+# étrangères restent : passage d'année (UPDATE/JOIN par promotion_id et
+# department_id) et vérification des clés étrangères à la suppression d'une
+# promotion, d'un département ou d'une faculté (PostgreSQL ne les indexe pas).
+LISTING_INDEXES = {
+    "idx_students_promotion_id": "students (promotion_id)",
+    "idx_promotions_department_id": "promotions (department_id)",
+    "idx_departments_faculty_id": "departments (faculty_id)",
+    "idx_students_name": "students (last_name, first_name, id)",
+}
+
+
+def create_listing_indexes(db, cursor):
+    """Index des jointures et du tri de la liste des étudiants"""
+    for name, definition in LISTING_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+# Colonnes indexées pour la recherche d'étudiants
+SEARCH_COLUMNS = ("last_name", "postnom", "first_name", "registration_number", "email")
+
+# Expression indexée par pg_trgm (doit être identique dans les requêtes de search.py)
+PG_SEARCH_EXPRESSION = ("lower(s.last_name || ' ' || s.postnom || ' ' || s.first_name || ' ' "
+                        "|| s.registration_number || ' ' || coalesce(s.email, ''))")
+
+# Lettres accentuées et leur forme sans accent (recherche insensible aux
+# accents sur PostgreSQL, comme FTS5 avec remove_diacritics sur SQLite).
+# translate() est IMMUTABLE : l'expression peut être indexée, sans dépendre
+# de l'extension unaccent.
+SEARCH_ACCENTS = "àáâãäåçèéêëìíîïñòóôõöùúûüýÿ"
+SEARCH_UNACCENTED = "aaaaaaceeeeiiiinooooouuuuyy"
+PG_FOLDED_SEARCH_EXPRESSION = f"translate({PG_SEARCH_EXPRESSION}, '{SEARCH_ACCENTS}', '{SEARCH_UNACCENTED}')"
+
+
+def create_search_index(db, cursor):
+    """Index de recherche : table FTS5 synchronisée par triggers (SQLite), trigrammes (PostgreSQL)"""
+    if db.db_engine == "postgresql":
+        # pg_trgm peut être absent ou nécessiter des droits : la recherche
+        # fonctionne alors sans index (voir search.py)
+        cursor.execute("SAVEPOINT search_index")
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            expression = PG_SEARCH_EXPRESSION.replace("s.", "")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_students_search_trgm ON students "
+                f"USING gin (({expression}) gin_trgm_ops)"
+            )
+            cursor.execute("RELEASE SAVEPOINT search_index")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT search_index")
+            print(f"⚠️ Extension pg_trgm indisponible, recherche sans index : {e}")
+        return
+
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+    statements = [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+            {columns},
+            content='students', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO students_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+        # Indexer les étudiants déjà présents
+        "INSERT INTO students_fts (students_fts) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        cursor.execute(statement)
+
+
+# Projection dénormalisée de la liste des étudiants : une ligne par étudiant
+# avec sa promotion, son département et sa faculté, pour lire la liste, la
+# recherche et les impressions sans jointure
+STUDENT_LISTING_SELECT = """
+    SELECT s.id, s.first_name, s.last_name, s.postnom, s.email, s.phone, s.address,
+           s.emergency_contact, s.emergency_phone, s.registration_number, s.photo_path,
+           s.promotion_id, s.created_at, s.updated_at,
+           p.name AS promotion_name, p.year AS promotion_year,
+           p.department_id, d.name AS department_name,
+           d.faculty_id, f.name AS faculty_name
+    FROM students s
+    JOIN promotions p ON s.promotion_id = p.id
+    JOIN departments d ON p.department_id = d.id
+    JOIN faculties f ON d.faculty_id = f.id
+"""
+
+STUDENT_LISTING_INDEXES = {
+    "idx_student_listing_name": "student_listing (last_name, first_name, id)",
+    "idx_student_listing_registration": "student_listing (registration_number, id)",
+    "idx_student_listing_faculty": "student_listing (faculty_id, last_name, first_name, id)",
+    "idx_student_listing_department": "student_listing (department_id, last_name, first_name, id)",
+    "idx_student_listing_promotion": "student_listing (promotion_id, last_name, first_name, id)",
+}
+
+
+def create_student_listing(db, cursor):
+    """Projection student_listing : table tenue à jour ligne par ligne par triggers.
+
+    Une écriture sur un étudiant ne touche que sa ligne ; renommer une
+    promotion, un département ou une faculté ne recalcule que ses étudiants.
+    """
+    listing_insert = "INSERT INTO student_listing " + STUDENT_LISTING_SELECT
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS student_listing (
+            id INTEGER PRIMARY KEY,
+            first_name VARCHAR(100) NOT NULL,
+            last_name VARCHAR(100) NOT NULL,
+            postnom VARCHAR(100) NOT NULL,
+            email VARCHAR(150),
+            phone VARCHAR(20),
+            address TEXT,
+            emergency_contact VARCHAR(100),
+            emergency_phone VARCHAR(20),
+            registration_number VARCHAR(20) NOT NULL,
+            photo_path VARCHAR(255),
+            promotion_id INTEGER,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            promotion_name VARCHAR(100),
+            promotion_year INTEGER,
+            department_id INTEGER,
+            department_name VARCHAR(100),
+            faculty_id INTEGER,
+            faculty_name VARCHAR(100)
+        )
+    """)
+    for name, definition in STUDENT_LISTING_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+    if db.db_engine == "postgresql":
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            expression = PG_SEARCH_EXPRESSION.replace("s.", "")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_student_listing_search_trgm ON student_listing "
+                f"USING gin (({expression}) gin_trgm_ops)"
+            )
+
+        # Étudiants
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION student_listing_student() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM student_listing WHERE id = OLD.id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    {listing_insert} WHERE s.id = NEW.id;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS student_listing_student ON students")
+        cursor.execute("""
+            CREATE TRIGGER student_listing_student AFTER INSERT OR UPDATE OR DELETE ON students
+            FOR EACH ROW EXECUTE FUNCTION student_listing_student()
+        """)
+
+        # Promotions, départements et facultés : recalculer les étudiants concernés
+        for table, column, alias, updated in (("promotions", "promotion_id", "p", "name, year, department_id"),
+                                              ("departments", "department_id", "d", "name, faculty_id"),
+                                              ("faculties", "faculty_id", "f", "name")):
+            cursor.execute(f"""
+                CREATE OR REPLACE FUNCTION student_listing_{table}() RETURNS trigger AS $$
+                BEGIN
+                    DELETE FROM student_listing WHERE {column} = OLD.id;
+                    IF TG_OP = 'UPDATE' THEN
+                        {listing_insert} WHERE {alias}.id = NEW.id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+            """)
+            cursor.execute(f"DROP TRIGGER IF EXISTS student_listing_{table} ON {table}")
+            cursor.execute(f"""
+                CREATE TRIGGER student_listing_{table} AFTER UPDATE OF {updated} OR DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION student_listing_{table}()
+            """)
+    else:
+        statements = [
+            # Étudiants
+            f"""
+            CREATE TRIGGER IF NOT EXISTS student_listing_student_insert AFTER INSERT ON students BEGIN
+                {listing_insert} WHERE s.id = new.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS student_listing_student_update AFTER UPDATE ON students BEGIN
+                DELETE FROM student_listing WHERE id = old.id;
+                {listing_insert} WHERE s.id = new.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS student_listing_student_delete AFTER DELETE ON students BEGIN
+                DELETE FROM student_listing WHERE id = old.id;
+            END
+            """,
+            # Promotions, départements et facultés : recalculer les étudiants concernés
+            f"""
+            CREATE TRIGGER IF NOT EXISTS student_listing_promotion_update
+            AFTER UPDATE OF name, year, department_id ON promotions BEGIN
+                DELETE FROM student_listing WHERE promotion_id = old.id;
+                {listing_insert} WHERE p.id = new.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS student_listing_promotion_delete AFTER DELETE ON promotions BEGIN
+                DELETE FROM student_listing WHERE promotion_id = old.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS student_listing_department_update
+            AFTER UPDATE OF name, faculty_id ON departments BEGIN
+                DELETE FROM student_listing WHERE department_id = old.id;
+                {listing_insert} WHERE d.id = new.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS student_listing_department_delete AFTER DELETE ON departments BEGIN
+                DELETE FROM student_listing WHERE department_id = old.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS student_listing_faculty_update AFTER UPDATE OF name ON faculties BEGIN
+                DELETE FROM student_listing WHERE faculty_id = old.id;
+                {listing_insert} WHERE f.id = new.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS student_listing_faculty_delete AFTER DELETE ON faculties BEGIN
+                DELETE FROM student_listing WHERE faculty_id = old.id;
+            END
+            """,
+        ]
+        for statement in statements:
+            cursor.execute(statement)
+
+    # Remplir avec les étudiants déjà présents
+    cursor.execute("DELETE FROM student_listing")
+    cursor.execute(listing_insert)
+
+
+def create_enrollment_counters(db, cursor):
+    """Nombre d'étudiants par promotion, tenu à jour par triggers sur students"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS enrollment_counters (
+            promotion_id INTEGER PRIMARY KEY,
+            student_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    if db.db_engine == "postgresql":
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION enrollment_counters_update() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.promotion_id IS NOT NULL THEN
+                    UPDATE enrollment_counters SET student_count = student_count - 1
+                    WHERE promotion_id = OLD.promotion_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.promotion_id IS NOT NULL THEN
+                    INSERT INTO enrollment_counters (promotion_id, student_count) VALUES (NEW.promotion_id, 1)
+                    ON CONFLICT (promotion_id) DO UPDATE
+                    SET student_count = enrollment_counters.student_count + 1;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS enrollment_counters_insert_delete ON students")
+        cursor.execute("""
+            CREATE TRIGGER enrollment_counters_insert_delete AFTER INSERT OR DELETE ON students
+            FOR EACH ROW EXECUTE FUNCTION enrollment_counters_update()
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS enrollment_counters_move ON students")
+        cursor.execute("""
+            CREATE TRIGGER enrollment_counters_move AFTER UPDATE OF promotion_id ON students
+            FOR EACH ROW WHEN (OLD.promotion_id IS DISTINCT FROM NEW.promotion_id)
+            EXECUTE FUNCTION enrollment_counters_update()
+        """)
+    else:
+        increment = """
+            INSERT INTO enrollment_counters (promotion_id, student_count) VALUES (new.promotion_id, 1)
+            ON CONFLICT (promotion_id) DO UPDATE SET student_count = student_count + 1;
+        """
+        decrement = """
+            UPDATE enrollment_counters SET student_count = student_count - 1
+            WHERE promotion_id = old.promotion_id;
+        """
+        statements = [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS enrollment_counters_insert AFTER INSERT ON students
+            WHEN new.promotion_id IS NOT NULL BEGIN {increment} END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS enrollment_counters_delete AFTER DELETE ON students
+            WHEN old.promotion_id IS NOT NULL BEGIN {decrement} END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS enrollment_counters_move_out AFTER UPDATE OF promotion_id ON students
+            WHEN old.promotion_id IS NOT new.promotion_id AND old.promotion_id IS NOT NULL BEGIN {decrement} END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS enrollment_counters_move_in AFTER UPDATE OF promotion_id ON students
+            WHEN old.promotion_id IS NOT new.promotion_id AND new.promotion_id IS NOT NULL BEGIN {increment} END
+            """,
+        ]
+        for statement in statements:
+            cursor.execute(statement)
+
+    # Compter les étudiants déjà présents
+    cursor.execute("DELETE FROM enrollment_counters")
+    cursor.execute("""
+        INSERT INTO enrollment_counters (promotion_id, student_count)
+        SELECT promotion_id, COUNT(*) FROM students
+        WHERE promotion_id IS NOT NULL
+        GROUP BY promotion_id
+    """)
+
+
+def create_student_changes(db, cursor):
+    """Journal des modifications d'étudiants (versions croissantes), alimenté par triggers"""
+    version_column = "BIGSERIAL PRIMARY KEY" if db.db_engine == "postgresql" else "INTEGER PRIMARY KEY AUTOINCREMENT"
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS student_changes (
+            version {version_column},
+            student_id INTEGER NOT NULL,
+            operation CHAR(1) NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    if db.db_engine == "postgresql":
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION student_changes_log() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO student_changes (student_id, operation) VALUES (OLD.id, 'D');
+                ELSE
+                    INSERT INTO student_changes (student_id, operation) VALUES (NEW.id, left(TG_OP, 1));
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS student_changes_log ON students")
+        cursor.execute("""
+            CREATE TRIGGER student_changes_log AFTER INSERT OR UPDATE OR DELETE ON students
+            FOR EACH ROW EXECUTE FUNCTION student_changes_log()
+        """)
+        return
+
+    for event, operation, row in (("INSERT", "I", "new"), ("UPDATE", "U", "new"), ("DELETE", "D", "old")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS student_changes_{event.lower()} AFTER {event} ON students BEGIN
+                INSERT INTO student_changes (student_id, operation) VALUES ({row}.id, '{operation}');
+            END
+        """)
+
+
+# Format lu par la migration 8 telle qu'elle a été livrée : MAT{année}{faculté sur
+# 2 chiffres}{numéro}. Les bases déjà passées par cette migration gardent ces
+# séquences ; la migration 13 les reconstruit au format attribué.
+LEGACY_REGISTRATION_PATTERN = re.compile(r"^MAT(\d{4})(\d{2})(\d+)$")
+
+
+def create_registration_sequences(db, cursor):
+    """Dernier numéro d'ordre des matricules attribué par année et par faculté"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS registration_sequences (
+            year INTEGER NOT NULL,
+            faculty_id INTEGER NOT NULL,
+            last_value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (year, faculty_id)
+        )
+    """)
+
+    # Reprendre après les matricules déjà saisis au format MAT{année}{faculté}{numéro}
+    last_values = {}
+    cursor.execute("SELECT registration_number FROM students")
+    while True:
+        rows = cursor.fetchmany(1000)
+        if not rows:
+            break
+        for (registration_number,) in rows:
+            match = LEGACY_REGISTRATION_PATTERN.match(registration_number or "")
+            if match:
+                key = (int(match.group(1)), int(match.group(2)))
+                last_values[key] = max(last_values.get(key, 0), int(match.group(3)))
+
+    cursor.execute("DELETE FROM registration_sequences")
+    if last_values:
+        bulk_insert(db, cursor, "registration_sequences", ("year", "faculty_id", "last_value"),
+                    [(year, faculty_id, value) for (year, faculty_id), value in sorted(last_values.items())])
+
+
+def convert_student_listing_view(db, cursor):
+    """PostgreSQL : remplace l'ancienne vue matérialisée student_listing par la table à triggers"""
+    if db.db_engine != "postgresql":
+        return
+    cursor.execute("SELECT 1 FROM pg_matviews WHERE matviewname = 'student_listing'")
+    if cursor.fetchone():
+        cursor.execute("DROP MATERIALIZED VIEW student_listing")
+        create_student_listing(db, cursor)
+
+
+def add_student_changes_txid(db, cursor):
+    """PostgreSQL : transaction de chaque modification, pour relire le journal dans l'ordre des commits"""
+    if db.db_engine != "postgresql":
+        return
+    cursor.execute(
+        "ALTER TABLE student_changes ADD COLUMN IF NOT EXISTS txid BIGINT NOT NULL DEFAULT txid_current()"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_student_changes_txid ON student_changes (txid)")
+
+
+def drop_students_name_index(db, cursor):
+    """Supprime l'index de tri sur students : la liste est triée par idx_student_listing_name"""
+    cursor.execute("DROP INDEX IF EXISTS idx_students_name")
+
+
+def fold_search_index_accents(db, cursor):
+    """PostgreSQL : index trigramme de la recherche sur l'expression sans accents.
+
+    La recherche lit student_listing : l'ancien index sur students n'est
+    plus utilisé et n'est pas recréé.
+    """
+    if db.db_engine != "postgresql":
+        return
+    cursor.execute("DROP INDEX IF EXISTS idx_students_search_trgm")
+    cursor.execute("DROP INDEX IF EXISTS idx_student_listing_search_trgm")
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if cursor.fetchone():
+        expression = PG_FOLDED_SEARCH_EXPRESSION.replace("s.", "")
+        cursor.execute(
+            f"CREATE INDEX idx_student_listing_search_trgm ON student_listing "
+            f"USING gin (({expression}) gin_trgm_ops)"
+        )
+
+
+
+def reseed_registration_sequences(db, cursor):
+    """Reconstruit les séquences des matricules à partir des matricules au format attribué.
+
+    La migration 8 lisait l'ancien format : une séquence pouvait naître d'un
+    matricule saisi à la main (MAT202509001 lu comme faculté 9). Seules les
+    séquences des matricules au format attribué sont gardées, et une séquence
+    existante ne recule jamais (un numéro déjà attribué n'est pas redonné).
+    """
+    cursor.execute("SELECT year, faculty_id, last_value FROM registration_sequences")
+    existing = {(year, faculty_id): value for year, faculty_id, value in cursor.fetchall()}
+
+    last_values = {}
+    cursor.execute("SELECT registration_number FROM students")
+    while True:
+        rows = cursor.fetchmany(1000)
+        if not rows:
+            break
+        for (registration_number,) in rows:
+            key = registration_key(registration_number)
+            if key:
+                year, faculty_id, value = key
+                last_values[year, faculty_id] = max(last_values.get((year, faculty_id), 0), value)
+
+    cursor.execute("DELETE FROM registration_sequences")
+    if last_values:
+        bulk_insert(db, cursor, "registration_sequences", ("year", "faculty_id", "last_value"),
+                    [(year, faculty_id, max(value, existing.get((year, faculty_id), 0)))
+                     for (year, faculty_id), value in sorted(last_values.items())])
+
+MIGRATIONS = [
+    (1, "Tables de base", create_base_tables),
+    (2, "Données par défaut de l'UNIKIN", insert_default_data),
+    (3, "Index de la liste des étudiants", create_listing_indexes),
+    (4, "Index de recherche des étudiants", create_search_index),
+    (5, "Projection de la liste des étudiants", create_student_listing),
+    (6, "Compteurs d'inscriptions", create_enrollment_counters),
+    (7, "Journal des modifications d'étudiants", create_student_changes),
+    (8, "Séquences des matricules", create_registration_sequences),
+    (9, "Projection des étudiants tenue par triggers sur PostgreSQL", convert_student_listing_view),
+    (10, "Transaction des modifications d'étudiants", add_student_changes_txid),
+    (11, "Suppression de l'index de tri des étudiants", drop_students_name_index),
+    (12, "Recherche PostgreSQL insensible aux accents", fold_search_index_accents),
+    (13, "Séquences des matricules au format à largeur fixe", reseed_registration_sequences),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db, connection):
+    """Retourne la version du schéma, ou None si la table schema_version n'existe pas"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        return cursor.fetchone()[0] or 0
+    except Exception:
+        # Base antérieure au suivi des versions
+        connection.rollback()
+        return None
+    finally:
+        cursor.close()
+
+
+def run_migrations(db, connection):
+    """Applique les migrations manquantes ; ne fait qu'une requête si le schéma est à jour"""
+    version = get_schema_version(db, connection)
+    if version == LATEST_VERSION:
+        return
+
+    param_style = db.get_param_style()
+    if version is None:
+        with db.transaction() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR(200) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        version = 0
+
+    for number, description, migration in MIGRATIONS:
+        if number <= version:
+            continue
+        print(f"📦 Migration {number} : {description}...")
+        try:
+            with db.transaction() as cursor:
+                migration(db, cursor)
+                cursor.execute(
+                    f"INSERT INTO schema_version (version, description) VALUES ({param_style}, {param_style})",
+                    (number, description)
+                )
+        except Exception as e:
+            print(f"❌ Erreur lors de la migration {number}: {e}")
+            raise
@@ -9,9 +9,27 @@ import os
 from datetime import datetime
 from database import Database
 
+class LazyFlowables(list):
+    """Liste de flowables remplie au fur et à mesure que ReportLab la consomme.
+
+    ``doc.build`` retire les flowables de la liste un par un (et y remet en
+    tête les morceaux d'un tableau coupé entre deux pages) ; le bloc suivant
+    n'est demandé à ``blocks`` que lorsque la liste est vide.
+    """
+
+    def __init__(self, blocks):
+        super().__init__()
+        self._blocks = iter(blocks)
+
+    def __len__(self):
+        if not list.__len__(self):
+            self.extend(next(self._blocks, ()))
+        return list.__len__(self)
+
+
 class PDFGenerator:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db=None):
+        self.db = db or Database()
         self.styles = getSampleStyleSheet()
 
         if 'Title' not in self.styles:
@@ -102,59 +120,91 @@ class PDFGenerator:
             print(f"Erreur lors de la génération du rapport: {e}")
             return False
 
-    def generate_students_list(self, students, output_path):
-        """Génère une liste PDF de tous les étudiants"""
+    def generate_student_reports(self, students, output_dir):
+        """Génère un rapport par étudiant dans ``output_dir`` ; retourne les chemins créés"""
+        paths = []
+        for student in students:
+            output_path = os.path.join(output_dir, f"rapport_{student['registration_number']}.pdf")
+            if self.generate_student_report(student, output_path):
+                paths.append(output_path)
+        return paths
+
+    def generate_students_list(self, students, output_path, chunk_size=500):
+        """Génère une liste PDF des étudiants.
+
+        ``students`` peut être une liste ou un itérateur de lignes (par exemple
+        issu de ``Database.stream_query``). Les tableaux de ``chunk_size``
+        lignes sont créés au moment où ReportLab les met en page (voir
+        ``LazyFlowables``) : seul le bloc en cours est en mémoire, jamais
+        toute la liste.
+
+        Les lignes étant lues pendant la mise en page, une erreur de lecture
+        peut survenir en cours de route : elle est propagée à l'appelant et
+        le fichier partiel est supprimé.
+        """
         try:
             # Créer le document PDF
             doc = SimpleDocTemplate(output_path, pagesize=A4)
-            elements = []
-            
-            # Titre
-            title = "LISTE DES ÉTUDIANTS - UNIVERSITÉ UNIKIN"
-            elements.append(Paragraph(title, self.styles['Title']))
-            elements.append(Spacer(1, 20))
-            
-            # En-tête du tableau
-            if students:
-                data = [["Matricule", "Nom", "Postnom", "Prénom", "Email", "Téléphone", "Promotion"]]
-                
-                for student in students:
-                    data.append([
-                        student['registration_number'],
-                        student['last_name'],
-                        student['postnom'],
-                        student['first_name'],
-                        student['email'] or "",
-                        student['phone'] or "",
-                        student['promotion_name']
-                    ])
-                
-                table = Table(data, colWidths=[1*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1.5*inch, 1.2*inch, 1.5*inch])
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8)
-                ]))
-                
-                elements.append(table)
-            else:
-                elements.append(Paragraph("Aucun étudiant trouvé.", self.styles['Normal']))
-            
-            # Pied de page
-            elements.append(Spacer(1, 20))
-            elements.append(Paragraph(f"Total: {len(students)} étudiant(s)", self.styles['Normal']))
-            elements.append(Paragraph(f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}", self.styles['Footer']))
-            
-            # Générer le PDF
-            doc.build(elements)
+            doc.build(LazyFlowables(self._students_list_blocks(students, chunk_size)))
             return True
             
         except Exception as e:
             print(f"Erreur lors de la génération de la liste: {e}")
-            return False
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+
+    def _students_list_blocks(self, students, chunk_size):
+        """Produit les flowables de la liste, un bloc (liste de flowables) à la fois"""
+        # Titre
+        title = "LISTE DES ÉTUDIANTS - UNIVERSITÉ UNIKIN"
+        yield [Paragraph(title, self.styles['Title']), Spacer(1, 20)]
+
+        # En-tête du tableau, répété en tête de chaque bloc
+        header = ["Matricule", "Nom", "Postnom", "Prénom", "Email", "Téléphone", "Promotion"]
+        data = [header]
+        total = 0
+
+        for student in students:
+            data.append([
+                student['registration_number'],
+                student['last_name'],
+                student['postnom'],
+                student['first_name'],
+                student['email'] or "",
+                student['phone'] or "",
+                student['promotion_name']
+            ])
+            total += 1
+
+            if len(data) > chunk_size:
+                yield [self._students_table(data)]
+                data = [header]
+
+        if len(data) > 1:
+            yield [self._students_table(data)]
+        elif total == 0:
+            yield [Paragraph("Aucun étudiant trouvé.", self.styles['Normal'])]
+
+        # Pied de page
+        yield [
+            Spacer(1, 20),
+            Paragraph(f"Total: {total} étudiant(s)", self.styles['Normal']),
+            Paragraph(f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}", self.styles['Footer']),
+        ]
+
+    def _students_table(self, data):
+        """Tableau d'un bloc de la liste des étudiants (en-tête répété sur chaque page)"""
+        table = Table(data, colWidths=[1*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1.5*inch, 1.2*inch, 1.5*inch], repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 1), (-1, -1), 8)
+        ]))
+        return table
@@ -0,0 +1,115 @@
+"""Exécution des requêtes en arrière-plan pour ne jamais bloquer l'interface.
+
+Les fonctions soumises s'exécutent sur un pool de threads (chacun emprunte
+sa propre connexion au pool de la base). Le résultat revient sur le thread
+de l'interface par les signaux ``finished``/``failed`` de la QueryFuture.
+
+Une soumission peut porter une clé : une nouvelle soumission avec la même
+clé annule la précédente, dont le résultat est ignoré s'il arrive quand même
+(ex. changement de filtre pendant le chargement de la liste).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+
+class QueryFuture(QObject):
+    finished = Signal(object)
+    failed = Signal(object)
+
+    def __init__(self, key=None, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self._cancelled = False
+        self._future = None
+
+    def cancel(self):
+        """Annule la requête : elle ne démarre pas si elle est encore en attente,
+        et son résultat est ignoré si elle est déjà en cours"""
+        self._cancelled = True
+        if self._future is not None:
+            self._future.cancel()
+
+    def cancelled(self):
+        return self._cancelled
+
+    def then(self, on_finished, on_failed=None):
+        """Raccourci pour connecter les deux signaux ; retourne la future"""
+        self.finished.connect(on_finished)
+        if on_failed is not None:
+            self.failed.connect(on_failed)
+        return self
+
+
+class QueryExecutor(QObject):
+    # Émis depuis un thread de travail, reçu (en file) sur le thread de l'interface
+    _completed = Signal(object, object, object)
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        workers = int(max_workers or os.getenv("DB_WORKERS", "2"))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-query")
+        self._latest = {}
+        self._completed.connect(self._deliver)
+
+    def submit(self, function, *args, key=None, **kwargs):
+        """Exécute ``function(*args, **kwargs)`` en arrière-plan et retourne une QueryFuture"""
+        future = QueryFuture(key, self)
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = future
+
+        def run():
+            if future.cancelled():
+                self._completed.emit(future, None, None)
+                return
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                self._completed.emit(future, None, e)
+            else:
+                self._completed.emit(future, result, None)
+
+        future._future = self._pool.submit(run)
+        # Annulée avant d'avoir démarré : libérer quand même la future
+        future._future.add_done_callback(
+            lambda done: done.cancelled() and self._completed.emit(future, None, None)
+        )
+        return future
+
+    def cancel(self, key):
+        """Annule la requête en cours pour cette clé"""
+        future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _deliver(self, future, result, error):
+        if future.key is not None and self._latest.get(future.key) is future:
+            del self._latest[future.key]
+        if not future.cancelled():
+            if error is not None:
+                future.failed.emit(error)
+            else:
+                future.finished.emit(result)
+        future.deleteLater()
+
+    def shutdown(self, wait=True):
+        """Annule les requêtes en attente et arrête les threads"""
+        for future in list(self._latest.values()):
+            future.cancel()
+        self._latest.clear()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_shared_executor = None
+
+
+def get_query_executor():
+    """Exécuteur partagé (à créer depuis le thread de l'interface)"""
+    global _shared_executor
+    if _shared_executor is None:
+        _shared_executor = QueryExecutor()
+    return _shared_executor
@@ -0,0 +1,131 @@
+"""Mesure des requêtes exécutées par ``Database.execute_query``.
+
+Chaque requête est regroupée par empreinte (texte normalisé, sans valeurs
+littérales) : nombre d'exécutions, durées, lignes et histogramme des
+latences. Les requêtes plus lentes que DB_SLOW_QUERY_MS sont gardées dans un
+journal (et écrites dans DB_SLOW_QUERY_LOG si défini), avec leur plan
+d'exécution si DB_EXPLAIN_SLOW_QUERIES=1. DB_PROFILE=0 désactive la mesure.
+"""
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+
+# Bornes supérieures des classes de l'histogramme, en millisecondes
+LATENCY_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+
+
+def fingerprint(sql):
+    """Texte normalisé d'une requête : espaces réduits, valeurs remplacées par ?"""
+    text = _WHITESPACE.sub(" ", sql).strip()
+    text = _STRING.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = text.replace("%s", "?")
+    return _PLACEHOLDER_LIST.sub("(...)", text)
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "count", "total_ms", "max_ms", "rows", "buckets")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    @property
+    def average_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile_ms(self, percentile):
+        """Borne supérieure de la classe contenant le percentile demandé"""
+        threshold = self.count * percentile / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= threshold:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryProfiler:
+    def __init__(self, slow_ms=None, explain=None, log_path=None, enabled=None, slow_log_size=200):
+        self.enabled = (enabled if enabled is not None
+                        else os.getenv("DB_PROFILE", "1") not in ("0", "false", "no"))
+        self.slow_ms = float(slow_ms if slow_ms is not None else os.getenv("DB_SLOW_QUERY_MS", "200"))
+        self.explain = (explain if explain is not None
+                        else os.getenv("DB_EXPLAIN_SLOW_QUERIES", "0") in ("1", "true", "yes"))
+        self.log_path = log_path if log_path is not None else os.getenv("DB_SLOW_QUERY_LOG")
+        self.stats = {}
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, params, elapsed_ms, rows):
+        """Enregistre une exécution ; retourne True si la requête est lente"""
+        key = self._fingerprints.get(sql)
+        if key is None:
+            if len(self._fingerprints) >= 1024:
+                self._fingerprints.clear()
+            key = self._fingerprints[sql] = fingerprint(sql)
+
+        bucket = next(i for i, bound in enumerate(LATENCY_BUCKETS) if elapsed_ms <= bound)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = QueryStats(key)
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += rows or 0
+            stats.buckets[bucket] += 1
+        return elapsed_ms >= self.slow_ms
+
+    def record_slow(self, sql, params, elapsed_ms, rows, plan=None):
+        """Ajoute une requête au journal des requêtes lentes"""
+        entry = {
+            "time": datetime.now(),
+            "elapsed_ms": elapsed_ms,
+            "rows": rows,
+            "sql": _WHITESPACE.sub(" ", sql).strip(),
+            "params": params,
+            "plan": plan,
+        }
+        self.slow_queries.append(entry)
+        print(f"🐢 Requête lente ({elapsed_ms:.0f} ms, {rows} ligne(s)) : {entry['sql'][:200]}")
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as handle:
+                handle.write(f"{entry['time']:%Y-%m-%d %H:%M:%S} {elapsed_ms:.1f} ms {rows} ligne(s) "
+                             f"{entry['sql']} -- {params!r}\n")
+                for line in plan or []:
+                    handle.write(f"    {line}\n")
+
+    def top(self, limit=20, order_by="total_ms"):
+        """Requêtes les plus coûteuses (par temps total, moyen, maximal ou nombre)"""
+        with self._lock:
+            stats = list(self.stats.values())
+        return sorted(stats, key=lambda s: getattr(s, order_by), reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+        self.slow_queries.clear()
+
+
+_shared_profiler = None
+
+
+def get_profiler():
+    """Profileur partagé par toute l'application"""
+    global _shared_profiler
+    if _shared_profiler is None:
+        _shared_profiler = QueryProfiler()
+    return _shared_profiler
@@ -0,0 +1,135 @@
+"""Cache des données de référence : facultés, départements et promotions.
+
+Ces tables changent rarement : toute la hiérarchie est chargée en une seule
+requête puis servie depuis la mémoire à toutes les listes déroulantes. Le
+cache est vidé par les dialogues qui les modifient (``invalidate``) et
+rechargé au premier accès suivant.
+"""
+import threading
+
+REFERENCE_QUERY = """
+    SELECT f.id AS faculty_id, f.name AS faculty_name, f.code AS faculty_code,
+           d.id AS department_id, d.name AS department_name, d.code AS department_code,
+           p.id AS promotion_id, p.name AS promotion_name, p.year AS promotion_year
+    FROM faculties f
+    LEFT JOIN departments d ON d.faculty_id = f.id
+    LEFT JOIN promotions p ON p.department_id = d.id
+"""
+
+
+class ReferenceData:
+    """Instantané de la hiérarchie, déjà trié comme l'affichent les listes"""
+
+    def __init__(self, rows):
+        faculties, departments, promotions = {}, {}, {}
+        for row in rows:
+            faculty_id = row['faculty_id']
+            if faculty_id not in faculties:
+                faculties[faculty_id] = {
+                    "id": faculty_id, "name": row['faculty_name'], "code": row['faculty_code']
+                }
+            department_id = row['department_id']
+            if department_id is not None and department_id not in departments:
+                departments[department_id] = {
+                    "id": department_id, "name": row['department_name'], "code": row['department_code'],
+                    "faculty_id": faculty_id, "faculty_name": row['faculty_name']
+                }
+            if row['promotion_id'] is not None:
+                promotions[row['promotion_id']] = {
+                    "id": row['promotion_id'], "name": row['promotion_name'], "year": row['promotion_year'],
+                    "department_id": department_id, "department_name": row['department_name'],
+                    "faculty_id": faculty_id, "faculty_name": row['faculty_name']
+                }
+
+        self.all_faculties = sorted(faculties.values(), key=lambda f: f["name"])
+        self.all_departments = sorted(departments.values(), key=lambda d: d["name"])
+        self.all_promotions = sorted(promotions.values(), key=lambda p: (-p["year"], p["name"]))
+        self.promotions_by_id = promotions
+
+        # Listes par parent, dans l'ordre d'affichage
+        self.faculty_departments = {}
+        for department in self.all_departments:
+            self.faculty_departments.setdefault(department["faculty_id"], []).append(department)
+        self.department_promotions = {}
+        self.faculty_promotions = {}
+        for promotion in self.all_promotions:
+            self.department_promotions.setdefault(promotion["department_id"], []).append(promotion)
+            self.faculty_promotions.setdefault(promotion["faculty_id"], []).append(promotion)
+
+    def faculties(self):
+        """Facultés triées par nom"""
+        return self.all_faculties
+
+    def departments(self, faculty_id=None):
+        """Départements triés par nom, de toutes les facultés ou d'une seule"""
+        if faculty_id is None or faculty_id == -1:
+            return self.all_departments
+        return self.faculty_departments.get(faculty_id, [])
+
+    def promotions(self, department_id=None, faculty_id=None):
+        """Promotions (plus récentes d'abord) d'un département, d'une faculté ou de toutes"""
+        if department_id is not None and department_id != -1:
+            return self.department_promotions.get(department_id, [])
+        if faculty_id is not None and faculty_id != -1:
+            return self.faculty_promotions.get(faculty_id, [])
+        return self.all_promotions
+
+    def promotion(self, promotion_id):
+        """Promotion avec son département et sa faculté, ou None"""
+        return self.promotions_by_id.get(promotion_id)
+
+
+class ReferenceCache:
+    def __init__(self, db):
+        self.db = db
+        self._data = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def load(self):
+        """Charge la hiérarchie si nécessaire (une seule requête) et la retourne"""
+        data = self._data
+        if data is None:
+            with self._lock:
+                data = self._data
+                if data is None:
+                    generation = self._generation
+                    data = ReferenceData(self.db.execute_query(REFERENCE_QUERY))
+                    # Ne pas garder un instantané invalidé pendant son chargement
+                    if generation == self._generation:
+                        self._data = data
+        return data
+
+    def invalidate(self):
+        """À appeler après toute écriture dans faculties, departments ou promotions"""
+        self._generation += 1
+        self._data = None
+
+    def faculties(self):
+        return self.load().faculties()
+
+    def departments(self, faculty_id=None):
+        return self.load().departments(faculty_id)
+
+    def promotions(self, department_id=None, faculty_id=None):
+        return self.load().promotions(department_id, faculty_id)
+
+    def promotion(self, promotion_id):
+        return self.load().promotion(promotion_id)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_reference_cache(db):
+    """Cache partagé par toute l'application"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ReferenceCache(db)
+        return _shared_cache
@@ -0,0 +1,73 @@
+"""Attribution des matricules des étudiants.
+
+Un matricule attribué a la forme MAT{année}-{faculté}-{numéro} (ex.
+MAT2025-002-00001 : année de la promotion, id de la faculté sur 3 chiffres,
+numéro d'ordre sur 5 chiffres). Le dernier numéro attribué est tenu par
+année et par faculté dans la table ``registration_sequences`` : le suivant
+est obtenu par un seul ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``,
+atomique même avec plusieurs postes de saisie, sans parcourir la table
+students.
+"""
+from migrations import registration_key
+
+MAX_FACULTY_ID = 999
+MAX_SEQUENCE_VALUE = 99999
+
+
+def format_registration_number(year, faculty_id, value):
+    if not 0 < faculty_id <= MAX_FACULTY_ID:
+        raise ValueError(f"Id de faculté hors du format des matricules : {faculty_id}")
+    if not 0 < value <= MAX_SEQUENCE_VALUE:
+        raise ValueError(f"Plus de matricules disponibles pour {year} (faculté {faculty_id})")
+    return f"MAT{year:04d}-{faculty_id:03d}-{value:05d}"
+
+
+def allocate_registration_numbers(db, promotion_id, count=1):
+    """Réserve ``count`` matricules consécutifs pour la promotion et les retourne.
+
+    Dans un bloc ``transaction()``, la réservation est annulée avec lui ;
+    sinon elle est validée immédiatement (un numéro non utilisé est perdu).
+    """
+    rows = db.execute_query("""
+        INSERT INTO registration_sequences (year, faculty_id, last_value)
+        SELECT p.year, d.faculty_id, %s
+        FROM promotions p JOIN departments d ON d.id = p.department_id
+        WHERE p.id = %s
+        ON CONFLICT (year, faculty_id) DO UPDATE
+        SET last_value = registration_sequences.last_value + excluded.last_value
+        RETURNING year, faculty_id, last_value
+    """, (count, promotion_id))
+    if not rows:
+        raise ValueError(f"Promotion introuvable : {promotion_id}")
+
+    row = rows[0]
+    first = row['last_value'] - count + 1
+    return [format_registration_number(row['year'], row['faculty_id'], value)
+            for value in range(first, row['last_value'] + 1)]
+
+
+def next_registration_number(db, promotion_id):
+    """Matricule suivant pour la promotion"""
+    return allocate_registration_numbers(db, promotion_id)[0]
+
+
+def note_registration_numbers(db, registration_numbers):
+    """Avance les séquences au-delà des matricules saisis à la main.
+
+    Un matricule au format attribué ne pourra ainsi jamais être attribué une
+    seconde fois ; les autres formats sont ignorés.
+    """
+    last_values = {}
+    for registration_number in registration_numbers:
+        key = registration_key(registration_number)
+        if key:
+            year, faculty_id, value = key
+            last_values[year, faculty_id] = max(last_values.get((year, faculty_id), 0), value)
+
+    for (year, faculty_id), value in last_values.items():
+        db.execute_query("""
+            INSERT INTO registration_sequences (year, faculty_id, last_value) VALUES (%s, %s, %s)
+            ON CONFLICT (year, faculty_id) DO UPDATE
+            SET last_value = CASE WHEN excluded.last_value > registration_sequences.last_value
+                                  THEN excluded.last_value ELSE registration_sequences.last_value END
+        """, (year, faculty_id, value))
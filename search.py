@@ -0,0 +1,118 @@
+"""Recherche d'étudiants par nom, postnom, prénom, matricule ou email.
+
+Le moteur dépend de DB_ENGINE : FTS5 sur SQLite (table ``students_fts``
+tenue à jour par triggers), trigrammes pg_trgm sur PostgreSQL. Les lignes
+sont lues dans la projection ``student_listing``. Les index sont créés par
+les migrations 4, 5 et 12 (voir migrations.py).
+"""
+import re
+
+from database import STUDENT_LISTING_COLUMNS, STUDENT_LISTING_JOINS
+from migrations import PG_FOLDED_SEARCH_EXPRESSION, SEARCH_ACCENTS, SEARCH_UNACCENTED
+
+# Nombre maximal de résultats d'une recherche (une seule page, par pertinence)
+SEARCH_LIMIT = 200
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_FOLD_ACCENTS = str.maketrans(SEARCH_ACCENTS, SEARCH_UNACCENTED)
+
+
+def search_tokens(text):
+    """Mots de la saisie, sans ponctuation"""
+    return _TOKEN.findall(text or "")
+
+
+class SQLiteStudentSearch:
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def match_expression(tokens):
+        """Chaque mot doit apparaître, en début de mot (recherche par préfixe)"""
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, text, limit=100, faculty_id=None, department_id=None, promotion_id=None):
+        """Étudiants correspondant à la saisie, les plus pertinents en premier"""
+        tokens = search_tokens(text)
+        if not tokens:
+            return []
+
+        clause, params = self.db.students_filter_clause(faculty_id, department_id, promotion_id)
+        query = f"""
+            SELECT {STUDENT_LISTING_COLUMNS}
+            {STUDENT_LISTING_JOINS}
+            JOIN students_fts ON students_fts.rowid = s.id
+            WHERE students_fts MATCH %s{clause}
+            ORDER BY students_fts.rank
+            LIMIT %s
+        """
+        return self.db.execute_query(query, [self.match_expression(tokens)] + params + [limit], use_read_pool=True)
+
+
+class PostgresStudentSearch:
+    def __init__(self, db):
+        self.db = db
+        rows = db.execute_query("SELECT 1 AS installed FROM pg_extension WHERE extname = 'pg_trgm'")
+        self.trigram = bool(rows)
+
+    def search(self, text, limit=100, faculty_id=None, department_id=None, promotion_id=None):
+        """Étudiants correspondant à la saisie, les plus pertinents en premier.
+
+        Chaque mot doit apparaître, sans tenir compte des accents (LIKE, servi
+        par l'index trigramme) ; avec pg_trgm, les saisies approchantes sont
+        aussi retenues et le tri se fait par similarité.
+        """
+        # Même repli des accents que l'expression indexée
+        tokens = [token.lower().translate(_FOLD_ACCENTS) for token in search_tokens(text)]
+        if not tokens:
+            return []
+
+        clause, filter_params = self.db.students_filter_clause(faculty_id, department_id, promotion_id)
+        phrase = " ".join(tokens)
+        contains = " AND ".join(f"{PG_FOLDED_SEARCH_EXPRESSION} LIKE %s" for _ in tokens)
+        like_params = [f"%{token}%" for token in tokens]
+
+        if self.trigram:
+            query = f"""
+                SELECT {STUDENT_LISTING_COLUMNS},
+                       similarity({PG_FOLDED_SEARCH_EXPRESSION}, %s) AS rank
+                {STUDENT_LISTING_JOINS}
+                WHERE (({contains}) OR {PG_FOLDED_SEARCH_EXPRESSION} %% %s){clause}
+                ORDER BY rank DESC, s.last_name, s.first_name
+                LIMIT %s
+            """
+            params = [phrase] + like_params + [phrase] + filter_params + [limit]
+        else:
+            query = f"""
+                SELECT {STUDENT_LISTING_COLUMNS}
+                {STUDENT_LISTING_JOINS}
+                WHERE ({contains}){clause}
+                ORDER BY s.last_name, s.first_name
+                LIMIT %s
+            """
+            params = like_params + filter_params + [limit]
+
+        return self.db.execute_query(query, params, use_read_pool=True)
+
+
+def get_student_search(db):
+    """Moteur de recherche adapté à la base configurée"""
+    if db.db_engine == "postgresql":
+        return PostgresStudentSearch(db)
+    return SQLiteStudentSearch(db)
+
+
+def student_batches(db, filters=None, search=None, search_engine=None,
+                    order_by="s.last_name, s.first_name, s.id", batch_size=1000):
+    """Lots d'étudiants de la liste affichée, pour l'export et l'impression.
+
+    Avec une saisie de recherche, les mêmes résultats que la liste (un seul
+    lot, par pertinence) ; sinon toute la liste filtrée, lue par lots avec
+    ``Database.stream_query``.
+    """
+    filters = filters or {}
+    if search:
+        engine = search_engine or get_student_search(db)
+        return iter([engine.search(search, limit=SEARCH_LIMIT, **filters)])
+    query, params = db.build_students_query(order_by=order_by, **filters)
+    return db.stream_query(query, params, batch_size=batch_size, use_read_pool=True)
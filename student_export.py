@@ -0,0 +1,76 @@
+"""Export de la liste des étudiants (filtrée) en CSV ou JSON Lines.
+
+Les lignes sont lues par lots via ``Database.stream_query`` et écrites lot
+par lot : la mémoire utilisée ne dépend pas du nombre d'étudiants. Quand une
+recherche est active, ce sont ses résultats qui sont exportés.
+"""
+import csv
+import json
+import os
+
+from search import student_batches
+
+# Champs exportés et en-têtes CSV correspondants
+EXPORT_FIELDS = [
+    ("id", "ID"),
+    ("registration_number", "Matricule"),
+    ("last_name", "Nom"),
+    ("postnom", "Postnom"),
+    ("first_name", "Prénom"),
+    ("email", "Email"),
+    ("phone", "Téléphone"),
+    ("address", "Adresse"),
+    ("emergency_contact", "Contact d'urgence"),
+    ("emergency_phone", "Téléphone d'urgence"),
+    ("faculty_name", "Faculté"),
+    ("department_name", "Département"),
+    ("promotion_name", "Promotion"),
+    ("promotion_year", "Année"),
+    ("created_at", "Date d'inscription"),
+]
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def export_format(file_path):
+    """Format d'export déduit de l'extension du fichier"""
+    extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    return "csv"
+
+
+def export_students(db, file_path, filters=None, fmt=None, progress=None, batch_size=1000,
+                    search=None, search_engine=None):
+    """Écrit les étudiants correspondant aux filtres dans ``file_path``.
+
+    Avec ``search``, seuls les résultats de cette recherche sont exportés,
+    comme dans la liste affichée. ``progress(lignes_écrites)`` est appelé
+    après chaque lot. Retourne le nombre d'étudiants exportés.
+    """
+    fmt = fmt or export_format(file_path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+
+    batches = student_batches(db, filters, search, search_engine, batch_size=batch_size)
+    fields = [name for name, _ in EXPORT_FIELDS]
+    written = 0
+
+    with open(file_path, "w", newline="", encoding="utf-8-sig" if fmt == "csv" else "utf-8") as handle:
+        if fmt == "csv":
+            writer = csv.writer(handle)
+            writer.writerow([header for _, header in EXPORT_FIELDS])
+
+        for batch in batches:
+            if fmt == "csv":
+                writer.writerows([student[name] for name in fields] for student in batch)
+            else:
+                handle.write("".join(
+                    json.dumps({name: student[name] for name in fields}, ensure_ascii=False, default=str) + "\n"
+                    for student in batch
+                ))
+            written += len(batch)
+            if progress:
+                progress(written)
+
+    return written
@@ -0,0 +1,284 @@
+"""Import en masse d'étudiants depuis un fichier CSV ou XLSX.
+
+Le fichier est lu ligne par ligne. Les noms de faculté, département et
+promotion sont résolus grâce au cache des données de référence (voir
+reference_cache.py). L'unicité des matricules et des emails est vérifiée
+en mémoire, puis les lignes valides sont insérées par lots, une
+transaction par lot. Les lignes sans matricule en reçoivent un de la
+séquence de leur année et de leur faculté (voir registration_numbers.py).
+"""
+import csv
+import os
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from migrations import bulk_insert
+from reference_cache import get_reference_cache
+from registration_numbers import allocate_registration_numbers, note_registration_numbers
+
+# En-têtes acceptés (après normalisation) pour chaque champ
+COLUMN_ALIASES = {
+    "last_name": ("nom", "last_name"),
+    "postnom": ("postnom", "post_nom"),
+    "first_name": ("prenom", "first_name"),
+    "email": ("email", "e-mail", "courriel"),
+    "phone": ("telephone", "tel", "phone"),
+    "address": ("adresse", "address"),
+    "emergency_contact": ("contact d'urgence", "contact_urgence", "emergency_contact"),
+    "emergency_phone": ("telephone d'urgence", "telephone_urgence", "emergency_phone"),
+    "registration_number": ("matricule", "registration_number"),
+    "photo_path": ("photo", "photo_path"),
+    "faculty": ("faculte", "faculty"),
+    "department": ("departement", "department"),
+    "promotion": ("promotion",),
+    "year": ("annee", "year"),
+}
+
+REQUIRED_FIELDS = {
+    "last_name": "Le nom est obligatoire",
+    "postnom": "Le postnom est obligatoire",
+    "first_name": "Le prénom est obligatoire",
+}
+
+STUDENT_COLUMNS = (
+    "last_name", "postnom", "first_name", "email", "phone", "address",
+    "emergency_contact", "emergency_phone", "registration_number",
+    "photo_path", "promotion_id"
+)
+REGISTRATION_INDEX = STUDENT_COLUMNS.index("registration_number")
+PROMOTION_INDEX = STUDENT_COLUMNS.index("promotion_id")
+
+
+def normalize(value):
+    """Minuscules, sans accents ni espaces superflus (pour comparer les libellés)"""
+    text = unicodedata.normalize("NFKD", str(value or "")).casefold()
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.split())
+
+
+@dataclass
+class ImportReport:
+    total_rows: int = 0
+    inserted: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+    def summary(self):
+        return (f"{self.inserted} étudiant(s) importé(s) sur {self.total_rows} ligne(s), "
+                f"{self.rejected} ligne(s) rejetée(s)")
+
+
+class StudentImporter:
+    def __init__(self, db, batch_size=1000):
+        self.db = db
+        self.batch_size = batch_size
+        self.promotions = {}
+        self.registration_numbers = set()
+        self.emails = set()
+
+    def read_rows(self, file_path):
+        """Produit (numéro de ligne, dictionnaire) pour chaque ligne du fichier"""
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in (".xlsx", ".xlsm"):
+            yield from self._read_xlsx(file_path)
+        else:
+            yield from self._read_csv(file_path)
+
+    def _read_csv(self, file_path):
+        with open(file_path, newline="", encoding="utf-8-sig") as handle:
+            sample = handle.read(4096)
+            handle.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.reader(handle, dialect)
+            header = next(reader, None)
+            if header is None:
+                return
+            fields = self._map_header(header)
+            for line_number, values in enumerate(reader, start=2):
+                if any(value.strip() for value in values):
+                    yield line_number, self._to_record(fields, values)
+
+    def _read_xlsx(self, file_path):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("Le module openpyxl est nécessaire pour importer un fichier Excel (pip install openpyxl)")
+
+        # read_only : les lignes sont lues à la demande, sans charger toute la feuille
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            fields = self._map_header(header)
+            for line_number, values in enumerate(rows, start=2):
+                values = ["" if value is None else str(value) for value in values]
+                if any(value.strip() for value in values):
+                    yield line_number, self._to_record(fields, values)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _map_header(header):
+        """Associe chaque colonne du fichier à un champ (None si inconnue)"""
+        aliases = {normalize(alias): name for name, names in COLUMN_ALIASES.items() for alias in names}
+        return [aliases.get(normalize(title)) for title in header]
+
+    @staticmethod
+    def _to_record(fields, values):
+        return {name: str(value).strip() for name, value in zip(fields, values) if name}
+
+    def load_lookups(self):
+        """Charge en mémoire la hiérarchie des promotions et les matricules/emails existants"""
+        self.promotions = {}
+        for promotion in get_reference_cache(self.db).promotions():
+            key = (normalize(promotion['faculty_name']), normalize(promotion['department_name']),
+                   normalize(promotion['name']))
+            self.promotions.setdefault(key, {})[promotion['year']] = promotion['id']
+
+        self.registration_numbers = set()
+        self.emails = set()
+        for batch in self.db.stream_query("SELECT registration_number, email FROM students"):
+            for student in batch:
+                self.registration_numbers.add(normalize(student['registration_number']))
+                if student['email']:
+                    self.emails.add(normalize(student['email']))
+
+    def resolve_promotion(self, record):
+        """Retourne l'id de la promotion désignée par la ligne, ou lève ValueError"""
+        faculty = normalize(record.get("faculty"))
+        department = normalize(record.get("department"))
+        promotion = normalize(record.get("promotion"))
+        if not (faculty and department and promotion):
+            raise ValueError("Faculté, département et promotion sont obligatoires")
+
+        # « Licence 1 » est accepté pour « Licence 1 - <département> »
+        years = (self.promotions.get((faculty, department, promotion))
+                 or self.promotions.get((faculty, department, f"{promotion} - {department}")))
+        if not years:
+            raise ValueError(f"Promotion introuvable : {record.get('promotion')} "
+                             f"({record.get('department')}, {record.get('faculty')})")
+
+        year = record.get("year")
+        if not year:
+            # Sans année, la promotion la plus récente
+            return years[max(years)]
+        try:
+            return years[int(float(year))]
+        except (ValueError, KeyError):
+            raise ValueError(f"Promotion {record.get('promotion')} inexistante pour l'année {year}")
+
+    def validate(self, record):
+        """Vérifie une ligne et retourne le tuple à insérer, ou lève ValueError"""
+        errors = [message for name, message in REQUIRED_FIELDS.items() if not record.get(name)]
+        if errors:
+            raise ValueError(", ".join(errors))
+
+        email = record.get("email") or None
+        if email and "@" not in email:
+            raise ValueError(f"Email invalide : {email}")
+
+        registration_number = record.get("registration_number") or None
+        registration_key = normalize(registration_number) if registration_number else None
+        if registration_key and registration_key in self.registration_numbers:
+            raise ValueError(f"Matricule déjà utilisé : {registration_number}")
+        email_key = normalize(email) if email else None
+        if email_key and email_key in self.emails:
+            raise ValueError(f"Email déjà utilisé : {email}")
+
+        promotion_id = self.resolve_promotion(record)
+
+        if registration_key:
+            self.registration_numbers.add(registration_key)
+        if email_key:
+            self.emails.add(email_key)
+
+        return (
+            record["last_name"], record["postnom"], record["first_name"], email,
+            record.get("phone") or None, record.get("address") or None,
+            record.get("emergency_contact") or None, record.get("emergency_phone") or None,
+            registration_number, record.get("photo_path") or None, promotion_id
+        )
+
+    def import_file(self, file_path, progress=None):
+        """Importe le fichier et retourne un ImportReport (erreurs ligne par ligne).
+
+        ``progress(lignes_lues)`` est appelé après chaque lot.
+        """
+        report = ImportReport()
+        self.load_lookups()
+
+        batch = []
+        for line_number, record in self.read_rows(file_path):
+            report.total_rows += 1
+            try:
+                batch.append((line_number, self.validate(record)))
+            except ValueError as e:
+                report.errors.append((line_number, str(e)))
+
+            if len(batch) >= self.batch_size:
+                self._insert_batch(batch, report)
+                batch = []
+                if progress:
+                    progress(report.total_rows)
+
+        if batch:
+            self._insert_batch(batch, report)
+        if progress:
+            progress(report.total_rows)
+
+        report.errors.sort()
+        return report
+
+    def _insert_batch(self, batch, report):
+        """Insère un lot dans une seule transaction ; en cas d'échec, ligne par ligne.
+
+        Chaque tentative a son point de sauvegarde : les lignes refusées sont
+        écartées et le lot reste validé en un seul commit.
+        """
+        with self.db.transaction() as cursor:
+            batch = self.assign_registration_numbers(batch)
+            try:
+                with self.db.transaction():
+                    bulk_insert(self.db, cursor, "students", STUDENT_COLUMNS, [row for _, row in batch])
+                report.inserted += len(batch)
+            except Exception:
+                # Une contrainte a échoué (ex. saisie concurrente) : isoler la ou les lignes fautives
+                for line_number, row in batch:
+                    try:
+                        with self.db.transaction():
+                            bulk_insert(self.db, cursor, "students", STUDENT_COLUMNS, [row])
+                        report.inserted += 1
+                    except Exception as e:
+                        report.errors.append((line_number, f"Refusée par la base : {e}"))
+
+    def assign_registration_numbers(self, batch):
+        """Complète les matricules manquants du lot (un bloc de numéros par promotion).
+
+        Les matricules fournis avancent d'abord les séquences, pour ne jamais
+        être attribués une seconde fois.
+        """
+        note_registration_numbers(self.db, [row[REGISTRATION_INDEX] for _, row in batch if row[REGISTRATION_INDEX]])
+
+        missing = {}
+        for position, (_, row) in enumerate(batch):
+            if not row[REGISTRATION_INDEX]:
+                missing.setdefault(row[PROMOTION_INDEX], []).append(position)
+
+        batch = list(batch)
+        for promotion_id, positions in missing.items():
+            numbers = allocate_registration_numbers(self.db, promotion_id, len(positions))
+            for position, number in zip(positions, numbers):
+                # Un matricule saisi plus loin dans le fichier ne peut plus le reprendre
+                self.registration_numbers.add(normalize(number))
+                line_number, row = batch[position]
+                batch[position] = (line_number, row[:REGISTRATION_INDEX] + (number,) + row[REGISTRATION_INDEX + 1:])
+        return batch
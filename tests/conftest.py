@@ -0,0 +1,130 @@
+"""Fixtures communes : une base neuve par test.
+
+Les tests tournent sur SQLite (fichier temporaire) et, si TEST_PG_HOST est
+défini, aussi sur PostgreSQL : une base temporaire est alors créée sur ce
+serveur (TEST_PG_PORT, TEST_PG_USER, TEST_PG_PASSWORD) puis supprimée.
+"""
+import os
+import time
+import uuid
+
+import psycopg2
+import pytest
+
+from database import ConnectionPool, Database
+
+ENGINES = ["sqlite", "postgresql"]
+
+
+def pg_server():
+    """Paramètres de connexion au serveur PostgreSQL de test (None si non configuré)"""
+    host = os.getenv("TEST_PG_HOST")
+    if not host:
+        return None
+    return {
+        "host": host,
+        "port": os.getenv("TEST_PG_PORT", "5432"),
+        "user": os.getenv("TEST_PG_USER", "postgres"),
+        "password": os.getenv("TEST_PG_PASSWORD", ""),
+    }
+
+
+def pg_admin(server):
+    connection = psycopg2.connect(dbname="postgres", **server)
+    connection.autocommit = True
+    return connection
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    if request.param == "postgresql" and pg_server() is None:
+        pytest.skip("TEST_PG_HOST non défini")
+    return request.param
+
+
+@pytest.fixture
+def database_env(engine, tmp_path, monkeypatch):
+    """Fait pointer les variables DB_* / SQLITE_PATH vers une base vide"""
+    monkeypatch.setenv("DB_ENGINE", engine)
+    monkeypatch.setenv("DB_PROFILE", "0")
+    if engine == "sqlite":
+        monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "student_manager.db"))
+        yield engine
+        return
+
+    server = pg_server()
+    name = f"student_manager_test_{uuid.uuid4().hex[:12]}"
+    admin = pg_admin(server)
+    with admin.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE {name}")
+    for variable, key in (("DB_HOST", "host"), ("DB_PORT", "port"), ("DB_USER", "user"), ("DB_PASSWORD", "password")):
+        monkeypatch.setenv(variable, server[key])
+    monkeypatch.setenv("DB_NAME", name)
+    try:
+        yield engine
+    finally:
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def connect(database_env):
+    """Ouvre un nouveau Database (avec son propre pool) sur la base du test,
+    comme un autre poste de saisie"""
+    pools = []
+
+    def connect(**pool_options):
+        pool = ConnectionPool(database_env, **pool_options)
+        pools.append(pool)
+        return Database(pool=pool)
+
+    yield connect
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture
+def db(connect):
+    return connect()
+
+
+def first_promotion(db, faculty_id=None):
+    """Une promotion (avec année et faculté) des données par défaut"""
+    query = """
+        SELECT p.id, p.name, p.year, d.id AS department_id, d.name AS department_name,
+               d.faculty_id, f.name AS faculty_name
+        FROM promotions p
+        JOIN departments d ON d.id = p.department_id
+        JOIN faculties f ON f.id = d.faculty_id
+    """
+    params = ()
+    if faculty_id is not None:
+        query += " WHERE d.faculty_id = %s"
+        params = (faculty_id,)
+    return db.execute_query(query + " ORDER BY p.id LIMIT 1", params)[0]
+
+
+def insert_student(db, promotion_id, registration_number, last_name="Test", email=None):
+    return db.execute_query("""
+        INSERT INTO students (last_name, postnom, first_name, email, registration_number, promotion_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        RETURNING id
+    """, (last_name, "Postnom", "Prénom", email, registration_number, promotion_id), return_id=True)
+
+
+@pytest.fixture(scope="session")
+def qt_app():
+    """Application Qt sans affichage, pour les tests des signaux et des dialogues"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def wait_until(app, condition, timeout=5):
+    """Fait tourner la boucle d'événements jusqu'à ce que la condition soit vraie"""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "délai dépassé"
+        app.processEvents()
+        time.sleep(0.005)
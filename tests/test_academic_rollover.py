@@ -0,0 +1,106 @@
+import pytest
+
+from academic_rollover import latest_year, preview_rollover, run_rollover
+from conftest import insert_student
+
+DEPARTMENT = "Droit privé et judiciaire"
+
+
+@pytest.fixture
+def year(db):
+    return latest_year(db)
+
+
+@pytest.fixture
+def students(db, year):
+    """Étudiants de l'année la plus récente : {nom: promotion de départ}"""
+    promotions = {row['name']: row['id'] for row in db.execute_query(
+        "SELECT p.id, p.name FROM promotions p JOIN departments d ON d.id = p.department_id "
+        "WHERE d.name = %s AND p.year = %s", (DEPARTMENT, year)
+    )}
+    department_id = db.execute_query("SELECT id FROM departments WHERE name = %s", (DEPARTMENT,))[0]['id']
+    promotions["Préparatoire"] = db.execute_query(
+        "INSERT INTO promotions (name, year, department_id) VALUES (%s, %s, %s) RETURNING id",
+        ("Préparatoire", year, department_id), return_id=True
+    )
+
+    placed = {
+        "Kasongo": "Licence 1", "Mbuyi": "Licence 1", "Ilunga": "Licence 3",
+        "Lukusa": "Master 2", "Tshala": "Doctorat 3", "Kalala": "Préparatoire",
+    }
+    for number, (name, level) in enumerate(placed.items()):
+        promotion = level if level == "Préparatoire" else f"{level} - {DEPARTMENT}"
+        insert_student(db, promotions[promotion], f"ROLL-{number}", last_name=name)
+    return placed
+
+
+def snapshot(db):
+    students = db.execute_query("""
+        SELECT s.last_name, p.name, p.year FROM students s JOIN promotions p ON p.id = s.promotion_id
+        ORDER BY s.last_name
+    """)
+    return [tuple(row) for row in students], db.execute_query("SELECT COUNT(*) AS n FROM promotions")[0]['n']
+
+
+def test_dry_run_changes_nothing(db, year, students):
+    before = snapshot(db)
+    plan = preview_rollover(db)
+
+    assert (plan.from_year, plan.to_year) == (year, year + 1)
+    promotions_this_year = before[1]
+    assert plan.promotions_to_create == promotions_this_year
+    assert {(level, next_level): count for level, next_level, count in plan.moves if count} == {
+        ("Licence 1", "Licence 2"): 2, ("Licence 3", "Master 1"): 1, ("Master 2", "Doctorat 1"): 1,
+    }
+    assert (plan.students_to_move, plan.staying) == (4, 2)
+    assert snapshot(db) == before
+
+
+def test_apply_matches_the_dry_run(db, year, students):
+    plan = preview_rollover(db)
+    promotions_before = snapshot(db)[1]
+
+    applied = run_rollover(db)
+
+    assert applied.promotions_to_create == plan.promotions_to_create
+    assert applied.moves == plan.moves
+    assert (applied.students_to_move, applied.staying) == (plan.students_to_move, plan.staying)
+
+    placements, promotions_after = snapshot(db)
+    assert promotions_after == promotions_before + plan.promotions_to_create
+    assert placements == sorted([
+        ("Ilunga", f"Master 1 - {DEPARTMENT}", year + 1),
+        ("Kalala", "Préparatoire", year),
+        ("Kasongo", f"Licence 2 - {DEPARTMENT}", year + 1),
+        ("Lukusa", f"Doctorat 1 - {DEPARTMENT}", year + 1),
+        ("Mbuyi", f"Licence 2 - {DEPARTMENT}", year + 1),
+        ("Tshala", f"Doctorat 3 - {DEPARTMENT}", year),
+    ])
+
+
+def test_second_run_moves_nobody(db, year, students):
+    run_rollover(db)
+    before = snapshot(db)
+
+    assert preview_rollover(db, year).students_to_move == 0
+    again = run_rollover(db, year)
+
+    assert (again.promotions_to_create, again.students_to_move, again.staying) == (0, 0, 2)
+    assert snapshot(db) == before
+
+
+def test_failed_rollover_is_rolled_back(db, year, students, monkeypatch):
+    before = snapshot(db)
+    execute_query = db.execute_query
+
+    def fail_on_master_2(query, params=None, **options):
+        if params and "Doctorat 1" in params:
+            raise RuntimeError("panne pendant le passage")
+        return execute_query(query, params, **options)
+
+    monkeypatch.setattr(db, "execute_query", fail_on_master_2)
+    with pytest.raises(RuntimeError):
+        run_rollover(db)
+
+    monkeypatch.undo()
+    assert snapshot(db) == before
@@ -0,0 +1,102 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from backup import DATABASE_FILE, create_backup, file_digest
+from conftest import first_promotion, insert_student
+from migrations import LATEST_VERSION
+
+
+@pytest.fixture
+def sqlite_db(db):
+    if db.db_engine != "sqlite":
+        pytest.skip("sauvegarde de la base SQLite")
+    return db
+
+
+@pytest.fixture
+def photos_dir(tmp_path):
+    photos = tmp_path / "photos_source"
+    (photos / "2025").mkdir(parents=True)
+    (photos / "kasongo.jpg").write_bytes(b"\xff\xd8photo-kasongo")
+    (photos / "2025" / "mbuyi.png").write_bytes(b"\x89PNGphoto-mbuyi")
+    return photos
+
+
+def students(connection):
+    return connection.execute(
+        "SELECT id, last_name, registration_number FROM student_listing ORDER BY id"
+    ).fetchall()
+
+
+def add_students(db, count, prefix):
+    promotion_id = first_promotion(db)['id']
+    for number in range(count):
+        insert_student(db, promotion_id, f"{prefix}-{number}", last_name=f"{prefix}{number}")
+
+
+def test_restored_database_matches_the_source(sqlite_db, connect, tmp_path, photos_dir, monkeypatch):
+    add_students(sqlite_db, 50, "BK")
+    report = create_backup(str(tmp_path / "backups"), os.environ["SQLITE_PATH"], str(photos_dir), pause=0)
+
+    copy = os.path.join(report.path, DATABASE_FILE)
+    with sqlite3.connect(copy) as restored, sqlite3.connect(os.environ["SQLITE_PATH"]) as source:
+        assert restored.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert students(restored) == students(source)
+
+    # Restauration : l'application s'ouvre directement sur la copie
+    monkeypatch.setenv("SQLITE_PATH", copy)
+    db = connect()
+    assert db.execute_query("SELECT MAX(version) AS version FROM schema_version")[0]['version'] == LATEST_VERSION
+    student_id = insert_student(db, first_promotion(db)['id'], "BK-APRES")
+    assert db.execute_query("SELECT id FROM student_listing WHERE id = %s", (student_id,))
+
+
+def test_writes_during_the_copy_leave_a_consistent_backup(sqlite_db, connect, tmp_path, photos_dir):
+    add_students(sqlite_db, 300, "BK")
+    writer = connect()
+    steps = []
+
+    def write_between_steps(remaining, total):
+        # Un autre poste écrit pendant la copie, entre deux pas
+        steps.append(remaining)
+        if remaining and len(steps) <= 5:
+            add_students(writer, 20, f"W{len(steps)}")
+
+    report = create_backup(str(tmp_path / "backups"), os.environ["SQLITE_PATH"], str(photos_dir),
+                           pages=2, pause=0, progress=write_between_steps)
+
+    assert len(steps) > 1
+    with sqlite3.connect(os.path.join(report.path, DATABASE_FILE)) as restored:
+        assert restored.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        # La projection tenue par triggers est cohérente avec la table copiée
+        total = restored.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        assert restored.execute("SELECT COUNT(*) FROM student_listing").fetchone()[0] == total
+        assert total >= 300
+
+
+def test_photos_are_copied_once_and_restorable(sqlite_db, tmp_path, photos_dir):
+    destination = str(tmp_path / "backups")
+    first = create_backup(destination, os.environ["SQLITE_PATH"], str(photos_dir), pause=0)
+    second = create_backup(destination, os.environ["SQLITE_PATH"], str(photos_dir), pause=0)
+    assert (first.photos_copied, second.photos_copied) == (2, 0)
+    assert first.path != second.path
+
+    (photos_dir / "kasongo.jpg").write_bytes(b"\xff\xd8photo-kasongo-nouvelle")
+    third = create_backup(destination, os.environ["SQLITE_PATH"], str(photos_dir), pause=0)
+    assert (third.photos_total, third.photos_copied) == (2, 1)
+
+    # Chaque sauvegarde retrouve ses propres versions des photos dans le magasin
+    for report, kasongo in ((first, b"\xff\xd8photo-kasongo"), (third, b"\xff\xd8photo-kasongo-nouvelle")):
+        with open(os.path.join(report.path, "manifest.json"), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        assert sorted(manifest["photos"]) == ["2025/mbuyi.png", "kasongo.jpg"]
+        restored = {}
+        for relative, stored in manifest["photos"].items():
+            path = os.path.join(destination, "photos", stored[:2], stored)
+            assert file_digest(path) == os.path.splitext(stored)[0]
+            with open(path, "rb") as handle:
+                restored[relative] = handle.read()
+        assert restored == {"kasongo.jpg": kasongo, "2025/mbuyi.png": b"\x89PNGphoto-mbuyi"}
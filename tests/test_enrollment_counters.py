@@ -0,0 +1,85 @@
+import pytest
+
+from enrollment_stats import enrollment_statistics
+from migrations import create_enrollment_counters
+from reference_cache import ReferenceCache
+
+INSERT_STUDENT = """
+    INSERT INTO students (last_name, postnom, first_name, registration_number, promotion_id)
+    VALUES ('Test', 'Postnom', 'Prénom', %s, %s)
+"""
+
+
+def counters(db):
+    return {row['promotion_id']: row['student_count']
+            for row in db.execute_query("SELECT promotion_id, student_count FROM enrollment_counters")
+            if row['student_count']}
+
+
+def actual_counts(db):
+    return {row['promotion_id']: row['n'] for row in db.execute_query("""
+        SELECT promotion_id, COUNT(*) AS n FROM students
+        WHERE promotion_id IS NOT NULL GROUP BY promotion_id
+    """)}
+
+
+@pytest.fixture
+def promotions(db):
+    return [row['id'] for row in db.execute_query("SELECT id FROM promotions ORDER BY id LIMIT 5")]
+
+
+@pytest.fixture
+def enrolled(db, promotions):
+    """300 étudiants sur cinq promotions, dont une partie sans promotion"""
+    db.executemany(INSERT_STUDENT, [
+        (f"CNT-{number}", None if number % 10 == 0 else promotions[number % len(promotions)])
+        for number in range(300)
+    ])
+    return promotions
+
+
+def test_bulk_inserts_are_counted(db, enrolled):
+    assert counters(db) == actual_counts(db)
+    assert sum(counters(db).values()) == 270
+
+
+def test_moves_between_promotions(db, enrolled):
+    source, target, other = enrolled[0], enrolled[1], enrolled[2]
+    db.execute_query("UPDATE students SET promotion_id = %s WHERE promotion_id = %s", (target, source))
+    assert counters(db) == actual_counts(db)
+    assert source not in counters(db)
+
+    # Vers et depuis « sans promotion »
+    db.execute_query("UPDATE students SET promotion_id = NULL WHERE promotion_id = %s", (other,))
+    db.execute_query("UPDATE students SET promotion_id = %s WHERE promotion_id IS NULL", (source,))
+    # Mises à jour sans changement de promotion
+    db.execute_query("UPDATE students SET promotion_id = promotion_id, last_name = 'Renommé'")
+    assert counters(db) == actual_counts(db)
+    assert db.execute_query("SELECT COUNT(*) AS n FROM students WHERE promotion_id IS NULL")[0]['n'] == 0
+
+
+def test_deletes(db, enrolled):
+    db.execute_query("DELETE FROM students WHERE promotion_id = %s OR promotion_id IS NULL", (enrolled[3],))
+    assert counters(db) == actual_counts(db)
+    db.execute_query("DELETE FROM students")
+    assert counters(db) == {}
+
+
+def test_counters_rebuilt_from_existing_students(db, enrolled):
+    db.execute_query("UPDATE enrollment_counters SET student_count = 999")
+    with db.transaction() as cursor:
+        create_enrollment_counters(db, cursor)
+    assert counters(db) == actual_counts(db)
+
+
+def test_statistics_match_the_students_table(db, enrolled):
+    db.execute_query("UPDATE students SET promotion_id = %s WHERE promotion_id = %s", (enrolled[4], enrolled[0]))
+    stats = enrollment_statistics(db, ReferenceCache(db))
+
+    assert stats.total == db.execute_query(
+        "SELECT COUNT(*) AS n FROM students WHERE promotion_id IS NOT NULL"
+    )[0]['n']
+    assert sum(count for _, count in stats.by_faculty) == stats.total
+    assert sum(count for *_, count in stats.by_department) == stats.total
+    assert sum(count for _, count in stats.by_year) == stats.total
+    assert sorted(count for *_, count in stats.by_promotion if count) == sorted(actual_counts(db).values())
@@ -0,0 +1,34 @@
+import pytest
+
+from conftest import first_promotion
+
+
+@pytest.fixture
+def roster(db):
+    """Quelques milliers d'étudiants répartis sur toutes les promotions, statistiques à jour"""
+    promotions = [row['id'] for row in db.execute_query("SELECT id FROM promotions ORDER BY id")]
+    db.executemany("""
+        INSERT INTO students (last_name, postnom, first_name, registration_number, promotion_id)
+        VALUES (%s, 'Postnom', 'Prénom', %s, %s)
+    """, [(f"Nom{number % 97}", f"IDX-{number}", promotions[number % len(promotions)]) for number in range(4000)])
+    db.execute_query("ANALYZE")
+    return first_promotion(db)
+
+
+@pytest.mark.parametrize("level", ["faculty", "department", "promotion"])
+def test_filtered_listing_uses_its_index(db, roster, level):
+    filters = {f"{level}_id": roster[f"{level}_id" if level != "promotion" else "id"]}
+    plan, missing = db.check_listing_indexes(**filters)
+    assert missing == [], "\n".join(plan)
+    assert f"idx_student_listing_{level}" in "\n".join(plan)
+
+
+def test_base_table_indexes(db):
+    if db.db_engine == "postgresql":
+        query = "SELECT indexname AS name FROM pg_indexes WHERE schemaname = current_schema()"
+    else:
+        query = "SELECT name FROM sqlite_master WHERE type = 'index'"
+    indexes = {row['name'] for row in db.execute_query(query)}
+    # Clés étrangères : passage d'année et suppressions ; le tri passe par student_listing
+    assert {"idx_students_promotion_id", "idx_promotions_department_id", "idx_departments_faculty_id"} <= indexes
+    assert "idx_students_name" not in indexes
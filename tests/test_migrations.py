@@ -0,0 +1,130 @@
+import os
+import shutil
+
+import pytest
+
+import migrations
+from conftest import first_promotion, insert_student
+from migrations import LATEST_VERSION, MIGRATIONS
+
+LEGACY_DATABASE = os.path.join(os.path.dirname(__file__), os.pardir, "data", "student_manager.db")
+
+
+def applied_versions(db):
+    return [row['version'] for row in db.execute_query("SELECT version FROM schema_version ORDER BY version")]
+
+
+def count(db, table):
+    return db.execute_query(f"SELECT COUNT(*) AS total FROM {table}")[0]['total']
+
+
+def test_new_database_gets_every_migration(db):
+    assert applied_versions(db) == [number for number, _, _ in MIGRATIONS]
+    assert count(db, "faculties") > 0
+    assert count(db, "registration_sequences") == 0
+
+
+def test_up_to_date_database_is_left_alone(connect, monkeypatch):
+    db = connect()
+    faculties = count(db, "faculties")
+
+    def must_not_run(db, cursor):
+        raise AssertionError("migration rejouée")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(n, d, must_not_run) for n, d, _ in MIGRATIONS])
+    again = connect()
+    assert applied_versions(again) == list(range(1, LATEST_VERSION + 1))
+    assert count(again, "faculties") == faculties
+
+
+def test_failed_migration_is_rolled_back(connect, monkeypatch):
+    connect()
+
+    def broken(db, cursor):
+        cursor.execute("CREATE TABLE migration_test (id INTEGER)")
+        raise RuntimeError("migration interrompue")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS + [(LATEST_VERSION + 1, "Test", broken)])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION + 1)
+    with pytest.raises(RuntimeError):
+        connect()
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION)
+    db = connect()
+    assert applied_versions(db)[-1] == LATEST_VERSION
+    with pytest.raises(Exception):
+        db.execute_query("SELECT * FROM migration_test")
+
+
+def test_existing_database_is_upgraded(connect, monkeypatch):
+    # Base arrêtée à la migration 7, avec des étudiants saisis entre-temps
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS[:7])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 7)
+    old = connect()
+    promotion = first_promotion(old)
+    year, faculty_id = promotion['year'], promotion['faculty_id']
+    insert_student(old, promotion['id'], f"MAT{year}-{faculty_id:03d}-00041", last_name="Kasongo")
+    insert_student(old, promotion['id'], f"MAT{year}-{faculty_id:03d}-00007", last_name="Mbuyi")
+    insert_student(old, promotion['id'], "MAT202509001", last_name="Lukusa")
+    assert applied_versions(old)[-1] == 7
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION)
+    db = connect()
+
+    assert applied_versions(db) == list(range(1, LATEST_VERSION + 1))
+    assert db.execute_query("SELECT year, faculty_id, last_value FROM registration_sequences") == [
+        (year, faculty_id, 41)
+    ]
+    assert count(db, "student_listing") == 3
+    # Les triggers posés par les migrations suivent les nouvelles écritures
+    student_id = insert_student(db, promotion['id'], "MAT202509002", last_name="Ilunga")
+    assert db.execute_query("SELECT last_name FROM student_listing WHERE id = %s", (student_id,))[0][0] == "Ilunga"
+
+
+def test_sequences_seeded_by_migration_8_are_rebuilt(connect, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS[:7])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 7)
+    old = connect()
+    promotion = first_promotion(old)
+    year, faculty_id = promotion['year'], promotion['faculty_id']
+    insert_student(old, promotion['id'], "MAT202509001", last_name="Lukusa")
+    insert_student(old, promotion['id'], f"MAT{year}-{faculty_id:03d}-00041", last_name="Kasongo")
+    insert_student(old, promotion['id'], f"MAT{year + 1}-{faculty_id:03d}-00002", last_name="Mbuyi")
+
+    # Migration 8 telle que livrée : MAT202509001 est lu comme la faculté 9
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS[:8])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 8)
+    at_8 = connect()
+    assert at_8.execute_query("SELECT year, faculty_id, last_value FROM registration_sequences") == [(2025, 9, 1)]
+    # Un numéro attribué puis libéré (étudiant supprimé) ne doit pas être redonné
+    at_8.execute_query(
+        "INSERT INTO registration_sequences (year, faculty_id, last_value) VALUES (%s, %s, %s)",
+        (year + 1, faculty_id, 3)
+    )
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION)
+    db = connect()
+
+    assert applied_versions(db) == list(range(1, LATEST_VERSION + 1))
+    assert db.execute_query("SELECT year, faculty_id, last_value FROM registration_sequences ORDER BY year") == [
+        (year, faculty_id, 41), (year + 1, faculty_id, 3)
+    ]
+
+
+def test_legacy_database_keeps_its_students(database_env, connect, tmp_path, monkeypatch):
+    if database_env != "sqlite":
+        pytest.skip("base SQLite d'origine")
+    # Base livrée avec l'application, antérieure à la table schema_version
+    path = tmp_path / "legacy.db"
+    shutil.copy(LEGACY_DATABASE, path)
+    monkeypatch.setenv("SQLITE_PATH", str(path))
+
+    db = connect()
+
+    assert applied_versions(db) == list(range(1, LATEST_VERSION + 1))
+    students = db.execute_query("SELECT registration_number FROM student_listing")
+    assert [row['registration_number'] for row in students] == ["MAT202509001"]
+    assert count(db, "registration_sequences") == 0
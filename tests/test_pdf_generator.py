@@ -0,0 +1,73 @@
+import pytest
+from reportlab.pdfgen.canvas import Canvas
+
+from pdf_generator import LazyFlowables, PDFGenerator
+
+
+def student(number):
+    return {
+        "registration_number": f"MAT2025-002-{number:05d}", "last_name": f"Nom {number}",
+        "postnom": "Postnom", "first_name": "Prénom", "email": None, "phone": None,
+        "promotion_name": "Licence 1 - Économie",
+    }
+
+
+def test_lazy_flowables_pulls_a_block_only_when_empty():
+    pulled = []
+
+    def blocks():
+        for number in range(3):
+            pulled.append(number)
+            yield [f"{number}a", f"{number}b"]
+
+    flowables = LazyFlowables(blocks())
+    assert len(flowables) == 2 and pulled == [0]
+    del flowables[0]
+    assert len(flowables) == 1 and pulled == [0]
+    del flowables[0]
+    assert len(flowables) == 2 and pulled == [0, 1]
+    flowables[:] = []
+    assert len(flowables) == 2
+    flowables[:] = []
+    assert len(flowables) == 0 and pulled == [0, 1, 2]
+
+
+def test_students_list_is_rendered_while_rows_are_read(db, tmp_path, monkeypatch):
+    total = 3000
+    read = []
+    pages = []
+
+    def rows():
+        for number in range(1, total + 1):
+            read.append(number)
+            yield student(number)
+
+    show_page = Canvas.showPage
+    monkeypatch.setattr(Canvas, "showPage", lambda canvas: (pages.append(len(read)), show_page(canvas)))
+
+    output = tmp_path / "liste.pdf"
+    assert PDFGenerator(db).generate_students_list(rows(), str(output), chunk_size=200)
+    assert output.read_bytes().startswith(b"%PDF")
+    assert len(read) == total
+    # Les premières pages sont écrites avant que la lecture des lignes ne soit finie
+    assert len(pages) > 10
+    assert pages[0] <= 400
+
+
+def test_empty_students_list(db, tmp_path):
+    output = tmp_path / "vide.pdf"
+    assert PDFGenerator(db).generate_students_list(iter(()), str(output))
+    assert output.stat().st_size > 0
+
+
+def test_read_error_is_raised_and_partial_file_removed(db, tmp_path):
+    def rows():
+        for number in range(1, 1000):
+            if number == 700:
+                raise RuntimeError("connexion perdue")
+            yield student(number)
+
+    output = tmp_path / "liste.pdf"
+    with pytest.raises(RuntimeError, match="connexion perdue"):
+        PDFGenerator(db).generate_students_list(rows(), str(output), chunk_size=200)
+    assert not output.exists()
@@ -0,0 +1,105 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import wait_until
+from query_executor import QueryExecutor
+
+
+@pytest.fixture
+def executor(qt_app):
+    executor = QueryExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_result_is_delivered_on_the_calling_thread(qt_app, executor):
+    delivered = []
+    worker = []
+
+    def query():
+        worker.append(threading.get_ident())
+        return 42
+
+    executor.submit(query).then(lambda result: delivered.append((result, threading.get_ident())))
+    wait_until(qt_app, lambda: delivered)
+    assert delivered == [(42, threading.get_ident())]
+    assert worker[0] != threading.get_ident()
+
+
+def test_errors_go_to_the_failed_callback(qt_app, executor):
+    finished, failed = [], []
+
+    def query():
+        raise ValueError("requête invalide")
+
+    executor.submit(query).then(finished.append, failed.append)
+    wait_until(qt_app, lambda: failed)
+    assert finished == []
+    assert isinstance(failed[0], ValueError)
+
+
+def test_superseded_key_is_not_delivered(qt_app, executor):
+    release = threading.Event()
+    delivered = []
+
+    def slow(value):
+        release.wait(5)
+        return value
+
+    executor.submit(slow, "ancien", key="students").then(delivered.append, delivered.append)
+    executor.submit(slow, "nouveau", key="students").then(delivered.append, delivered.append)
+    release.set()
+    wait_until(qt_app, lambda: delivered)
+    # Laisser arriver le résultat de la première soumission, qui doit être ignoré
+    wait_until(qt_app, lambda: not executor._latest)
+    for _ in range(20):
+        qt_app.processEvents()
+        time.sleep(0.005)
+    assert delivered == ["nouveau"]
+
+
+def test_cancel_by_key(qt_app, executor):
+    release = threading.Event()
+    delivered, other = [], []
+
+    executor.submit(lambda: release.wait(5), key="students").then(delivered.append, delivered.append)
+    executor.submit(lambda: "stats", key="stats").then(other.append)
+    executor.cancel("students")
+    release.set()
+    wait_until(qt_app, lambda: other and not executor._latest)
+    for _ in range(20):
+        qt_app.processEvents()
+        time.sleep(0.005)
+    assert delivered == []
+    assert other == ["stats"]
+
+
+def test_start_job_refuses_a_second_run(qt_app, executor, monkeypatch):
+    ui_main_window = pytest.importorskip("ui_main_window")
+    messages = []
+    monkeypatch.setattr(ui_main_window.QMessageBox, "information",
+                        staticmethod(lambda *args: messages.append(args[2])))
+    window = SimpleNamespace(running_jobs=set(), executor=executor)
+    start_job = ui_main_window.MainWindow.start_job
+    release = threading.Event()
+    delivered = []
+
+    first = start_job(window, "backup", lambda: release.wait(5) and "première")
+    first.then(delivered.append)
+    assert start_job(window, "backup", lambda: "seconde") is None
+    assert messages == ["⏳ Ce traitement est déjà en cours"]
+
+    release.set()
+    wait_until(qt_app, lambda: delivered)
+    assert delivered == ["première"]
+    assert window.running_jobs == set()
+
+    # Un échec libère aussi la clé
+    failed = []
+    start_job(window, "backup", lambda: 1 / 0).then(delivered.append, failed.append)
+    wait_until(qt_app, lambda: failed)
+    assert window.running_jobs == set()
+    assert start_job(window, "backup", lambda: "encore") is not None
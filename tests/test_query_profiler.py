@@ -0,0 +1,85 @@
+import pytest
+
+from query_profiler import QueryProfiler, fingerprint
+
+
+@pytest.fixture
+def profiler(db, tmp_path):
+    """Profileur du test : tout est lent (seuil 0 ms), plans et journal activés"""
+    profiler = QueryProfiler(slow_ms=0, explain=True, log_path=str(tmp_path / "slow.log"), enabled=True)
+    db.profiler = profiler
+    return profiler
+
+
+def test_fingerprint_ignores_literal_values():
+    assert fingerprint("SELECT * FROM students\n  WHERE id = 12 AND last_name = 'O''Neil'") == (
+        "SELECT * FROM students WHERE id = ? AND last_name = ?"
+    )
+    assert fingerprint("SELECT 1 FROM students WHERE id IN (%s, %s, %s)") == fingerprint(
+        "SELECT 1 FROM students WHERE id IN (%s, %s)"
+    )
+
+
+def test_threshold_is_inclusive():
+    profiler = QueryProfiler(slow_ms=100, enabled=True)
+    assert not profiler.record("SELECT 1", None, 99.9, 1)
+    assert profiler.record("SELECT 1", None, 100, 1)
+    assert profiler.record("SELECT 1", None, 2500, 1)
+    stats = profiler.stats["SELECT ?"]
+    assert stats.count == 3
+    assert stats.max_ms == 2500
+    assert stats.percentile_ms(50) == 100
+    assert stats.percentile_ms(100) == 2500
+
+
+def test_settings_are_read_from_the_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("DB_PROFILE", "1")
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "50")
+    monkeypatch.setenv("DB_EXPLAIN_SLOW_QUERIES", "1")
+    monkeypatch.setenv("DB_SLOW_QUERY_LOG", str(tmp_path / "slow.log"))
+    profiler = QueryProfiler()
+    assert (profiler.enabled, profiler.slow_ms, profiler.explain) == (True, 50, True)
+    assert profiler.log_path == str(tmp_path / "slow.log")
+
+    monkeypatch.setenv("DB_PROFILE", "0")
+    assert not QueryProfiler().enabled
+
+
+def test_slow_query_is_logged_with_its_plan(db, profiler):
+    query = "SELECT id FROM faculties WHERE id = %s"
+    rows = db.execute_query(query, (1,))
+
+    # Texte exécuté : paramètres au format du moteur (? sur SQLite)
+    sql = db.compile_statement(query).sql
+    entry = profiler.slow_queries[-1]
+    assert entry['sql'] == sql
+    assert entry['params'] == (1,)
+    assert entry['rows'] == len(rows)
+    assert entry['plan']
+
+    with open(profiler.log_path, encoding="utf-8") as handle:
+        log = handle.read()
+    assert f"{sql} -- (1,)" in log
+    assert f"    {entry['plan'][0]}" in log
+    assert profiler.stats["SELECT id FROM faculties WHERE id = ?"].count == 1
+
+
+def test_no_explain_inside_a_transaction(db, profiler):
+    with db.transaction():
+        db.execute_query("SELECT id FROM faculties")
+    assert profiler.slow_queries[-1]['plan'] is None
+
+
+def test_fast_queries_are_only_counted(db, profiler):
+    profiler.slow_ms = 60_000
+    db.execute_query("SELECT id FROM faculties")
+    db.execute_query("SELECT id FROM faculties")
+    assert not profiler.slow_queries
+    assert profiler.stats["SELECT id FROM faculties"].count == 2
+
+
+def test_disabled_profiler_records_nothing(db, profiler):
+    profiler.enabled = False
+    db.execute_query("SELECT id FROM faculties")
+    assert profiler.stats == {}
+    assert not profiler.slow_queries
@@ -0,0 +1,49 @@
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from conftest import first_promotion, insert_student
+from database import ConnectionPool, Database
+
+
+@pytest.fixture
+def routed_db(connect, database_env):
+    """Database avec un pool de lecture distinct (lecture seule sur PostgreSQL)"""
+    read_pool = ConnectionPool(database_env, read_only=True)
+    db = Database(pool=connect().pool, read_pool=read_pool)
+    yield db
+    read_pool.close()
+
+
+def test_reads_leave_no_open_transaction(routed_db):
+    if routed_db.db_engine != "postgresql":
+        pytest.skip("PostgreSQL uniquement")
+    routed_db.execute_query("SELECT COUNT(*) AS total FROM students")
+    routed_db.execute_query("SELECT COUNT(*) AS total FROM students", use_read_pool=True)
+
+    for pool in (routed_db.pool, routed_db.read_pool):
+        connection = pool.acquire()
+        try:
+            assert connection.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        finally:
+            pool.release(connection)
+
+
+def test_transaction_reads_its_own_writes(routed_db):
+    promotion = first_promotion(routed_db)
+    with routed_db.transaction():
+        student_id = insert_student(routed_db, promotion['id'], "MAT2025-001-00001")
+        # Dans le bloc, la lecture « routée » reste sur la connexion du bloc
+        assert routed_db.execute_query(
+            "SELECT id FROM students WHERE id = %s", (student_id,), use_read_pool=True
+        )
+    assert routed_db.execute_query(
+        "SELECT id FROM students WHERE id = %s", (student_id,), use_read_pool=True
+    )
+
+
+def test_read_pool_rejects_writes(routed_db):
+    if routed_db.db_engine != "postgresql":
+        pytest.skip("PostgreSQL uniquement")
+    with pytest.raises(psycopg2.errors.ReadOnlySqlTransaction):
+        routed_db.execute_query("DELETE FROM students", use_read_pool=True)
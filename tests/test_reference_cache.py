@@ -0,0 +1,121 @@
+import pytest
+
+import reference_cache
+from conftest import first_promotion, wait_until
+from query_executor import QueryExecutor
+from reference_cache import ReferenceCache, get_reference_cache
+
+
+@pytest.fixture
+def cache(db, monkeypatch):
+    """Cache partagé neuf : les dialogues utilisent get_reference_cache"""
+    monkeypatch.setattr(reference_cache, "_shared_cache", None)
+    return get_reference_cache(db)
+
+
+@pytest.fixture
+def executor(qt_app):
+    executor = QueryExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    """Boîtes de dialogue sans affichage : « Oui » aux confirmations"""
+    from PySide6.QtWidgets import QMessageBox
+    shown = []
+    for name in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, name, staticmethod(lambda *args, name=name: shown.append((name, args[2]))))
+    monkeypatch.setattr(QMessageBox, "question", staticmethod(lambda *args: QMessageBox.Yes))
+    return shown
+
+
+def faculty_names(cache):
+    return [faculty['name'] for faculty in cache.faculties()]
+
+
+def test_loaded_once_and_served_from_memory(db, monkeypatch):
+    cache = ReferenceCache(db)
+    queries = []
+    execute_query = db.execute_query
+    monkeypatch.setattr(db, "execute_query", lambda *args, **kwargs: queries.append(args) or execute_query(*args, **kwargs))
+
+    promotion = first_promotion(db)
+    queries.clear()
+    assert cache.promotion(promotion['id'])['name'] == promotion['name']
+    cache.faculties()
+    cache.departments(promotion['faculty_id'])
+    cache.promotions(department_id=promotion['department_id'])
+    assert len(queries) == 1
+
+    cache.invalidate()
+    cache.faculties()
+    assert len(queries) == 2
+
+
+def test_invalidated_while_loading_is_not_kept(db, monkeypatch):
+    cache = ReferenceCache(db)
+    execute_query = db.execute_query
+
+    def racing_query(*args, **kwargs):
+        rows = execute_query(*args, **kwargs)
+        # Une faculté est ajoutée pendant la lecture de l'ancien instantané
+        cache.invalidate()
+        return rows
+
+    monkeypatch.setattr(db, "execute_query", racing_query)
+    cache.load()
+    assert not cache.loaded
+
+
+def test_faculty_dialog_refreshes_the_cache(qt_app, db, cache, executor, answers):
+    from ui_faculty_dialog import FacultyDialog
+    assert "Faculté de Test" not in faculty_names(cache)
+
+    dialog = FacultyDialog(db=db, executor=executor)
+    dialog.name_edit.setText("Faculté de Test")
+    dialog.code_edit.setText("FTEST")
+    dialog.add_faculty()
+    assert answers[-1][0] == "information"
+    assert "Faculté de Test" in faculty_names(cache)
+
+    faculty = next(f for f in cache.faculties() if f['name'] == "Faculté de Test")
+    wait_until(qt_app, lambda: hasattr(dialog, "model")
+               and any(row['id'] == faculty['id'] for row in dialog.model.faculties))
+    row = next(i for i, f in enumerate(dialog.model.faculties) if f['id'] == faculty['id'])
+    dialog.faculties_table.selectRow(row)
+    dialog.delete_faculty()
+    assert "Faculté de Test" not in faculty_names(cache)
+    dialog.deleteLater()
+
+
+def test_department_dialog_refreshes_the_cache(qt_app, db, cache, executor, answers):
+    from ui_department_dialog import DepartmentDialog
+    faculty = cache.faculties()[0]
+
+    dialog = DepartmentDialog(db=db, executor=executor)
+    wait_until(qt_app, lambda: dialog.faculty_combo.count() > 0)
+    dialog.faculty_combo.setCurrentIndex(dialog.faculty_combo.findData(faculty['id']))
+    dialog.name_edit.setText("Département de Test")
+    dialog.code_edit.setText("DTEST")
+    dialog.add_department()
+    assert answers[-1][0] == "information"
+    assert "Département de Test" in [d['name'] for d in cache.departments(faculty['id'])]
+    dialog.deleteLater()
+
+
+def test_promotion_dialog_refreshes_the_cache(qt_app, db, cache, executor, answers):
+    from ui_promotion_dialog import PromotionDialog
+    promotions = cache.promotions()
+    promotion = promotions[0]
+
+    dialog = PromotionDialog(db=db, executor=executor)
+    wait_until(qt_app, lambda: hasattr(dialog, "model") and dialog.model.promotions)
+    row = next(i for i, p in enumerate(dialog.model.promotions) if p['id'] == promotion['id'])
+    dialog.promotions_table.selectRow(row)
+    dialog.delete_promotion()
+    assert answers[-1][0] == "information"
+    assert cache.promotion(promotion['id']) is None
+    assert len(cache.promotions()) == len(promotions) - 1
+    dialog.deleteLater()
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from conftest import first_promotion, insert_student
+from migrations import registration_key, reseed_registration_sequences
+from registration_numbers import (allocate_registration_numbers, format_registration_number,
+                                  next_registration_number, note_registration_numbers)
+
+
+def sequences(db):
+    rows = db.execute_query("SELECT year, faculty_id, last_value FROM registration_sequences")
+    return {(row['year'], row['faculty_id']): row['last_value'] for row in rows}
+
+
+def test_format_is_fixed_width_and_unambiguous():
+    assert format_registration_number(2025, 2, 1) == "MAT2025-002-00001"
+    assert format_registration_number(2025, 10, 1001) != format_registration_number(2025, 101, 1)
+    assert registration_key("MAT2025-101-00001") == (2025, 101, 1)
+    assert registration_key("MAT2025-010-01001") == (2025, 10, 1001)
+    # Matricules saisis avant le format attribué (année + mois d'inscription)
+    assert registration_key("MAT202509001") is None
+    with pytest.raises(ValueError):
+        format_registration_number(2025, 1000, 1)
+    with pytest.raises(ValueError):
+        format_registration_number(2025, 2, 100000)
+
+
+def test_allocate_per_year_and_faculty(db):
+    promotion = first_promotion(db, faculty_id=2)
+    other = first_promotion(db, faculty_id=9)
+    year = promotion['year']
+
+    assert allocate_registration_numbers(db, promotion['id'], 3) == [
+        f"MAT{year}-002-00001", f"MAT{year}-002-00002", f"MAT{year}-002-00003"
+    ]
+    assert next_registration_number(db, promotion['id']) == f"MAT{year}-002-00004"
+    assert next_registration_number(db, other['id']) == f"MAT{other['year']}-009-00001"
+
+    with pytest.raises(ValueError):
+        next_registration_number(db, -1)
+
+
+def test_allocation_is_rolled_back_with_transaction(db):
+    promotion = first_promotion(db)
+    first = next_registration_number(db, promotion['id'])
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            allocate_registration_numbers(db, promotion['id'], 5)
+            raise RuntimeError
+    assert registration_key(next_registration_number(db, promotion['id']))[2] == registration_key(first)[2] + 1
+
+
+def test_note_advances_sequences_and_ignores_other_formats(db):
+    promotion = first_promotion(db, faculty_id=2)
+    year = promotion['year']
+    note_registration_numbers(db, [f"MAT{year}-002-00041", "MAT202509001", "XYZ", None, f"MAT{year}-002-00007"])
+    assert sequences(db) == {(year, 2): 41}
+
+    # Une valeur plus petite ne fait jamais reculer la séquence
+    note_registration_numbers(db, [f"MAT{year}-002-00010"])
+    assert next_registration_number(db, promotion['id']) == f"MAT{year}-002-00042"
+
+
+def test_seed_from_existing_students(db):
+    promotion = first_promotion(db, faculty_id=2)
+    insert_student(db, promotion['id'], "MAT202509001")
+    insert_student(db, promotion['id'], "MAT2025-002-00012")
+    insert_student(db, promotion['id'], "MAT2025-002-00005")
+    insert_student(db, promotion['id'], "MAT2024-013-00300")
+
+    with db.transaction() as cursor:
+        reseed_registration_sequences(db, cursor)
+
+    # Le matricule MAT202509001 (hors format) ne crée pas de séquence (2025, faculté 9)
+    assert sequences(db) == {(2025, 2): 12, (2024, 13): 300}
+
+
+def test_concurrent_allocators_never_share_a_number(connect):
+    clerks = [connect(), connect()]
+    promotion = first_promotion(clerks[0])
+    allocated = [[] for _ in range(4)]
+    errors = []
+
+    def allocate(db, numbers):
+        try:
+            for _ in range(50):
+                numbers.append(next_registration_number(db, promotion['id']))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=allocate, args=(clerks[position % 2], numbers))
+               for position, numbers in enumerate(allocated)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    numbers = [number for numbers in allocated for number in numbers]
+    assert len(set(numbers)) == 200
+    assert sorted(registration_key(number)[2] for number in numbers) == list(range(1, 201))
@@ -0,0 +1,52 @@
+import threading
+
+from database import CompiledStatement, Row
+
+
+class FakeCursor:
+    def __init__(self, *columns):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+
+
+def test_row_reads_like_a_dict_and_a_tuple(db):
+    row = db.execute_query("SELECT 1 AS id, 'Kabila' AS last_name")[0]
+    assert isinstance(row, Row)
+    assert row['last_name'] == "Kabila" and row[0] == 1
+    assert row.get('missing', "x") == "x"
+    assert "id" in row and "missing" not in row
+    assert dict(row) == {"id": 1, "last_name": "Kabila"}
+
+
+def test_describe_follows_renamed_columns_with_same_count():
+    statement = CompiledStatement("SELECT * FROM v", "sqlite")
+    first = statement.describe(FakeCursor("a", "b"))
+    assert first._columns == ("a", "b")
+    assert statement.describe(FakeCursor("a", "b")) is first
+    assert statement.describe(FakeCursor("c", "d"))._columns == ("c", "d")
+
+
+def test_select_star_on_a_rebuilt_view(db):
+    db.execute_query("CREATE VIEW rebuilt AS SELECT 1 AS a, 2 AS b")
+    assert db.execute_query("SELECT * FROM rebuilt")[0].keys() == ("a", "b")
+    db.execute_query("DROP VIEW rebuilt")
+    db.execute_query("CREATE VIEW rebuilt AS SELECT 1 AS c, 2 AS d")
+    assert dict(db.execute_query("SELECT * FROM rebuilt")[0]) == {"c": 1, "d": 2}
+
+
+def test_describe_is_consistent_across_threads():
+    statement = CompiledStatement("SELECT * FROM v", "sqlite")
+    cursors = [FakeCursor("a", "b"), FakeCursor("c", "d"), FakeCursor("a", "b", "e")]
+    mismatches = []
+
+    def run(cursor):
+        expected = tuple(desc[0] for desc in cursor.description)
+        for _ in range(2000):
+            if statement.describe(cursor)._columns != expected:
+                mismatches.append(expected)
+
+    threads = [threading.Thread(target=run, args=(cursor,)) for cursor in cursors * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not mismatches
@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import first_promotion, insert_student
+from search import get_student_search, student_batches
+
+
+@pytest.fixture
+def search(db):
+    return get_student_search(db)
+
+
+@pytest.fixture
+def promotion(db):
+    return first_promotion(db)
+
+
+def found(search, text, **filters):
+    return [row['last_name'] for row in search.search(text, **filters)]
+
+
+def test_prefix_search(db, search, promotion):
+    insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Kasongo")
+    insert_student(db, promotion['id'], "MAT2025-001-00002", last_name="Mbuyi")
+    assert found(search, "Kas") == ["Kasongo"]
+    assert found(search, "kasongo prén") == ["Kasongo"]
+    assert found(search, "Ilunga") == []
+    assert found(search, "  ,; ") == []
+
+
+def test_diacritics_are_ignored(db, search, promotion):
+    insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Kabongo Élodie")
+    insert_student(db, promotion['id'], "MAT2025-001-00002", last_name="Lukusa Elodie")
+    assert sorted(found(search, "elodie")) == ["Kabongo Élodie", "Lukusa Elodie"]
+    assert sorted(found(search, "ÉLODIE")) == ["Kabongo Élodie", "Lukusa Elodie"]
+
+
+def test_registration_number_lookup(db, search, promotion):
+    for number in range(1, 30):
+        insert_student(db, promotion['id'], f"MAT2025-001-{number:05d}", last_name=f"Nom{number}")
+    rows = search.search("MAT2025-001-00017")
+    assert rows[0]['registration_number'] == "MAT2025-001-00017"
+    assert found(search, "00017") == ["Nom17"]
+
+
+def test_closest_match_first(db, search, promotion):
+    insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Tshala", email="kasongo.ami@unikin.cd")
+    insert_student(db, promotion['id'], "MAT2025-001-00002", last_name="Kasongo")
+    rows = found(search, "Kasongo")
+    assert rows[0] == "Kasongo"
+
+
+def test_index_follows_updates_and_deletes(db, search, promotion):
+    student_id = insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Kasongo")
+    db.execute_query("UPDATE students SET last_name = %s WHERE id = %s", ("Mbuyi", student_id))
+    assert found(search, "Kasongo") == []
+    assert found(search, "Mbuyi") == ["Mbuyi"]
+
+    db.execute_query("DELETE FROM students WHERE id = %s", (student_id,))
+    assert found(search, "Mbuyi") == []
+
+
+def test_search_keeps_the_filters(db, search, promotion):
+    other = first_promotion(db, faculty_id=9)
+    insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Kasongo Premier")
+    insert_student(db, other['id'], "MAT2025-009-00001", last_name="Kasongo Second")
+    assert found(search, "Kasongo", faculty_id=other['faculty_id']) == ["Kasongo Second"]
+    assert found(search, "Kasongo", promotion_id=promotion['id']) == ["Kasongo Premier"]
+
+
+def test_close_spellings_with_trigrams(db, search, promotion):
+    if not getattr(search, "trigram", False):
+        pytest.skip("pg_trgm uniquement")
+    insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Kasongo")
+    assert found(search, "Kasongo Postnom Prenon") == ["Kasongo"]
+
+
+def test_student_batches_follow_the_search(db, promotion):
+    for number, name in enumerate(["Kasongo", "Mbuyi", "Kasongo Deux"]):
+        insert_student(db, promotion['id'], f"MAT2025-001-{number + 1:05d}", last_name=name)
+
+    def names(batches):
+        return sorted(row['last_name'] for batch in batches for row in batch)
+
+    assert names(student_batches(db, search="kasongo")) == ["Kasongo", "Kasongo Deux"]
+    assert names(student_batches(db, {"promotion_id": promotion['id']}, batch_size=1)) == [
+        "Kasongo", "Kasongo Deux", "Mbuyi"
+    ]
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from database import SQLITE_PRAGMAS, sqlite_pragmas
+
+
+@pytest.fixture
+def sqlite_env(monkeypatch):
+    """Profil par défaut, quelles que soient les valeurs du .env"""
+    for variable, _ in SQLITE_PRAGMAS.values():
+        monkeypatch.delenv(variable, raising=False)
+
+
+@pytest.mark.parametrize("engine", ["sqlite"], indirect=True)
+def test_default_profile_is_applied(sqlite_env, connect):
+    settings = connect().sqlite_settings()
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["cache_size"] == -65536
+    assert settings["busy_timeout"] == 5000
+    assert settings["temp_store"] == 2  # MEMORY
+
+
+@pytest.mark.parametrize("engine", ["sqlite"], indirect=True)
+def test_profile_is_read_from_the_environment(sqlite_env, monkeypatch, connect):
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+    monkeypatch.setenv("SQLITE_CACHE_SIZE", "-2000")
+    db = connect(size=2)
+    settings = db.sqlite_settings()
+    assert settings["synchronous"] == 2  # FULL
+    assert settings["cache_size"] == -2000
+
+    # Chaque connexion du pool reçoit le profil : un autre thread en ouvre une seconde
+    seen = []
+    with db.connection():
+        thread = threading.Thread(target=lambda: seen.append(db.sqlite_settings()))
+        thread.start()
+        thread.join()
+    assert seen[0]["synchronous"] == 2
+    assert seen[0]["journal_mode"] == "wal"
+    assert len(db.pool._all) == 2
+
+
+@pytest.mark.parametrize("value", ["NORMAL; DROP TABLE students", "1 2", ""])
+def test_invalid_values_are_refused(sqlite_env, monkeypatch, value):
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", value)
+    with pytest.raises(ValueError, match="SQLITE_SYNCHRONOUS"):
+        sqlite_pragmas()
@@ -0,0 +1,58 @@
+import pytest
+
+import database
+from conftest import first_promotion
+from database import READ, WRITE, WRITE_RETURNING, CompiledStatement
+
+
+@pytest.mark.parametrize("query, kind", [
+    ("SELECT * FROM students", READ),
+    ("  select id from students", READ),
+    ("-- liste\n/* tri */ SELECT 1", READ),
+    ("WITH t AS (SELECT 1) SELECT * FROM t", READ),
+    ("PRAGMA journal_mode", READ),
+    ("EXPLAIN SELECT 1", READ),
+    ("WITH t AS (SELECT 1) INSERT INTO x SELECT * FROM t", WRITE),
+    ("UPDATE students SET last_name = %s", WRITE),
+    ("DELETE FROM students", WRITE),
+    ("CREATE INDEX idx ON students (last_name)", WRITE),
+    ("INSERT INTO students (last_name) VALUES (%s) RETURNING id", WRITE_RETURNING),
+    ("update students set last_name = %s returning id", WRITE_RETURNING),
+    ("", WRITE),
+])
+def test_statement_kind(query, kind):
+    assert CompiledStatement.classify(query) == kind
+
+
+def test_placeholders_follow_the_engine():
+    query = "SELECT * FROM students WHERE id = %s AND promotion_id = %s"
+    assert CompiledStatement(query, "sqlite").sql == "SELECT * FROM students WHERE id = ? AND promotion_id = ?"
+    assert CompiledStatement(query, "postgresql").sql == query
+
+
+def test_statements_are_compiled_once(db):
+    query = "SELECT id FROM faculties WHERE id = %s"
+    statement = db.compile_statement(query)
+    assert db.compile_statement(query) is statement
+    db.execute_query(query, (1,))
+    assert db.compile_statement(query) is statement
+    assert database._statement_cache[(db.db_engine, query)] is statement
+
+
+def test_cache_stays_bounded(db, monkeypatch):
+    monkeypatch.setattr(database, "STATEMENT_CACHE_SIZE", 8)
+    monkeypatch.setattr(database, "_statement_cache", {})
+    for value in range(50):
+        assert db.execute_query(f"SELECT {value} AS value")[0]['value'] == value
+        assert len(database._statement_cache) <= 8
+
+
+def test_returning_writes_are_committed(connect):
+    db, other = connect(), connect()
+    promotion_id = first_promotion(db)['id']
+    rows = db.execute_query("""
+        INSERT INTO students (last_name, postnom, first_name, registration_number, promotion_id)
+        VALUES (%s, %s, %s, %s, %s) RETURNING id, last_name
+    """, ("Kasongo", "Postnom", "Prénom", "CACHE-1", promotion_id))
+    assert rows[0]['last_name'] == "Kasongo"
+    assert other.execute_query("SELECT last_name FROM students WHERE id = %s", (rows[0]['id'],))
@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import first_promotion, insert_student
+
+
+def test_changes_since_reports_inserts_updates_and_deletes(db):
+    promotion = first_promotion(db)
+    version = db.student_changes_version()
+    kept = insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Avant")
+    removed = insert_student(db, promotion['id'], "MAT2025-001-00002")
+    db.execute_query("UPDATE students SET last_name = 'Après' WHERE id = %s", (kept,))
+    db.execute_query("DELETE FROM students WHERE id = %s", (removed,))
+
+    version, rows, deleted = db.changes_since(version)
+    assert [(row['id'], row['last_name']) for row in rows] == [(kept, "Après")]
+    assert deleted == [removed]
+
+    # Plus rien de neuf : aucune ligne (une position déjà vue peut être relue sur PostgreSQL)
+    version, rows, deleted = db.changes_since(version)
+    assert not deleted and all(row['id'] == kept for row in rows)
+
+
+def test_changes_since_gives_up_above_limit(db):
+    promotion = first_promotion(db)
+    version = db.student_changes_version()
+    for number in range(1, 5):
+        insert_student(db, promotion['id'], f"MAT2025-001-{number:05d}")
+    assert db.changes_since(version, limit=3) is None
+    assert len(db.changes_since(version, limit=4)[1]) == 4
+
+
+def test_postgresql_out_of_order_commit_is_not_missed(connect, engine):
+    if engine != "postgresql":
+        pytest.skip("SQLite valide les écritures dans l'ordre des versions")
+    slow, fast, reader = connect(), connect(), connect()
+    # Deux facultés : les compteurs d'inscriptions de la même promotion feraient attendre le second poste
+    version = reader.student_changes_version()
+
+    with slow.transaction():
+        # Version la plus basse, validée en dernier
+        slow_id = insert_student(slow, first_promotion(slow, faculty_id=2)['id'], "MAT2025-002-00001")
+        fast_id = insert_student(fast, first_promotion(fast, faculty_id=9)['id'], "MAT2025-009-00001")
+        assert slow.execute_query(
+            "SELECT MIN(version) AS version FROM student_changes WHERE student_id = %s", (slow_id,)
+        )[0]['version'] < fast.execute_query(
+            "SELECT MIN(version) AS version FROM student_changes WHERE student_id = %s", (fast_id,)
+        )[0]['version']
+
+        version, rows, _ = reader.changes_since(version)
+        assert [row['id'] for row in rows] == [fast_id]
+
+    version, rows, _ = reader.changes_since(version)
+    assert slow_id in [row['id'] for row in rows]
+
+
+class ImmediateFuture:
+    def __init__(self, function, args):
+        self.function, self.args = function, args
+
+    def then(self, on_finished, on_failed=None):
+        on_finished(self.function(*self.args))
+        return self
+
+
+class ImmediateExecutor:
+    """Exécute les soumissions tout de suite, sur le thread courant"""
+
+    def submit(self, function, *args, key=None):
+        return ImmediateFuture(function, args)
+
+
+def test_model_applies_changes_in_place(db):
+    from ui_main_window import StudentsTableModel
+
+    promotion = first_promotion(db)
+    ids = [insert_student(db, promotion['id'], f"MAT2025-001-{number:05d}", last_name=name)
+           for number, name in enumerate(("Bola", "Dibwe", "Ilunga"), 1)]
+    model = StudentsTableModel(db, ImmediateExecutor())
+    assert [student['last_name'] for student in model.students] == ["Bola", "Dibwe", "Ilunga"]
+
+    db.execute_query("UPDATE students SET last_name = 'Zola' WHERE id = %s", (ids[0],))
+    db.execute_query("DELETE FROM students WHERE id = %s", (ids[1],))
+    added = insert_student(db, promotion['id'], "MAT2025-001-00004", last_name="Amisi")
+    model.apply_changes(*db.changes_since(model.change_version))
+
+    assert [student['last_name'] for student in model.students] == ["Amisi", "Ilunga", "Zola"]
+    assert model.ids == {ids[0], ids[2], added}
@@ -0,0 +1,38 @@
+import csv
+import json
+
+from conftest import first_promotion, insert_student
+from student_export import export_students
+
+
+def exported_names(path):
+    if path.suffix == ".jsonl":
+        return [json.loads(line)["last_name"] for line in path.read_text(encoding="utf-8").splitlines()]
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        return [row["Nom"] for row in csv.DictReader(handle)]
+
+
+def test_export_follows_filters_and_search(db, tmp_path):
+    promotion = first_promotion(db)
+    other = first_promotion(db, faculty_id=9)
+    insert_student(db, promotion['id'], "EXP-1", last_name="Kasongo")
+    insert_student(db, promotion['id'], "EXP-2", last_name="Mbuyi")
+    insert_student(db, other['id'], "EXP-3", last_name="Kasongo Autre")
+
+    progress = []
+    path = tmp_path / "tous.csv"
+    assert export_students(db, str(path), progress=progress.append, batch_size=2) == 3
+    assert exported_names(path) == ["Kasongo", "Kasongo Autre", "Mbuyi"]
+    assert progress == [2, 3]
+
+    path = tmp_path / "faculte.jsonl"
+    assert export_students(db, str(path), {"faculty_id": promotion['faculty_id']}) == 2
+    assert exported_names(path) == ["Kasongo", "Mbuyi"]
+
+    # Recherche active : seulement les lignes affichées
+    path = tmp_path / "recherche.csv"
+    assert export_students(db, str(path), {"faculty_id": promotion['faculty_id']}, search="kasongo") == 1
+    assert exported_names(path) == ["Kasongo"]
+    path = tmp_path / "aucun.csv"
+    assert export_students(db, str(path), search="Ilunga") == 0
+    assert exported_names(path) == []
@@ -0,0 +1,116 @@
+import csv
+
+import pytest
+
+import reference_cache
+from conftest import first_promotion, insert_student
+from registration_numbers import format_registration_number
+from student_import import StudentImporter
+
+HEADER = ["nom", "postnom", "prenom", "email", "matricule", "faculte", "departement", "promotion", "annee"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_reference_cache(monkeypatch):
+    # Le cache partagé garde la base du premier appel : un cache neuf par test
+    monkeypatch.setattr(reference_cache, "_shared_cache", None)
+
+
+@pytest.fixture
+def promotion(db):
+    return first_promotion(db)
+
+
+def write_csv(path, promotion, rows):
+    """Écrit un fichier d'import ; chaque ligne est (nom, email, matricule)"""
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADER)
+        for last_name, email, registration_number in rows:
+            writer.writerow([last_name, "Postnom", "Prénom", email or "", registration_number or "",
+                             promotion['faculty_name'], promotion['department_name'],
+                             promotion['name'], promotion['year']])
+    return path
+
+
+def imported_names(db):
+    return {row['last_name'] for row in db.execute_query("SELECT last_name FROM students")}
+
+
+def test_invalid_rows_are_reported_and_skipped(db, promotion, tmp_path):
+    path = write_csv(tmp_path / "import.csv", promotion, [
+        ("Kasongo", "kasongo@unikin.cd", "IMP-001"),
+        ("", None, None),                                    # nom manquant
+        ("Mbuyi", "pas-un-email", None),                     # email invalide
+        ("Ilunga", "ilunga@unikin.cd", "IMP-001"),           # matricule en double dans le fichier
+        ("Tshala", "KASONGO@unikin.cd", None),               # email en double (casse ignorée)
+        ("Lukusa", None, None),
+    ])
+    path.write_text(path.read_text(encoding="utf-8")
+                    + "Kalala,Postnom,Prénom,,,Faculté inconnue,X,Y,2025\n", encoding="utf-8")
+
+    report = StudentImporter(db, batch_size=2).import_file(str(path))
+
+    assert (report.total_rows, report.inserted, report.rejected) == (7, 2, 5)
+    assert [line for line, _ in report.errors] == [3, 4, 5, 6, 8]
+    assert "Matricule déjà utilisé" in report.errors[2][1]
+    assert "Promotion introuvable" in report.errors[4][1]
+    assert imported_names(db) == {"Kasongo", "Lukusa"}
+
+
+def test_existing_students_are_duplicates(db, promotion, tmp_path):
+    insert_student(db, promotion['id'], "IMP-001", last_name="Existant", email="existant@unikin.cd")
+    path = write_csv(tmp_path / "import.csv", promotion, [
+        ("Kasongo", None, "imp-001"),
+        ("Mbuyi", "Existant@UNIKIN.cd", None),
+        ("Lukusa", None, None),
+    ])
+
+    report = StudentImporter(db).import_file(str(path))
+
+    assert (report.inserted, report.rejected) == (1, 2)
+    assert imported_names(db) == {"Existant", "Lukusa"}
+
+
+def test_rejected_row_does_not_undo_its_batch(db, promotion, tmp_path):
+    importer = StudentImporter(db, batch_size=10)
+    load_lookups = importer.load_lookups
+
+    def load_then_insert_concurrently():
+        load_lookups()
+        # Saisi sur un autre poste après le chargement des matricules existants
+        insert_student(db, promotion['id'], "IMP-002", last_name="Concurrent")
+
+    importer.load_lookups = load_then_insert_concurrently
+    path = write_csv(tmp_path / "import.csv", promotion, [
+        ("Kasongo", None, "IMP-001"),
+        ("Mbuyi", None, "IMP-002"),
+        ("Lukusa", None, "IMP-003"),
+    ])
+
+    report = importer.import_file(str(path))
+
+    assert report.inserted == 2
+    assert [line for line, _ in report.errors] == [3]
+    assert report.errors[0][1].startswith("Refusée par la base")
+    assert imported_names(db) == {"Concurrent", "Kasongo", "Lukusa"}
+
+
+def test_missing_registration_numbers_are_allocated(db, promotion, tmp_path):
+    first = format_registration_number(promotion['year'], promotion['faculty_id'], 1)
+    second = format_registration_number(promotion['year'], promotion['faculty_id'], 2)
+    path = write_csv(tmp_path / "import.csv", promotion, [
+        ("Kasongo", None, None),
+        # Déjà attribué au lot précédent : refusé avant d'atteindre la base
+        ("Mbuyi", None, first),
+        ("Lukusa", None, None),
+    ])
+
+    report = StudentImporter(db, batch_size=1).import_file(str(path))
+
+    assert report.inserted == 2
+    assert report.errors == [(3, f"Matricule déjà utilisé : {first}")]
+    numbers = db.execute_query("SELECT last_name, registration_number FROM students ORDER BY last_name")
+    assert [(row['last_name'], row['registration_number']) for row in numbers] == [
+        ("Kasongo", first), ("Lukusa", second)
+    ]
@@ -0,0 +1,84 @@
+import pytest
+
+from conftest import first_promotion, insert_student
+from migrations import STUDENT_LISTING_SELECT, convert_student_listing_view
+
+
+def listing(db, student_id):
+    rows = db.execute_query("SELECT * FROM student_listing WHERE id = %s", (student_id,))
+    return rows[0] if rows else None
+
+
+def test_listing_follows_student_writes(db):
+    promotion = first_promotion(db)
+    student_id = insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Kasongo")
+    row = listing(db, student_id)
+    assert row['last_name'] == "Kasongo"
+    assert row['promotion_name'] == promotion['name']
+    assert row['faculty_name'] == promotion['faculty_name']
+
+    db.execute_query("UPDATE students SET last_name = %s WHERE id = %s", ("Mbuyi", student_id))
+    assert listing(db, student_id)['last_name'] == "Mbuyi"
+
+    db.execute_query("DELETE FROM students WHERE id = %s", (student_id,))
+    assert listing(db, student_id) is None
+
+
+def test_listing_follows_reference_renames(db):
+    promotion = first_promotion(db)
+    student_id = insert_student(db, promotion['id'], "MAT2025-001-00001")
+    other_id = insert_student(db, first_promotion(db, faculty_id=9)['id'], "MAT2025-009-00001")
+
+    db.execute_query("UPDATE promotions SET name = %s WHERE id = %s", ("Promotion renommée", promotion['id']))
+    db.execute_query("UPDATE departments SET name = %s WHERE id = %s", ("Département renommé", promotion['department_id']))
+    db.execute_query("UPDATE faculties SET name = %s WHERE id = %s", ("Faculté renommée", promotion['faculty_id']))
+
+    row = listing(db, student_id)
+    assert (row['promotion_name'], row['department_name'], row['faculty_name']) == (
+        "Promotion renommée", "Département renommé", "Faculté renommée"
+    )
+    assert listing(db, other_id)['faculty_name'] != "Faculté renommée"
+
+
+def test_listing_matches_its_definition(db):
+    promotion = first_promotion(db)
+    for number in range(1, 6):
+        insert_student(db, promotion['id'], f"MAT2025-001-{number:05d}", last_name=f"Nom {number}")
+    expected = [tuple(row) for row in db.execute_query(STUDENT_LISTING_SELECT + " ORDER BY s.id")]
+    assert [tuple(row) for row in db.execute_query("SELECT * FROM student_listing ORDER BY id")] == expected
+
+
+def test_postgresql_writers_do_not_block_each_other(connect, engine):
+    if engine != "postgresql":
+        pytest.skip("SQLite n'a qu'un seul écrivain à la fois")
+    first, second = connect(), connect()
+    promotion = first_promotion(first)
+    ids = [insert_student(first, promotion['id'], f"MAT2025-001-{number:05d}") for number in (1, 2)]
+
+    with first.transaction():
+        first.execute_query("UPDATE students SET last_name = 'A' WHERE id = %s", (ids[0],))
+        # Chaque poste ne verrouille que ses lignes : le second n'attend pas le premier
+        with second.transaction():
+            second.execute_query("SET LOCAL lock_timeout = '2s'")
+            second.execute_query("UPDATE students SET last_name = 'B' WHERE id = %s", (ids[1],))
+        assert listing(second, ids[1])['last_name'] == "B"
+    assert listing(second, ids[0])['last_name'] == "A"
+
+
+def test_postgresql_materialized_view_is_converted(db, engine):
+    if engine != "postgresql":
+        pytest.skip("La vue matérialisée n'existait que sur PostgreSQL")
+    promotion = first_promotion(db)
+    student_id = insert_student(db, promotion['id'], "MAT2025-001-00001", last_name="Avant")
+
+    # Schéma d'avant la migration 9
+    with db.transaction() as cursor:
+        cursor.execute("DROP TABLE student_listing")
+        cursor.execute(f"CREATE MATERIALIZED VIEW student_listing AS {STUDENT_LISTING_SELECT}")
+    with db.transaction() as cursor:
+        convert_student_listing_view(db, cursor)
+
+    assert db.execute_query("SELECT relkind FROM pg_class WHERE relname = 'student_listing'")[0]['relkind'] == "r"
+    assert listing(db, student_id)['last_name'] == "Avant"
+    db.execute_query("UPDATE students SET last_name = 'Après' WHERE id = %s", (student_id,))
+    assert listing(db, student_id)['last_name'] == "Après"
@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import first_promotion, insert_student
+from database import STUDENT_SORT_KEYS
+
+# Noms répétés : la pagination doit départager les ex-æquo par l'id
+NAMES = ["Kasongo", "Mbuyi", "Ilunga", "Kasongo", "Tshala", "Mbuyi", "Kasongo", "Lukusa"]
+
+
+@pytest.fixture
+def students(db):
+    promotions = [first_promotion(db), first_promotion(db, faculty_id=9)]
+    for index, name in enumerate(NAMES * 3):
+        promotion = promotions[index % 2]
+        insert_student(db, promotion['id'], f"PAGE-{(index * 7) % 24:03d}-{index}", last_name=name)
+    return promotions
+
+
+def all_pages(db, limit, after=None, **options):
+    """Lit la liste page par page à partir de ``after``"""
+    rows = []
+    while True:
+        page = db.fetch_students_page(after=after, limit=limit, **options)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows
+        after = db.students_page_key(page[-1], options.get("sort_key", "name"))
+
+
+def expected_ids(db, sort_key="name", descending=False, **filters):
+    direction = " DESC" if descending else ""
+    order_by = ", ".join(column + direction for column in STUDENT_SORT_KEYS[sort_key])
+    query, params = db.build_students_query(order_by=order_by, **filters)
+    return [row['id'] for row in db.execute_query(query, params)]
+
+
+@pytest.mark.parametrize("sort_key", sorted(STUDENT_SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_the_list_once_in_order(db, students, sort_key, descending):
+    for limit in (1, 5, 24, 50):
+        rows = all_pages(db, limit, sort_key=sort_key, descending=descending)
+        assert [row['id'] for row in rows] == expected_ids(db, sort_key, descending)
+
+
+def test_pages_keep_the_filters(db, students):
+    faculty_id = students[1]['faculty_id']
+    rows = all_pages(db, 5, faculty_id=faculty_id)
+    assert len(rows) == len(NAMES * 3) // 2
+    assert {row['faculty_id'] for row in rows} == {faculty_id}
+    assert [row['id'] for row in rows] == expected_ids(db, faculty_id=faculty_id)
+
+
+def test_rows_added_between_pages(db, students):
+    first = db.fetch_students_page(limit=10)
+    after = db.students_page_key(first[-1])
+    promotion_id = students[0]['id']
+    # Avant la position courante : hors des pages suivantes ; après : incluse
+    insert_student(db, promotion_id, "PAGE-AVANT", last_name="Aaa")
+    late_id = insert_student(db, promotion_id, "PAGE-APRES", last_name="Zzz")
+
+    rest = all_pages(db, 10, after=after)
+    ids = [row['id'] for row in first + rest]
+    assert len(ids) == len(set(ids)) == len(NAMES * 3) + 1
+    assert ids[-1] == late_id
+
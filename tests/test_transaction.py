@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from conftest import first_promotion, insert_student
+
+
+def names(db):
+    return sorted(row['last_name'] for row in db.execute_query("SELECT last_name FROM students"))
+
+
+@pytest.fixture
+def promotion_id(db):
+    return first_promotion(db)['id']
+
+
+def test_block_commits_once_at_the_end(connect, db, promotion_id):
+    other = connect()
+    with db.transaction():
+        insert_student(db, promotion_id, "TX-1", last_name="Kasongo")
+        insert_student(db, promotion_id, "TX-2", last_name="Mbuyi")
+        assert names(db) == ["Kasongo", "Mbuyi"]
+        # Un autre poste ne voit rien avant la fin du bloc
+        assert names(other) == []
+    assert names(other) == ["Kasongo", "Mbuyi"]
+
+
+def test_exception_rolls_back_the_block(db, promotion_id):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            insert_student(db, promotion_id, "TX-1", last_name="Kasongo")
+            raise RuntimeError("annulé")
+    assert names(db) == []
+
+
+def test_nested_failure_only_undoes_its_savepoint(db, promotion_id):
+    with db.transaction():
+        insert_student(db, promotion_id, "TX-1", last_name="Kasongo")
+        with pytest.raises(Exception):
+            with db.transaction():
+                insert_student(db, promotion_id, "TX-2", last_name="Mbuyi")
+                # Matricule en double : la contrainte UNIQUE échoue
+                insert_student(db, promotion_id, "TX-1", last_name="Lukusa")
+        with db.transaction():
+            insert_student(db, promotion_id, "TX-3", last_name="Ilunga")
+            with db.transaction():
+                insert_student(db, promotion_id, "TX-4", last_name="Tshala")
+    assert names(db) == ["Ilunga", "Kasongo", "Tshala"]
+
+
+def test_outer_failure_undoes_released_savepoints(db, promotion_id):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            with db.transaction():
+                insert_student(db, promotion_id, "TX-1", last_name="Kasongo")
+            raise RuntimeError("annulé")
+    assert names(db) == []
+
+
+def test_executemany_is_all_or_nothing(db, promotion_id):
+    rows = [("Kasongo", "TX-1"), ("Mbuyi", "TX-2"), ("Lukusa", "TX-1")]
+    with pytest.raises(Exception):
+        db.executemany("""
+            INSERT INTO students (last_name, postnom, first_name, registration_number, promotion_id)
+            VALUES (%s, 'Postnom', 'Prénom', %s, %s)
+        """, [(name, number, promotion_id) for name, number in rows])
+    assert names(db) == []
+
+
+def test_nested_borrows_share_the_thread_connection(db):
+    pool = db.pool
+    outer = pool.acquire()
+    try:
+        inner = pool.acquire()
+        assert inner is outer
+        pool.release(inner)
+
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(pool.acquire()))
+        thread.start()
+        thread.join()
+        assert seen[0] is not outer
+        # Seul le thread qui l'a empruntée peut la rendre
+        with pytest.raises(RuntimeError):
+            pool.release(seen[0])
+    finally:
+        pool.release(outer)
+
+
+def test_exhausted_pool_times_out(connect):
+    db = connect(size=1, timeout=0.2)
+    borrowed = threading.Event()
+    done = threading.Event()
+
+    def hold():
+        with db.connection():
+            borrowed.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    try:
+        borrowed.wait(5)
+        with pytest.raises(RuntimeError, match="Aucune connexion disponible"):
+            db.execute_query("SELECT 1")
+    finally:
+        done.set()
+        thread.join()
+    assert db.execute_query("SELECT 1 AS one")[0]['one'] == 1
+
+
+def test_failed_start_leaves_no_transaction_behind(connect):
+    db, other = connect(), connect()
+    pool = db.pool
+    connection = pool.acquire()
+    # Connexion perdue : cursor() échoue à l'ouverture du bloc
+    connection.close()
+    with pytest.raises(Exception):
+        with db.transaction():
+            pass
+    assert not pool.in_transaction()
+    pool.release(connection)
+
+    if db.db_engine == "postgresql":
+        # La connexion fermée a quitté le pool : l'écriture suivante est validée
+        insert_student(db, first_promotion(db)['id'], "TX-1", last_name="Kasongo")
+        assert names(other) == ["Kasongo"]
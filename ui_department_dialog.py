@@ -3,11 +3,16 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
                                QHeaderView, QGroupBox, QComboBox)
 from PySide6.QtCore import Qt, QAbstractTableModel
 from database import Database
+from query_executor import get_query_executor
+from reference_cache import get_reference_cache
 
 class DepartmentDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db=None, executor=None):
         super().__init__(parent)
-        self.db = Database()
+        self.db = db or Database()
+        self.executor = executor or get_query_executor()
+        self.reference = get_reference_cache(self.db)
+        self.modified = False
         self.setup_ui()
         self.load_data()
 
@@ -59,18 +64,24 @@ class DepartmentDialog(QDialog):
         self.load_faculties()
 
     def load_faculties(self):
-        faculties = self.db.execute_query("SELECT id, name FROM faculties ORDER BY name")
+        self.executor.submit(self.reference.load, key=(id(self), "faculties")).then(
+            self.on_faculties_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        )
+
+    def on_faculties_loaded(self, reference):
         self.faculty_combo.clear()
-        for faculty in faculties:
+        for faculty in reference.faculties():
             self.faculty_combo.addItem(faculty['name'], faculty['id'])
 
     def load_data(self):
-        departments = self.db.execute_query("""
-            SELECT d.id, d.name, d.code, f.name as faculty_name 
-            FROM departments d 
-            JOIN faculties f ON d.faculty_id = f.id 
-            ORDER BY f.name, d.name
-        """)
+        self.executor.submit(self.reference.load, key=(id(self), "table")).then(
+            self.on_data_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        )
+
+    def on_data_loaded(self, reference):
+        departments = sorted(reference.departments(), key=lambda d: (d['faculty_name'], d['name']))
         self.model = DepartmentsTableModel(departments)
         self.departments_table.setModel(self.model)
         self.departments_table.resizeColumnsToContents()
@@ -89,6 +100,8 @@ class DepartmentDialog(QDialog):
                 "INSERT INTO departments (name, code, faculty_id) VALUES (%s, %s, %s)",
                 (name, code, faculty_id)
             )
+            self.reference.invalidate()
+            self.modified = True
             self.load_data()
             self.name_edit.clear()
             self.code_edit.clear()
@@ -110,6 +123,8 @@ class DepartmentDialog(QDialog):
         if reply == QMessageBox.Yes:
             try:
                 self.db.execute_query("DELETE FROM departments WHERE id = %s", (department_id,))
+                self.reference.invalidate()
+                self.modified = True
                 self.load_data()
                 QMessageBox.information(self, "Succès", "Département supprimé avec succès!")
             except Exception as e:
@@ -3,11 +3,16 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
                                QHeaderView, QGroupBox)
 from PySide6.QtCore import Qt, QAbstractTableModel
 from database import Database
+from query_executor import get_query_executor
+from reference_cache import get_reference_cache
 
 class FacultyDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db=None, executor=None):
         super().__init__(parent)
-        self.db = Database()
+        self.db = db or Database()
+        self.executor = executor or get_query_executor()
+        self.reference = get_reference_cache(self.db)
+        self.modified = False
         self.setup_ui()
         self.load_data()
 
@@ -54,8 +59,13 @@ class FacultyDialog(QDialog):
         self.close_button.clicked.connect(self.accept)
 
     def load_data(self):
-        faculties = self.db.execute_query("SELECT id, name, code FROM faculties ORDER BY name")
-        self.model = FacultiesTableModel(faculties)
+        self.executor.submit(self.reference.load, key=(id(self), "table")).then(
+            self.on_data_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        )
+
+    def on_data_loaded(self, reference):
+        self.model = FacultiesTableModel(reference.faculties())
         self.faculties_table.setModel(self.model)
         self.faculties_table.resizeColumnsToContents()
 
@@ -72,6 +82,8 @@ class FacultyDialog(QDialog):
                 "INSERT INTO faculties (name, code) VALUES (%s, %s)",
                 (name, code)
             )
+            self.reference.invalidate()
+            self.modified = True
             self.load_data()
             self.name_edit.clear()
             self.code_edit.clear()
@@ -93,6 +105,8 @@ class FacultyDialog(QDialog):
         if reply == QMessageBox.Yes:
             try:
                 self.db.execute_query("DELETE FROM faculties WHERE id = %s", (faculty_id,))
+                self.reference.invalidate()
+                self.modified = True
                 self.load_data()
                 QMessageBox.information(self, "Succès", "Faculté supprimée avec succès!")
             except Exception as e:
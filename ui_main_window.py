@@ -4,12 +4,16 @@ from PySide6.QtWidgets import (
     QTabWidget, QGroupBox, QFormLayout, QLineEdit,
     QSpinBox, QComboBox, QLabel, QToolBar, QStatusBar,
     QSplitter, QGridLayout, QFrame, QSizePolicy, QApplication,
-    QFileDialog, QScrollArea, QScrollBar, QSizeGrip, QAbstractItemView
+    QFileDialog, QScrollArea, QScrollBar, QSizeGrip, QAbstractItemView, QDockWidget,
+    QInputDialog, QMenu
 )
-from PySide6.QtCore import Qt, QAbstractTableModel, Signal, QSettings, QSize, QTimer
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal, QSettings, QSize, QTimer
 from PySide6.QtGui import QAction, QIcon, QPixmap, QColor, QPalette, QFont, QFontDatabase
 import os
 import sys
+from datetime import datetime
+from itertools import chain
+from bisect import bisect_left
 from database import Database
 from models import Student
 from ui_student_dialog import StudentDialog
@@ -17,6 +21,16 @@ from ui_faculty_dialog import FacultyDialog
 from ui_department_dialog import DepartmentDialog
 from ui_promotion_dialog import PromotionDialog
 from pdf_generator import PDFGenerator
+from student_import import StudentImporter
+from student_export import export_students
+from search import get_student_search, student_batches, SEARCH_LIMIT
+from query_executor import get_query_executor
+from reference_cache import get_reference_cache
+from enrollment_stats import enrollment_statistics
+from ui_statistics_panel import StatisticsPanel
+from ui_query_profiler_dialog import QueryProfilerDialog
+from backup import create_backup, DEFAULT_DESTINATION
+from registration_numbers import next_registration_number, note_registration_numbers
 from image_utils import ImageUtils
 
 class ModernScrollBar(QScrollBar):
@@ -61,10 +75,185 @@ class ModernScrollBar(QScrollBar):
 
 
 class StudentsTableModel(QAbstractTableModel):
-    def __init__(self, students):
+    """Liste des étudiants chargée page par page (pagination par clé)"""
+
+    PAGE_SIZE = 200
+    # Colonnes triables et clé de tri correspondante dans Database
+    SORT_COLUMNS = {0: "id", 2: "name", 7: "registration_number"}
+
+    page_loaded = Signal(int, bool)  # nombre de lignes chargées, reste-t-il des pages
+    load_failed = Signal(str)
+
+    def __init__(self, db, executor, filters=None, search=None, search_engine=None):
         super().__init__()
-        self.students = students
+        self.db = db
+        self.executor = executor
+        self.filters = filters or {}
+        self.search = search
+        self.search_engine = search_engine
+        self.sort_key = "name"
+        self.descending = False
+        self.students = []
+        self.ids = set()
+        self.change_version = None  # version du journal au chargement de la première page
+        self.has_more = True
+        self.fetching = False
         self.headers = ["ID", "Photo", "Nom", "Postnom", "Prénom", "Email", "Téléphone", "Matricule", "Promotion", "Faculté", "Département"]
+        self.load_page()
+
+    def load_page(self):
+        """Demande en arrière-plan la page suivant la dernière ligne affichée.
+
+        Toutes les listes partagent la clé « students » : une nouvelle liste
+        (changement de filtre) ou un nouveau tri annule la requête précédente.
+        """
+        if self.fetching:
+            return
+        self.fetching = True
+
+        after = self.db.students_page_key(self.students[-1], self.sort_key) if self.students else None
+        future = self.executor.submit(self.fetch_page, after, not self.students, key="students")
+        future.then(self.on_page_received, self.on_page_failed)
+
+    def fetch_page(self, after, first_page):
+        """Exécuté en arrière-plan : (version du journal ou None, lignes de la page).
+
+        La version est lue avant la première page : les modifications faites
+        pendant le chargement seront retrouvées par ``Database.changes_since``.
+        """
+        version = self.db.student_changes_version(use_read_pool=True) if first_page else None
+        if self.search:
+            # Résultats de recherche : une seule page, triée par pertinence
+            page = self.search_engine.search(self.search, limit=SEARCH_LIMIT, **self.filters)
+        else:
+            page = self.db.fetch_students_page(
+                sort_key=self.sort_key, descending=self.descending,
+                after=after, limit=self.PAGE_SIZE, **self.filters
+            )
+        return version, page
+
+    def on_page_received(self, result):
+        version, page = result
+        self.fetching = False
+        if version is not None:
+            self.change_version = version
+        self.has_more = not self.search and len(page) == self.PAGE_SIZE
+        # Une ligne déjà insérée par apply_changes peut revenir dans une page
+        page = [student for student in page if student['id'] not in self.ids]
+        if page:
+            first = len(self.students)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.students.extend(page)
+            self.ids.update(student['id'] for student in page)
+            self.endInsertRows()
+        self.page_loaded.emit(len(self.students), self.has_more)
+
+    def apply_changes(self, version, rows, deleted_ids):
+        """Applique au tableau les étudiants ajoutés, modifiés ou supprimés
+        (voir ``Database.changes_since``) sans recharger la liste"""
+        self.change_version = max(version, self.change_version or 0)
+        self.remove_students(deleted_ids)
+
+        for student in rows:
+            row = self.row_of(student['id'])
+            if row is not None and self.matches(student) and (
+                    self.search or self.sort_position(student, exclude=row) == row):
+                # Même place dans la liste : mise à jour sur place
+                self.students[row] = student
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount(None) - 1))
+                continue
+
+            self.remove_student(student['id'])
+            if self.search or not self.matches(student):
+                continue
+            position = self.sort_position(student)
+            if position == len(self.students) and self.has_more:
+                continue  # Arrivera avec une page suivante
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.students.insert(position, student)
+            self.ids.add(student['id'])
+            self.endInsertRows()
+
+    def row_of(self, student_id):
+        if student_id not in self.ids:
+            return None
+        for row, student in enumerate(self.students):
+            if student['id'] == student_id:
+                return row
+        return None
+
+    def remove_student(self, student_id):
+        row = self.row_of(student_id)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.students[row]
+            self.ids.discard(student_id)
+            self.endRemoveRows()
+
+    def remove_students(self, student_ids):
+        """Retire plusieurs étudiants en un seul parcours, par plages de lignes contiguës"""
+        removed = self.ids.intersection(student_ids)
+        if not removed:
+            return
+        rows = [row for row, student in enumerate(self.students) if student['id'] in removed]
+        # De la fin vers le début : les numéros des plages restantes ne changent pas
+        end = len(rows) - 1
+        while end >= 0:
+            start = end
+            while start > 0 and rows[start - 1] == rows[start] - 1:
+                start -= 1
+            self.beginRemoveRows(QModelIndex(), rows[start], rows[end])
+            del self.students[rows[start]:rows[end] + 1]
+            self.endRemoveRows()
+            end = start - 1
+        self.ids -= removed
+
+    def matches(self, student):
+        """Vrai si l'étudiant correspond aux filtres de la liste"""
+        return all(
+            value in (None, -1) or student[name] == value
+            for name, value in self.filters.items()
+        )
+
+    def sort_position(self, student, exclude=None):
+        """Place de l'étudiant dans la liste triée (en ignorant la ligne ``exclude``)"""
+        key = self.db.students_page_key(student, self.sort_key)
+        keys = [
+            self.db.students_page_key(other, self.sort_key)
+            for row, other in enumerate(self.students) if row != exclude
+        ]
+        if self.descending:
+            position = next((i for i, other in enumerate(keys) if other < key), len(keys))
+        else:
+            position = bisect_left(keys, key)
+        return position
+
+    def on_page_failed(self, error):
+        self.fetching = False
+        self.has_more = False
+        self.load_failed.emit(str(error))
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.has_more and not self.fetching
+
+    def fetchMore(self, parent):
+        if not parent.isValid():
+            self.load_page()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        sort_key = self.SORT_COLUMNS.get(column)
+        descending = order == Qt.DescendingOrder
+        if self.search or sort_key is None or (sort_key, descending) == (self.sort_key, self.descending):
+            return
+        self.beginResetModel()
+        self.sort_key = sort_key
+        self.descending = descending
+        self.students = []
+        self.ids = set()
+        self.has_more = True
+        self.fetching = False  # la requête en cours sera remplacée
+        self.endResetModel()
+        self.load_page()
 
     def rowCount(self, parent):
         return len(self.students)
@@ -128,15 +317,25 @@ class StudentsTableModel(QAbstractTableModel):
 
 class MainWindow(QMainWindow):
     theme_changed = Signal(str)
+    # Émis depuis les traitements en arrière-plan, affiché dans la barre d'état
+    progress_message = Signal(str)
     
     def __init__(self):
         super().__init__()
         self.db = Database()
-        self.pdf_generator = PDFGenerator()
-        self.loading_data = False
-        self.current_student_id = None
+        self.pdf_generator = PDFGenerator(db=self.db)
+        self.student_search = get_student_search(self.db)
+        self.executor = get_query_executor()
+        self.reference = get_reference_cache(self.db)
+        self.columns_sized = False
+        # Actions qui portent sur un seul étudiant sélectionné, ou sur au moins un
+        self.single_selection_actions = []
+        self.selection_actions = []
+        # Traitements longs en cours (import, export, impression) : un seul de chaque à la fois
+        self.running_jobs = set()
         self.settings = QSettings("UniversiteUNIKIN", "GestionEtudiants")
         self.setup_ui()
+        self.update_selection_actions()
         self.load_settings()
         self.load_data()
         self.setup_theme_handler()
@@ -171,6 +370,9 @@ class MainWindow(QMainWindow):
         # Configuration des boutons d'action
         self.setup_action_buttons(main_layout)
         
+        # Panneau des statistiques (masqué par défaut)
+        self.setup_statistics_dock()
+        
         # Configuration du menu
         self.setup_menu()
         
@@ -206,7 +408,7 @@ class MainWindow(QMainWindow):
             ("✏️ Modifier", "edit_student", self.edit_student, "Ctrl+E"),
             ("🗑️ Supprimer", "delete_student", self.delete_student, "Del"),
             ("🖨️ Imprimer", "print_list", self.print_students_list, "Ctrl+P"),
-            ("🔄 Actualiser", "refresh", self.load_data, "F5"),
+            ("🔄 Actualiser", "refresh", self.refresh_data, "F5"),
         ]
         
         for text, icon_name, callback, shortcut in actions:
@@ -214,6 +416,7 @@ class MainWindow(QMainWindow):
             action.triggered.connect(callback)
             action.setShortcut(shortcut)
             toolbar.addAction(action)
+            self.register_selection_action(action, callback)
             
         toolbar.addSeparator()
         
@@ -233,6 +436,7 @@ class MainWindow(QMainWindow):
         """)
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Prêt")
+        self.progress_message.connect(self.statusBar.showMessage)
 
     def setup_filters(self, parent_layout):
         filter_group = QGroupBox("🔍 Filtres de Recherche")
@@ -266,6 +470,18 @@ class MainWindow(QMainWindow):
         reset_btn.clicked.connect(self.reset_filters)
         reset_btn.setFixedWidth(120)
         filter_layout.addWidget(reset_btn, 0, 6, 1, 2)
+
+        # Recherche par nom, postnom, matricule ou email
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Nom, postnom, prénom, matricule ou email...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)  # attendre la fin de la frappe
+        self.search_timer.timeout.connect(self.on_filter_changed)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        filter_layout.addWidget(QLabel("🔎 Rechercher:"), 1, 0)
+        filter_layout.addWidget(self.search_edit, 1, 1, 1, 5)
         
         parent_layout.addWidget(filter_group)
 
@@ -299,7 +515,7 @@ class MainWindow(QMainWindow):
     def setup_students_table(self):
         self.students_table = QTableView()
         self.students_table.setSelectionBehavior(QTableView.SelectRows)
-        self.students_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.students_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.students_table.setAlternatingRowColors(True)
         self.students_table.setSortingEnabled(True)
         self.students_table.verticalHeader().setDefaultSectionSize(60)
@@ -307,7 +523,8 @@ class MainWindow(QMainWindow):
         self.students_table.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.students_table.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.students_table.doubleClicked.connect(self.view_student_details)
-        self.students_table.clicked.connect(self.on_student_selected)
+        self.students_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.students_table.customContextMenuRequested.connect(self.show_students_menu)
         
         # Configuration des colonnes
         self.students_table.horizontalHeader().setStretchLastSection(True)
@@ -450,6 +667,7 @@ class MainWindow(QMainWindow):
             btn.setProperty("class", style)
             btn.setMinimumHeight(35)
             action_layout.addWidget(btn)
+            self.register_selection_action(btn, callback)
         
         self.details_layout.addLayout(action_layout)
 
@@ -461,7 +679,7 @@ class MainWindow(QMainWindow):
             ("➕ Ajouter", self.add_student, "primary"),
             ("✏️ Modifier", self.edit_student, "secondary"),
             ("🗑️ Supprimer", self.delete_student, "danger"),
-            ("🔄 Actualiser", self.load_data, "default"),
+            ("🔄 Actualiser", self.refresh_data, "default"),
             ("🖨️ Imprimer PDF", self.print_students_list, "success"),
         ]
         
@@ -472,9 +690,19 @@ class MainWindow(QMainWindow):
             btn.setMinimumHeight(40)
             btn.setMinimumWidth(120)
             buttons_layout.addWidget(btn)
+            self.register_selection_action(btn, callback)
         
         parent_layout.addLayout(buttons_layout)
 
+    def setup_statistics_dock(self):
+        self.statistics_panel = StatisticsPanel()
+        self.statistics_dock = QDockWidget("📊 Statistiques d'inscription", self)
+        self.statistics_dock.setObjectName("statistics_dock")
+        self.statistics_dock.setWidget(self.statistics_panel)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.statistics_dock)
+        self.statistics_dock.hide()
+        self.statistics_dock.visibilityChanged.connect(self.on_statistics_visibility_changed)
+
     def setup_menu(self):
         menubar = self.menuBar()
         menubar.setStyleSheet("""
@@ -495,6 +723,10 @@ class MainWindow(QMainWindow):
         
         # Menu Fichier
         file_menu = menubar.addMenu("📁 Fichier")
+        file_menu.addAction("📥 Importer des étudiants (CSV/XLSX)...", self.import_students)
+        file_menu.addAction("📤 Exporter la liste (CSV/JSONL)...", self.export_students)
+        file_menu.addAction("💾 Sauvegarder la base et les photos...", self.backup_data)
+        file_menu.addSeparator()
         exit_action = QAction("🚪 Quitter", self)
         exit_action.setShortcut("Ctrl+Q")
         exit_action.triggered.connect(self.close)
@@ -503,8 +735,11 @@ class MainWindow(QMainWindow):
         # Menu Édition
         edit_menu = menubar.addMenu("✏️ Édition")
         edit_menu.addAction("➕ Ajouter étudiant", self.add_student)
-        edit_menu.addAction("✏️ Modifier étudiant", self.edit_student)
-        edit_menu.addAction("🗑️ Supprimer étudiant", self.delete_student)
+        for text, callback in (("✏️ Modifier étudiant", self.edit_student),
+                               ("🗑️ Supprimer étudiant", self.delete_student),
+                               ("🎓 Changer de promotion...", self.move_students),
+                               ("📊 Rapports des étudiants sélectionnés...", self.generate_student_report)):
+            self.register_selection_action(edit_menu.addAction(text, callback), callback)
         
         # Menu Gestion
         manage_menu = menubar.addMenu("⚙️ Gestion")
@@ -515,11 +750,23 @@ class MainWindow(QMainWindow):
         # Menu Affichage
         view_menu = menubar.addMenu("👀 Affichage")
         view_menu.addAction("🎨 Changer le thème", self.toggle_theme)
+        statistics_action = self.statistics_dock.toggleViewAction()
+        statistics_action.setText("📊 Statistiques d'inscription")
+        statistics_action.setShortcut("Ctrl+T")
+        view_menu.addAction(statistics_action)
+        
+        # Menu Débogage
+        debug_menu = menubar.addMenu("🐞 Débogage")
+        debug_menu.addAction("📈 Profil des requêtes...", self.show_query_profile)
         
         # Menu Aide
         help_menu = menubar.addMenu("❓ Aide")
         help_menu.addAction("ℹ️ À propos", self.show_about)
 
+    def show_query_profile(self):
+        dialog = QueryProfilerDialog(self)
+        dialog.exec()
+
     def setup_theme_handler(self):
         # Détecter le thème du système
         palette = QApplication.palette()
@@ -729,99 +976,149 @@ class MainWindow(QMainWindow):
         # Sauvegarder la géométrie de la fenêtre
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("windowState", self.saveState())
+        self.executor.shutdown()
+        self.db.close()
         event.accept()
 
     # Les autres méthodes restent inchangées...
     def load_data(self):
-        if self.loading_data:
-            return
-            
-        self.loading_data = True
         self.statusBar.showMessage("Chargement des données...")
         
-        try:
-            # Charger les filtres
-            self.load_filters()
-
-            # Charger les étudiants avec les filtres actuels
-            query = """
-                SELECT s.*, p.name as promotion_name, d.name as department_name, 
-                       f.name as faculty_name, p.year as promotion_year
-                FROM students s
-                JOIN promotions p ON s.promotion_id = p.id
-                JOIN departments d ON p.department_id = d.id
-                JOIN faculties f ON d.faculty_id = f.id
-                WHERE 1=1
-            """
-            params = []
-            
-            faculty_id = self.faculty_filter.currentData()
-            if faculty_id and faculty_id != -1:
-                query += " AND f.id = %s"
-                params.append(faculty_id)
+        # Les filtres et la liste sont chargés en arrière-plan
+        self.load_filters()
+        self.load_students()
+        self.load_statistics()
 
-            department_id = self.department_filter.currentData()
-            if department_id and department_id != -1:
-                query += " AND d.id = %s"
-                params.append(department_id)
-            
-            promotion_id = self.promotion_filter.currentData()
-            if promotion_id and promotion_id != -1:
-                query += " AND p.id = %s"
-                params.append(promotion_id)
-            
-            query += " ORDER BY s.last_name, s.first_name"
-            
-            students = self.db.execute_query(query, params)
-            self.model = StudentsTableModel(students)
-            self.students_table.setModel(self.model)
-            
-            # Ajuster la largeur des colonnes
+    def refresh_data(self):
+        """Recharge tout, y compris les facultés, départements et promotions"""
+        self.reference.invalidate()
+        self.load_data()
+
+    def apply_student_changes(self):
+        """Après l'ajout, la modification ou la suppression d'étudiants : ne met
+        à jour que les lignes concernées du tableau"""
+        version = self.model.change_version
+        if version is None:
+            self.load_data()
+            return
+        self.executor.submit(self.db.changes_since, version, key="listing").then(
+            self.on_student_changes,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors de l'actualisation: {str(e)}")
+        )
+
+    def on_student_changes(self, changes):
+        if changes is None:
+            # Trop de modifications : tout recharger
+            self.load_data()
+            return
+        version, students, deleted_ids = changes
+        self.model.apply_changes(version, students, deleted_ids)
+        selected_id = self.selected_student_id()
+        for student in students:
+            if student['id'] == selected_id:
+                self.display_student_details(student)
+        self.statusBar.showMessage(f"✅ {self.model.rowCount(None)} étudiant(s) affiché(s)")
+        self.load_statistics()
+
+    def load_students(self):
+        # Charger la première page des étudiants avec les filtres actuels
+        self.model = StudentsTableModel(
+            self.db, self.executor, self.current_filters(),
+            self.search_edit.text().strip(), self.student_search
+        )
+        self.model.page_loaded.connect(self.on_page_loaded)
+        self.model.load_failed.connect(self.on_load_failed)
+        self.students_table.setModel(self.model)
+        # Nouveau modèle, nouveau modèle de sélection (vide)
+        self.students_table.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.on_selection_changed()
+        self.students_table.horizontalHeader().setSortIndicator(2, Qt.AscendingOrder)
+        self.columns_sized = False
+
+    def load_statistics(self):
+        """Recalcule les effectifs si le panneau des statistiques est affiché"""
+        if not self.statistics_dock.isVisible():
+            return
+        self.executor.submit(enrollment_statistics, self.db, self.reference, key="statistics").then(
+            self.statistics_panel.set_statistics,
+            lambda e: self.statusBar.showMessage(f"❌ Erreur lors du calcul des statistiques: {e}")
+        )
+
+    def on_statistics_visibility_changed(self, visible):
+        if visible:
+            self.load_statistics()
+
+    def current_filters(self):
+        """Filtres faculté/département/promotion sélectionnés (-1 = tous)"""
+        return {
+            "faculty_id": self.faculty_filter.currentData(),
+            "department_id": self.department_filter.currentData(),
+            "promotion_id": self.promotion_filter.currentData(),
+        }
+
+    def on_page_loaded(self, count, has_more):
+        if not self.columns_sized and count:
+            # Ajuster la largeur des colonnes sur la première page
             for column in range(self.model.columnCount(None)):
                 if column == 1:  # Colonne photo
                     self.students_table.setColumnWidth(column, 60)
                 else:
                     self.students_table.resizeColumnToContents(column)
+            self.columns_sized = True
 
-            # Mettre à jour le statut
-            self.statusBar.showMessage(f"✅ {len(students)} étudiant(s) trouvé(s)")
-        
-        except Exception as e:
-            self.statusBar.showMessage(f"❌ Erreur lors du chargement: {str(e)}")
-            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des données: {str(e)}")
-        finally:
-            self.loading_data = False
+        # Mettre à jour le statut
+        if has_more:
+            self.statusBar.showMessage(f"✅ {count} étudiant(s) affiché(s) - faites défiler pour charger la suite")
+        else:
+            self.statusBar.showMessage(f"✅ {count} étudiant(s) trouvé(s)")
+
+    def on_load_failed(self, error):
+        self.statusBar.showMessage(f"❌ Erreur lors du chargement: {error}")
+        QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des données: {error}")
 
     def load_filters(self):
+        if self.reference.loaded:
+            self.on_filters_loaded(self.reference.load())
+            return
+        # Premier chargement (ou après invalidation) : une requête en arrière-plan
+        self.executor.submit(self.reference.load, key="filters").then(
+            self.on_filters_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des filtres: {str(e)}")
+        )
+
+    def on_filters_loaded(self, reference):
+        """Remplit les filtres depuis le cache : les départements suivent la
+        faculté choisie et les promotions le département (ou la faculté)"""
         # Bloquer les signaux pendant le chargement des filtres
         self.faculty_filter.blockSignals(True)
         self.department_filter.blockSignals(True)
         self.promotion_filter.blockSignals(True)
+        selected = self.current_filters()
         
         try:
             # Charger les facultés
-            faculties = self.db.execute_query("SELECT id, name FROM faculties ORDER BY name")
             self.faculty_filter.clear() 
             self.faculty_filter.addItem("🏛️ Toutes les facultés", -1)
-            for faculty in faculties:
+            for faculty in reference.faculties():
                 self.faculty_filter.addItem(f"🏛️ {faculty['name']}", faculty['id'])
+            self.faculty_filter.setCurrentIndex(max(0, self.faculty_filter.findData(selected["faculty_id"])))
+            faculty_id = self.faculty_filter.currentData()
             
             # Charger les départements
-            departments = self.db.execute_query("SELECT id, name FROM departments ORDER BY name")
             self.department_filter.clear()
             self.department_filter.addItem("📚 Tous les départements", -1)
-            for dept in departments:
+            for dept in reference.departments(faculty_id):
                 self.department_filter.addItem(f"📚 {dept['name']}", dept['id'])
+            self.department_filter.setCurrentIndex(max(0, self.department_filter.findData(selected["department_id"])))
+            department_id = self.department_filter.currentData()
             
             # Charger les promotions
-            promotions = self.db.execute_query("SELECT id, name, year FROM promotions ORDER BY year DESC, name")
             self.promotion_filter.clear()
             self.promotion_filter.addItem("🎓 Toutes les promotions", -1)
-            for promo in promotions:
+            for promo in reference.promotions(department_id, faculty_id):
                 self.promotion_filter.addItem(f"🎓 {promo['name']} ({promo['year']})", promo['id'])
+            self.promotion_filter.setCurrentIndex(max(0, self.promotion_filter.findData(selected["promotion_id"])))
         
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des filtres: {str(e)}")
         finally:
             # Réactiver les signaux
             self.faculty_filter.blockSignals(False)
@@ -829,24 +1126,40 @@ class MainWindow(QMainWindow):
             self.promotion_filter.blockSignals(False)
 
     def reset_filters(self):
+        self.search_edit.blockSignals(True)
+        self.search_edit.clear()
+        self.search_edit.blockSignals(False)
         self.faculty_filter.setCurrentIndex(0)
         self.department_filter.setCurrentIndex(0)
         self.promotion_filter.setCurrentIndex(0)
         self.load_data()
 
     def on_filter_changed(self):
-        if not self.loading_data:
-            self.load_data()
+        self.load_data()
 
-    def on_student_selected(self, index):
-        if not index.isValid():
-            return
-            
-        row = index.row()
-        if 0 <= row < len(self.model.students):
-            student = self.model.students[row]
-            self.current_student_id = student['id']
-            self.display_student_details(student)
+    def register_selection_action(self, action, callback):
+        """Rattache une action ou un bouton à la sélection : activé seulement si
+        elle convient à ``callback``"""
+        if callback in (self.view_student_details, self.edit_student):
+            self.single_selection_actions.append(action)
+        elif callback in (self.delete_student, self.move_students, self.generate_student_report):
+            self.selection_actions.append(action)
+
+    def update_selection_actions(self):
+        count = len(self.selected_student_ids())
+        for action in self.single_selection_actions:
+            action.setEnabled(count == 1)
+        for action in self.selection_actions:
+            action.setEnabled(count > 0)
+
+    def on_selection_changed(self, *args):
+        """Détails de l'étudiant sélectionné (vidés sans sélection) et actions disponibles"""
+        self.update_selection_actions()
+        student_ids = self.selected_student_ids()
+        if not student_ids:
+            self.clear_student_details()
+        elif len(student_ids) == 1:
+            self.display_student_details(self.model.students[self.model.row_of(student_ids[0])])
 
     def display_student_details(self, student):
         # Afficher la photo
@@ -873,28 +1186,35 @@ class MainWindow(QMainWindow):
         self.student_promotion.setText(f"{student['promotion_name']} ({student['promotion_year']})")
 
     def add_student(self):
-        dialog = StudentDialog(self)
+        dialog = StudentDialog(self, db=self.db, executor=self.executor)
         dialog.resize(600, 700)  # Taille fixe pour le dialogue
         if dialog.exec():
             try:
                 data = dialog.get_data()
-                result = self.db.execute_query("""
-                    INSERT INTO students (last_name, postnom, first_name, email, phone, address, 
-                                        emergency_contact, emergency_phone, registration_number, 
-                                        photo_path, promotion_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    data['last_name'], data['postnom'], data['first_name'], 
-                    data['email'], data['phone'], data['address'],
-                    data['emergency_contact'], data['emergency_phone'],
-                    data['registration_number'], data['photo_path'],
-                    data['promotion_id']
-                ))
+                with self.db.transaction():
+                    # Matricule vide : attribué par la séquence de l'année et de la faculté
+                    if data['registration_number']:
+                        note_registration_numbers(self.db, [data['registration_number']])
+                    else:
+                        data['registration_number'] = next_registration_number(self.db, data['promotion_id'])
+                    result = self.db.execute_query("""
+                        INSERT INTO students (last_name, postnom, first_name, email, phone, address, 
+                                            emergency_contact, emergency_phone, registration_number, 
+                                            photo_path, promotion_id)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                    """, (
+                        data['last_name'], data['postnom'], data['first_name'], 
+                        data['email'], data['phone'], data['address'],
+                        data['emergency_contact'], data['emergency_phone'],
+                        data['registration_number'], data['photo_path'],
+                        data['promotion_id']
+                    ))
                 
                 if result:
-                    QMessageBox.information(self, "Succès", "✅ Étudiant ajouté avec succès!")
-                    self.load_data()
+                    QMessageBox.information(self, "Succès", "✅ Étudiant ajouté avec succès!\n\n"
+                                            f"Matricule : {data['registration_number']}")
+                    self.apply_student_changes()
                 else:
                     QMessageBox.warning(self, "Erreur", "❌ Échec de l'ajout de l'étudiant")
                     
@@ -902,85 +1222,150 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de l'ajout: {str(e)}")
 
     def edit_student(self):
-        if not self.current_student_id:
+        student_id = self.selected_student_id()
+        if not student_id:
             QMessageBox.warning(self, "Avertissement", "⚠️ Veuillez sélectionner un étudiant à modifier")
             return
-            
+
+        # Récupérer les données actuelles de l'étudiant en arrière-plan
+        self.executor.submit(
+            self.db.execute_query, "SELECT * FROM students WHERE id = %s", (student_id,), key="edit"
+        ).then(
+            self.open_student_editor,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors de la modification: {str(e)}")
+        )
+
+    def open_student_editor(self, student):
+        if not student:
+            QMessageBox.warning(self, "Erreur", "❌ Étudiant non trouvé")
+            return
+
+        student = student[0]
         try:
-            # Récupérer les données actuelles de l'étudiant
-            student = self.db.execute_query("""
-                SELECT * FROM students WHERE id = %s
-            """, (self.current_student_id,))
-            
-            if not student:
-                QMessageBox.warning(self, "Erreur", "❌ Étudiant non trouvé")
-                return
-                
-            student = student[0]
-            dialog = StudentDialog(self, student)
+            dialog = StudentDialog(self, student, db=self.db, executor=self.executor)
             dialog.resize(600, 700)  # Taille fixe pour le dialogue
             
             if dialog.exec():
                 data = dialog.get_data()
-                self.db.execute_query("""
-                    UPDATE students 
-                    SET last_name = %s, postnom = %s, first_name = %s, 
-                        email = %s, phone = %s, address = %s,
-                        emergency_contact = %s, emergency_phone = %s,
-                        registration_number = %s, photo_path = %s,
-                        promotion_id = %s, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (
-                    data['last_name'], data['postnom'], data['first_name'], 
-                    data['email'], data['phone'], data['address'],
-                    data['emergency_contact'], data['emergency_phone'],
-                    data['registration_number'], data['photo_path'],
-                    data['promotion_id'], self.current_student_id
-                ))
+                with self.db.transaction():
+                    note_registration_numbers(self.db, [data['registration_number']])
+                    self.db.execute_query("""
+                        UPDATE students 
+                        SET last_name = %s, postnom = %s, first_name = %s, 
+                            email = %s, phone = %s, address = %s,
+                            emergency_contact = %s, emergency_phone = %s,
+                            registration_number = %s, photo_path = %s,
+                            promotion_id = %s, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = %s
+                    """, (
+                        data['last_name'], data['postnom'], data['first_name'], 
+                        data['email'], data['phone'], data['address'],
+                        data['emergency_contact'], data['emergency_phone'],
+                        data['registration_number'], data['photo_path'],
+                        data['promotion_id'], student['id']
+                    ))
                 
                 QMessageBox.information(self, "Succès", "✅ Étudiant modifié avec succès!")
-                self.load_data()
+                self.apply_student_changes()
                 
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la modification: {str(e)}")
 
+    def selected_student_ids(self):
+        """Ids des lignes sélectionnées, dans l'ordre de la liste"""
+        selection = self.students_table.selectionModel()
+        if selection is None:
+            return []
+        rows = sorted(index.row() for index in selection.selectedRows())
+        return [self.model.students[row]['id'] for row in rows if row < len(self.model.students)]
+
+    def selected_student_id(self):
+        """Id de l'étudiant sélectionné s'il y en a exactement un, sinon None"""
+        student_ids = self.selected_student_ids()
+        return student_ids[0] if len(student_ids) == 1 else None
+
+    def show_students_menu(self, position):
+        menu = QMenu(self)
+        count = len(self.selected_student_ids())
+        menu.addAction("👀 Détails", self.view_student_details).setEnabled(count == 1)
+        menu.addAction("✏️ Modifier", self.edit_student).setEnabled(count == 1)
+        menu.addSeparator()
+        menu.addAction(f"🎓 Changer de promotion ({count})...", self.move_students).setEnabled(count > 0)
+        menu.addAction(f"📊 Rapports ({count})...", self.generate_student_report).setEnabled(count > 0)
+        menu.addAction(f"🗑️ Supprimer ({count})", self.delete_student).setEnabled(count > 0)
+        menu.exec(self.students_table.viewport().mapToGlobal(position))
+
     def delete_student(self):
-        if not self.current_student_id:
+        student_ids = self.selected_student_ids()
+        if not student_ids:
             QMessageBox.warning(self, "Avertissement", "⚠️ Veuillez sélectionner un étudiant à supprimer")
             return
             
+        if len(student_ids) == 1:
+            question = "Êtes-vous sûr de vouloir supprimer cet étudiant ?\nCette action est irréversible."
+        else:
+            question = (f"Êtes-vous sûr de vouloir supprimer ces {len(student_ids)} étudiants ?\n"
+                        "Cette action est irréversible.")
         reply = QMessageBox.question(
-            self, "Confirmation",
-            "Êtes-vous sûr de vouloir supprimer cet étudiant ?\nCette action est irréversible.",
+            self, "Confirmation", question,
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
             try:
-                self.db.execute_query("DELETE FROM students WHERE id = %s", (self.current_student_id,))
-                QMessageBox.information(self, "Succès", "✅ Étudiant supprimé avec succès!")
-                self.current_student_id = None
-                self.clear_student_details()
-                self.load_data()
+                # Une seule requête (par lots d'ids) et un seul commit
+                deleted = self.db.execute_for_ids("DELETE FROM students WHERE id IN ({ids})", student_ids)
+                QMessageBox.information(self, "Succès", f"✅ {deleted} étudiant(s) supprimé(s) avec succès!")
+                self.students_table.clearSelection()
+                self.apply_student_changes()
             except Exception as e:
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de la suppression: {str(e)}")
 
+    def move_students(self):
+        """Affecte les étudiants sélectionnés à une autre promotion"""
+        student_ids = self.selected_student_ids()
+        if not student_ids:
+            QMessageBox.warning(self, "Avertissement", "⚠️ Veuillez sélectionner au moins un étudiant")
+            return
+
+        try:
+            promotions = self.reference.promotions()
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des promotions: {str(e)}")
+            return
+        labels = [
+            f"{promo['name']} ({promo['year']}) - {promo['faculty_name']}"
+            for promo in promotions
+        ]
+        label, ok = QInputDialog.getItem(
+            self, "Changer de promotion",
+            f"Nouvelle promotion pour {len(student_ids)} étudiant(s) :", labels, 0, False
+        )
+        if not ok:
+            return
+
+        promotion_id = promotions[labels.index(label)]['id']
+        try:
+            moved = self.db.execute_for_ids(
+                "UPDATE students SET promotion_id = %s, updated_at = CURRENT_TIMESTAMP WHERE id IN ({ids})",
+                student_ids, (promotion_id,)
+            )
+            self.statusBar.showMessage(f"✅ {moved} étudiant(s) affecté(s) à {label}")
+            self.apply_student_changes()
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du changement de promotion: {str(e)}")
+
     def view_student_details(self):
-        if not self.current_student_id:
+        student_id = self.selected_student_id()
+        if not student_id:
             QMessageBox.warning(self, "Avertissement", "⚠️ Veuillez sélectionner un étudiant")
             return
             
         try:
-            student = self.db.execute_query("""
-                SELECT s.*, p.name as promotion_name, d.name as department_name, 
-                       f.name as faculty_name, p.year as promotion_year
-                FROM students s
-                JOIN promotions p ON s.promotion_id = p.id
-                JOIN departments d ON p.department_id = d.id
-                JOIN faculties f ON d.faculty_id = f.id
-                WHERE s.id = %s
-            """, (self.current_student_id,))
+            student = self.db.execute_query(
+                "SELECT * FROM student_listing WHERE id = %s", (student_id,)
+            )
             
             if student:
                 self.display_student_details(student[0])
@@ -1001,52 +1386,173 @@ class MainWindow(QMainWindow):
         self.student_department.setText("-")
         self.student_promotion.setText("-")
 
+    def start_job(self, key, function, *args, **kwargs):
+        """Lance un traitement long en arrière-plan, un seul à la fois par clé.
+
+        Retourne la QueryFuture, ou None si le même traitement est déjà en cours.
+        """
+        if key in self.running_jobs:
+            QMessageBox.information(self, "Information", "⏳ Ce traitement est déjà en cours")
+            return None
+        self.running_jobs.add(key)
+        future = self.executor.submit(function, *args, key=key, **kwargs)
+        future.then(lambda _: self.running_jobs.discard(key), lambda _: self.running_jobs.discard(key))
+        return future
+
     def print_students_list(self):
-        try:
-            # Récupérer tous les étudiants avec leurs informations complètes
-            students = self.db.execute_query("""
-                SELECT s.*, p.name as promotion_name, d.name as department_name, 
-                       f.name as faculty_name, p.year as promotion_year
-                FROM students s
-                JOIN promotions p ON s.promotion_id = p.id
-                JOIN departments d ON p.department_id = d.id
-                JOIN faculties f ON d.faculty_id = f.id
-                ORDER BY f.name, d.name, p.name, s.last_name, s.first_name
-            """)
-            
-            if not students:
-                QMessageBox.information(self, "Information", "Aucun étudiant à imprimer")
-                return
-                
-            # Demander où sauvegarder le PDF
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "Enregistrer le PDF", 
-                f"liste_etudiants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                "PDF Files (*.pdf)"
+        if "print" in self.running_jobs:
+            QMessageBox.information(self, "Information", "⏳ Ce traitement est déjà en cours")
+            return
+        # Imprimer ce que la liste affiche : filtres et recherche en cours
+        filters = self.current_filters()
+        search = self.search_edit.text().strip()
+        self.executor.submit(self.has_students, filters, search, key="print_check").then(
+            lambda found: self.on_print_checked(found, filters, search),
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du PDF: {str(e)}")
+        )
+
+    def has_students(self, filters, search):
+        """Vrai si la liste (filtres et recherche) contient au moins un étudiant"""
+        if search:
+            return bool(self.student_search.search(search, limit=1, **filters))
+        return bool(self.db.fetch_students_page(limit=1, **filters))
+
+    def on_print_checked(self, found, filters, search):
+        if not found:
+            QMessageBox.information(self, "Information", "Aucun étudiant à imprimer")
+            return
+
+        # Demander où sauvegarder le PDF
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Enregistrer le PDF", 
+            f"liste_etudiants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            "PDF Files (*.pdf)"
+        )
+        if not file_path:
+            return
+
+        def generate():
+            # Parcourir les étudiants par lots au lieu de tout charger en mémoire
+            batches = student_batches(
+                self.db, filters, search, self.student_search,
+                order_by="s.faculty_name, s.department_name, s.promotion_name, s.last_name, s.first_name"
             )
-            
-            if file_path:
-                self.pdf_generator.generate_students_list(students, file_path)
-                QMessageBox.information(self, "Succès", f"✅ PDF généré avec succès!\n{file_path}")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du PDF: {str(e)}")
+            self.pdf_generator.generate_students_list(chain.from_iterable(batches), file_path)
+
+        future = self.start_job("print", generate)
+        if future is None:
+            return
+        self.statusBar.showMessage("🖨️ Génération du PDF en cours...")
+        future.then(
+            lambda _: self.on_print_finished(file_path),
+            lambda e: self.on_job_failed("❌ Échec de la génération du PDF",
+                                         f"Erreur lors de la génération du PDF: {str(e)}")
+        )
+
+    def on_print_finished(self, file_path):
+        self.statusBar.showMessage(f"✅ PDF généré : {file_path}")
+        QMessageBox.information(self, "Succès", f"✅ PDF généré avec succès!\n{file_path}")
+
+    def on_job_failed(self, status, message):
+        self.statusBar.showMessage(status)
+        QMessageBox.critical(self, "Erreur", message)
+
+    def import_students(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Importer des étudiants", "",
+            "Fichiers d'étudiants (*.csv *.xlsx);;CSV (*.csv);;Excel (*.xlsx)"
+        )
+        if not file_path:
+            return
+
+        def show_progress(rows):
+            # Appelé depuis le thread de travail : passer par le signal
+            self.progress_message.emit(f"📥 Import en cours : {rows} ligne(s) traitée(s)...")
+
+        future = self.start_job("import", StudentImporter(self.db).import_file, file_path, progress=show_progress)
+        if future is None:
+            return
+        self.statusBar.showMessage("📥 Import en cours...")
+        future.then(
+            self.on_import_finished,
+            lambda e: self.on_job_failed("❌ Échec de l'import", f"Erreur lors de l'import: {str(e)}")
+        )
+
+    def on_import_finished(self, report):
+        self.statusBar.showMessage(f"✅ {report.summary()}")
+        message = QMessageBox(self)
+        message.setWindowTitle("Import terminé")
+        if report.errors:
+            message.setIcon(QMessageBox.Warning)
+            message.setText(f"⚠️ {report.summary()}")
+            message.setDetailedText("\n".join(f"Ligne {line}: {error}" for line, error in report.errors))
+        else:
+            message.setIcon(QMessageBox.Information)
+            message.setText(f"✅ {report.summary()}")
+        message.exec()
+        self.load_data()
+
+    def export_students(self):
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Exporter la liste des étudiants",
+            f"etudiants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            "CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not file_path:
+            return
+        if "jsonl" in selected_filter and not file_path.lower().endswith(".jsonl"):
+            file_path += ".jsonl"
+
+        def show_progress(rows):
+            # Appelé depuis le thread de travail : passer par le signal
+            self.progress_message.emit(f"📤 Export en cours : {rows} étudiant(s) écrit(s)...")
+
+        # Exporter ce que la liste affiche : filtres et recherche en cours
+        future = self.start_job(
+            "export", export_students, self.db, file_path, self.current_filters(), progress=show_progress,
+            search=self.search_edit.text().strip(), search_engine=self.student_search
+        )
+        if future is None:
+            return
+        self.statusBar.showMessage("📤 Export en cours...")
+        future.then(
+            lambda count: self.statusBar.showMessage(f"✅ {count} étudiant(s) exporté(s) vers {file_path}"),
+            lambda e: self.on_job_failed("❌ Échec de l'export", f"Erreur lors de l'export: {str(e)}")
+        )
+
+    def backup_data(self):
+        os.makedirs(DEFAULT_DESTINATION, exist_ok=True)
+        destination = QFileDialog.getExistingDirectory(self, "Dossier des sauvegardes", DEFAULT_DESTINATION)
+        if not destination:
+            return
+
+        # Copie par pas en arrière-plan : l'application reste utilisable
+        future = self.start_job("backup", create_backup, destination, db_engine=self.db.db_engine)
+        if future is None:
+            return
+        self.statusBar.showMessage("💾 Sauvegarde en cours...")
+        future.then(
+            self.on_backup_finished,
+            lambda e: self.on_job_failed("❌ Échec de la sauvegarde", f"Erreur lors de la sauvegarde: {str(e)}")
+        )
+
+    def on_backup_finished(self, report):
+        self.statusBar.showMessage(f"✅ Sauvegarde créée : {report.path}")
+        QMessageBox.information(self, "Succès", f"✅ Sauvegarde terminée!\n\n{report.summary()}")
 
     def generate_student_report(self):
-        if not self.current_student_id:
+        student_ids = self.selected_student_ids()
+        if not student_ids:
             QMessageBox.warning(self, "Avertissement", "⚠️ Veuillez sélectionner un étudiant")
             return
+        if len(student_ids) > 1:
+            self.generate_student_reports(student_ids)
+            return
             
         try:
-            student = self.db.execute_query("""
-                SELECT s.*, p.name as promotion_name, d.name as department_name, 
-                       f.name as faculty_name, p.year as promotion_year
-                FROM students s
-                JOIN promotions p ON s.promotion_id = p.id
-                JOIN departments d ON p.department_id = d.id
-                JOIN faculties f ON d.faculty_id = f.id
-                WHERE s.id = %s
-            """, (self.current_student_id,))
+            student = self.db.execute_query(
+                "SELECT * FROM student_listing WHERE id = %s", (student_ids[0],), use_read_pool=True
+            )
             
             if student:
                 # Demander où sauvegarder le PDF
@@ -1063,20 +1569,48 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du rapport: {str(e)}")
 
+    def generate_student_reports(self, student_ids):
+        """Un rapport par étudiant sélectionné, générés en arrière-plan dans un dossier"""
+        output_dir = QFileDialog.getExistingDirectory(self, f"Dossier des {len(student_ids)} rapports")
+        if not output_dir:
+            return
+
+        def generate():
+            # Une seule lecture pour tous les étudiants, puis les PDF
+            students = self.db.students_by_ids(student_ids, use_read_pool=True)
+            return self.pdf_generator.generate_student_reports(students, output_dir)
+
+        future = self.start_job("reports", generate)
+        if future is None:
+            return
+        self.statusBar.showMessage(f"Génération de {len(student_ids)} rapport(s)...")
+        future.then(
+            lambda paths: self.on_reports_finished(paths, output_dir),
+            lambda e: self.on_job_failed("❌ Échec de la génération des rapports",
+                                         f"Erreur lors de la génération des rapports: {str(e)}")
+        )
+
+    def on_reports_finished(self, paths, output_dir):
+        self.statusBar.showMessage(f"✅ {len(paths)} rapport(s) généré(s) dans {output_dir}")
+        QMessageBox.information(self, "Succès", f"✅ {len(paths)} rapport(s) généré(s) avec succès!\n{output_dir}")
+
     def manage_faculties(self):
-        dialog = FacultyDialog(self)
+        dialog = FacultyDialog(self, db=self.db, executor=self.executor)
         dialog.exec()
-        self.load_filters()
+        if dialog.modified:
+            self.load_data()
 
     def manage_departments(self):
-        dialog = DepartmentDialog(self)
+        dialog = DepartmentDialog(self, db=self.db, executor=self.executor)
         dialog.exec()
-        self.load_filters()
+        if dialog.modified:
+            self.load_data()
 
     def manage_promotions(self):
-        dialog = PromotionDialog(self)
+        dialog = PromotionDialog(self, db=self.db, executor=self.executor)
         dialog.exec()
-        self.load_filters()
+        if dialog.modified:
+            self.load_data()
 
     def show_about(self):
         QMessageBox.about(self, "À propos", 
@@ -3,11 +3,18 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
                                QHeaderView, QGroupBox, QComboBox, QSpinBox)
 from PySide6.QtCore import Qt, QAbstractTableModel
 from database import Database
+from query_executor import get_query_executor
+from reference_cache import get_reference_cache
+from academic_rollover import preview_rollover, run_rollover
 
 class PromotionDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db=None, executor=None):
         super().__init__(parent)
-        self.db = Database()
+        self.db = db or Database()
+        self.executor = executor or get_query_executor()
+        self.reference = get_reference_cache(self.db)
+        self.modified = False
+        self.reference_data = None
         self.setup_ui()
         self.load_data()
 
@@ -48,9 +55,11 @@ class PromotionDialog(QDialog):
         # Boutons
         button_layout = QHBoxLayout()
         self.delete_button = QPushButton("Supprimer")
+        self.rollover_button = QPushButton("Passage à l'année suivante...")
         self.close_button = QPushButton("Fermer")
 
         button_layout.addWidget(self.delete_button)
+        button_layout.addWidget(self.rollover_button)
         button_layout.addWidget(self.close_button)
 
         layout.addLayout(button_layout)
@@ -60,15 +69,22 @@ class PromotionDialog(QDialog):
         # Connexions
         self.add_button.clicked.connect(self.add_promotion)
         self.delete_button.clicked.connect(self.delete_promotion)
+        self.rollover_button.clicked.connect(self.preview_rollover)
         self.close_button.clicked.connect(self.accept)
 
         # Charger les facultés
         self.load_faculties()
 
     def load_faculties(self):
-        faculties = self.db.execute_query("SELECT id, name FROM faculties ORDER BY name")
+        self.executor.submit(self.reference.load, key=(id(self), "faculties")).then(
+            self.on_faculties_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        )
+
+    def on_faculties_loaded(self, reference):
+        self.reference_data = reference
         self.faculty_combo.clear()
-        for faculty in faculties:
+        for faculty in reference.faculties():
             self.faculty_combo.addItem(faculty['name'], faculty['id'])
 
     def load_departments(self):
@@ -76,22 +92,17 @@ class PromotionDialog(QDialog):
         self.department_combo.clear()
         
         if faculty_id:
-            departments = self.db.execute_query(
-                "SELECT id, name FROM departments WHERE faculty_id = %s ORDER BY name",
-                (faculty_id,)
-            )
-            for department in departments:
+            for department in self.reference_data.departments(faculty_id):
                 self.department_combo.addItem(department['name'], department['id'])
 
     def load_data(self):
-        promotions = self.db.execute_query("""
-            SELECT p.id, p.name, p.year, d.name as department_name, f.name as faculty_name 
-            FROM promotions p 
-            JOIN departments d ON p.department_id = d.id 
-            JOIN faculties f ON d.faculty_id = f.id 
-            ORDER BY p.year DESC, p.name
-        """)
-        self.model = PromotionsTableModel(promotions)
+        self.executor.submit(self.reference.load, key=(id(self), "table")).then(
+            self.on_data_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        )
+
+    def on_data_loaded(self, reference):
+        self.model = PromotionsTableModel(reference.promotions())
         self.promotions_table.setModel(self.model)
         self.promotions_table.resizeColumnsToContents()
 
@@ -109,6 +120,8 @@ class PromotionDialog(QDialog):
                 "INSERT INTO promotions (name, year, department_id) VALUES (%s, %s, %s)",
                 (name, year, department_id)
             )
+            self.reference.invalidate()
+            self.modified = True
             self.load_data()
             self.name_edit.clear()
             QMessageBox.information(self, "Succès", "Promotion ajoutée avec succès!")
@@ -129,11 +142,44 @@ class PromotionDialog(QDialog):
         if reply == QMessageBox.Yes:
             try:
                 self.db.execute_query("DELETE FROM promotions WHERE id = %s", (promotion_id,))
+                self.reference.invalidate()
+                self.modified = True
                 self.load_data()
                 QMessageBox.information(self, "Succès", "Promotion supprimée avec succès!")
             except Exception as e:
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de la suppression: {str(e)}")
 
+    def preview_rollover(self):
+        """Simulation du passage à l'année suivante, puis confirmation"""
+        self.rollover_button.setEnabled(False)
+        self.executor.submit(preview_rollover, self.db, key=(id(self), "rollover")).then(
+            self.confirm_rollover,
+            self.on_rollover_failed
+        )
+
+    def confirm_rollover(self, plan):
+        reply = QMessageBox.question(self, "Passage à l'année suivante",
+                                     f"{plan.summary()}\n\nConfirmer le passage à l'année {plan.to_year}?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            self.rollover_button.setEnabled(True)
+            return
+        self.executor.submit(run_rollover, self.db, plan.from_year, key=(id(self), "rollover")).then(
+            self.on_rollover_finished,
+            self.on_rollover_failed
+        )
+
+    def on_rollover_finished(self, plan):
+        self.rollover_button.setEnabled(True)
+        self.reference.invalidate()
+        self.modified = True
+        self.load_data()
+        QMessageBox.information(self, "Succès", f"Passage à l'année {plan.to_year} effectué!\n\n{plan.summary()}")
+
+    def on_rollover_failed(self, error):
+        self.rollover_button.setEnabled(True)
+        QMessageBox.critical(self, "Erreur", f"Erreur lors du passage à l'année suivante: {str(error)}")
+
 class PromotionsTableModel(QAbstractTableModel):
     def __init__(self, promotions):
         super().__init__()
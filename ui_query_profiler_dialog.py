@@ -0,0 +1,110 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTabWidget, QTableView, QHeaderView, QAbstractItemView,
+                               QPlainTextEdit, QSplitter)
+from PySide6.QtCore import Qt
+from query_profiler import get_profiler
+from ui_statistics_panel import StatisticsTableModel
+
+
+class QueryProfilerDialog(QDialog):
+    """Requêtes les plus coûteuses et journal des requêtes lentes (voir query_profiler.py)"""
+
+    TOP_HEADERS = ["Requête", "Exécutions", "Total (ms)", "Moyenne (ms)", "p95 (ms)", "Max (ms)", "Lignes"]
+    SLOW_HEADERS = ["Heure", "Durée (ms)", "Lignes", "Requête"]
+
+    def __init__(self, parent=None, profiler=None):
+        super().__init__(parent)
+        self.profiler = profiler or get_profiler()
+        self.slow_queries = []
+        self.setup_ui()
+        self.load_data()
+
+    def setup_ui(self):
+        self.setWindowTitle("Profil des requêtes")
+        self.setMinimumSize(900, 500)
+
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.top_table = self.create_table()
+        self.tabs.addTab(self.top_table, "📈 Requêtes les plus coûteuses")
+
+        splitter = QSplitter(Qt.Vertical)
+        self.slow_table = self.create_table()
+        self.slow_details = QPlainTextEdit()
+        self.slow_details.setReadOnly(True)
+        splitter.addWidget(self.slow_table)
+        splitter.addWidget(self.slow_details)
+        self.tabs.addTab(splitter, "🐢 Requêtes lentes")
+        layout.addWidget(self.tabs)
+
+        button_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("🔄 Actualiser")
+        self.reset_button = QPushButton("♻️ Réinitialiser")
+        self.close_button = QPushButton("Fermer")
+        button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+        self.refresh_button.clicked.connect(self.load_data)
+        self.reset_button.clicked.connect(self.reset)
+        self.close_button.clicked.connect(self.accept)
+
+    def create_table(self):
+        table = QTableView()
+        table.setAlternatingRowColors(True)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def load_data(self):
+        all_stats = self.profiler.top(limit=None)
+        top = all_stats[:50]
+        self.top_table.setModel(StatisticsTableModel(self.TOP_HEADERS, [
+            (stats.fingerprint, stats.count, round(stats.total_ms, 1), round(stats.average_ms, 2),
+             round(stats.percentile_ms(95), 1), round(stats.max_ms, 1), stats.rows)
+            for stats in top
+        ]))
+        # Largeur fixe pour la requête : les colonnes de mesures restent visibles
+        self.top_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.top_table.setColumnWidth(0, 420)
+
+        self.slow_queries = list(reversed(self.profiler.slow_queries))
+        self.slow_table.setModel(StatisticsTableModel(self.SLOW_HEADERS, [
+            (f"{entry['time']:%H:%M:%S}", round(entry['elapsed_ms'], 1), entry['rows'], entry['sql'])
+            for entry in self.slow_queries
+        ]))
+        self.slow_table.selectionModel().currentRowChanged.connect(self.show_slow_query)
+        self.slow_details.clear()
+
+        if self.profiler.enabled:
+            executions = sum(stats.count for stats in all_stats)
+            self.summary_label.setText(
+                f"{executions} exécution(s), {len(all_stats)} requête(s) distincte(s) — "
+                f"seuil de lenteur : {self.profiler.slow_ms:.0f} ms"
+                f"{' (avec plan)' if self.profiler.explain else ''}"
+            )
+        else:
+            self.summary_label.setText("Mesure désactivée (DB_PROFILE=0)")
+
+    def show_slow_query(self, current, previous):
+        if not current.isValid():
+            return
+        entry = self.slow_queries[current.row()]
+        lines = [entry['sql'], "", f"Paramètres : {entry['params']!r}"]
+        if entry['plan']:
+            lines += ["", "Plan d'exécution :"] + [f"  {line}" for line in entry['plan']]
+        self.slow_details.setPlainText("\n".join(lines))
+
+    def reset(self):
+        self.profiler.reset()
+        self.load_data()
@@ -0,0 +1,75 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTabWidget, QTableView,
+                               QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt, QAbstractTableModel
+from PySide6.QtGui import QFont
+
+
+class StatisticsPanel(QWidget):
+    """Tableau de bord des effectifs (voir enrollment_stats.py)"""
+
+    TABS = [
+        ("🏛️ Facultés", "by_faculty", ["Faculté", "Étudiants"]),
+        ("📚 Départements", "by_department", ["Faculté", "Département", "Étudiants"]),
+        ("🎓 Promotions", "by_promotion", ["Faculté", "Département", "Promotion", "Année", "Étudiants"]),
+        ("📅 Années", "by_year", ["Année", "Étudiants"]),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+
+        self.total_label = QLabel("Total : -")
+        font = QFont()
+        font.setBold(True)
+        self.total_label.setFont(font)
+        layout.addWidget(self.total_label)
+
+        self.tabs = QTabWidget()
+        self.tables = {}
+        for title, attribute, headers in self.TABS:
+            table = QTableView()
+            table.setAlternatingRowColors(True)
+            table.setSelectionBehavior(QAbstractItemView.SelectRows)
+            table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+            table.verticalHeader().setVisible(False)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+            table.horizontalHeader().setStretchLastSection(True)
+            table.setModel(StatisticsTableModel(headers, []))
+            self.tabs.addTab(table, title)
+            self.tables[attribute] = table
+        layout.addWidget(self.tabs)
+
+    def set_statistics(self, stats):
+        self.total_label.setText(f"Total : {stats.total} étudiant(s)")
+        for _, attribute, headers in self.TABS:
+            self.tables[attribute].setModel(StatisticsTableModel(headers, getattr(stats, attribute)))
+
+
+class StatisticsTableModel(QAbstractTableModel):
+    def __init__(self, headers, rows):
+        super().__init__()
+        self.headers = headers
+        self.rows = rows
+
+    def rowCount(self, parent):
+        return len(self.rows)
+
+    def columnCount(self, parent):
+        return len(self.headers)
+
+    def data(self, index, role):
+        if role == Qt.DisplayRole:
+            return self.rows[index.row()][index.column()]
+        elif role == Qt.TextAlignmentRole:
+            # Nombres (année, effectif, durée) centrés
+            if isinstance(self.rows[index.row()][index.column()], (int, float)):
+                return Qt.AlignCenter
+            return Qt.AlignLeft | Qt.AlignVCenter
+
+    def headerData(self, section, orientation, role):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
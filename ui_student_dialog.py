@@ -4,16 +4,21 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QPixmap, QFont, QIcon, QPainter, QColor, QPalette
 from database import Database
+from query_executor import get_query_executor
+from reference_cache import get_reference_cache
 from models import Student
 from image_utils import ImageUtils
 
 class StudentDialog(QDialog):
     theme_changed = Signal(str)
     
-    def __init__(self, parent=None, student=None):
+    def __init__(self, parent=None, student=None, db=None, executor=None):
         super().__init__(parent)
         self.student = student
-        self.db = Database()
+        self.db = db or Database()
+        self.executor = executor or get_query_executor()
+        self.reference = get_reference_cache(self.db)
+        self.reference_data = None
         self.photo_path = None
         self.current_theme = "dark"  # Thème par défaut
         self.setup_ui()
@@ -107,15 +112,19 @@ class StudentDialog(QDialog):
         self.phone_edit.setClearButtonEnabled(True)
         
         self.registration_edit = QLineEdit()
-        self.registration_edit.setPlaceholderText("MAT2025001")
         self.registration_edit.setClearButtonEnabled(True)
+        if self.student:
+            self.registration_edit.setPlaceholderText("MAT2025-002-00001")
+        else:
+            # Laissé vide, le matricule est attribué à l'enregistrement
+            self.registration_edit.setPlaceholderText("Attribué automatiquement")
         
         personal_layout.addRow("Nom *:", self.last_name_edit)
         personal_layout.addRow("Postnom *:", self.postnom_edit)
         personal_layout.addRow("Prénom *:", self.first_name_edit)
         personal_layout.addRow("Email:", self.email_edit)
         personal_layout.addRow("Téléphone:", self.phone_edit)
-        personal_layout.addRow("Matricule *:", self.registration_edit)
+        personal_layout.addRow("Matricule *:" if self.student else "Matricule:", self.registration_edit)
         
         layout.addWidget(personal_group)
 
@@ -461,117 +470,95 @@ class StudentDialog(QDialog):
         self.setStyleSheet(style)
 
     def load_data(self):
-        try:
-            # Charger les facultés
-            faculties = self.db.execute_query("SELECT id, name FROM faculties ORDER BY name")
-            self.faculty_combo.clear()
-            self.faculty_combo.addItem("🏛️ Sélectionnez une faculté", -1)
-            for faculty in faculties:
-                self.faculty_combo.addItem(f"🏛️ {faculty['name']}", faculty['id'])
-            
-            # Charger les départements et promotions si un étudiant est fourni
-            if self.student:
-                self.load_student_academic_data()
-            else:
-                # Initialiser les combobox vides
-                self.department_combo.addItem("📚 Sélectionnez d'abord une faculté", -1)
-                self.promotion_combo.addItem("🎓 Sélectionnez d'abord un département", -1)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        # Les listes viennent du cache de référence (requête en arrière-plan s'il est vide)
+        self.faculty_combo.clear()
+        self.faculty_combo.addItem("⏳ Chargement...", -1)
+        self.department_combo.clear()
+        self.promotion_combo.clear()
+        self.executor.submit(self.reference.load, key=(id(self), "reference")).then(
+            self.on_reference_loaded,
+            lambda e: QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+        )
+
+    def on_reference_loaded(self, reference):
+        self.reference_data = reference
+        self.faculty_combo.blockSignals(True)
+        self.faculty_combo.clear()
+        self.faculty_combo.addItem("🏛️ Sélectionnez une faculté", -1)
+        for faculty in reference.faculties():
+            self.faculty_combo.addItem(f"🏛️ {faculty['name']}", faculty['id'])
+        self.faculty_combo.blockSignals(False)
+        
+        # Charger les départements et promotions si un étudiant est fourni
+        if self.student:
+            self.load_student_academic_data()
+        else:
+            # Initialiser les combobox vides
+            self.department_combo.addItem("📚 Sélectionnez d'abord une faculté", -1)
+            self.promotion_combo.addItem("🎓 Sélectionnez d'abord un département", -1)
 
     # Les autres méthodes restent inchangées...
     def load_student_academic_data(self):
         """Charge les données académiques de l'étudiant existant"""
+        promotion = self.reference_data.promotion(self.student['promotion_id'])
+        if not promotion:
+            return
+        
+        # Remplir sans déclencher le rechargement en cascade des listes
+        for combo in (self.faculty_combo, self.department_combo, self.promotion_combo):
+            combo.blockSignals(True)
         try:
-            promotion_info = self.db.execute_query("""
-                SELECT p.id as promotion_id, p.department_id, d.faculty_id 
-                FROM promotions p 
-                JOIN departments d ON p.department_id = d.id 
-                WHERE p.id = %s
-            """, (self.student['promotion_id'],))
+            faculty_index = self.faculty_combo.findData(promotion['faculty_id'])
+            if faculty_index >= 0:
+                self.faculty_combo.setCurrentIndex(faculty_index)
+            self.fill_departments(promotion['faculty_id'])
+            
+            department_index = self.department_combo.findData(promotion['department_id'])
+            if department_index >= 0:
+                self.department_combo.setCurrentIndex(department_index)
+            self.fill_promotions(promotion['department_id'])
             
-            if promotion_info:
-                faculty_id = promotion_info[0]['faculty_id']
-                department_id = promotion_info[0]['department_id']
-                
-                # Charger les départements pour cette faculté
-                departments = self.db.execute_query(
-                    "SELECT id, name FROM departments WHERE faculty_id = %s ORDER BY name",
-                    (faculty_id,)
-                )
-                
-                self.department_combo.clear()
-                self.department_combo.addItem("📚 Sélectionnez un département", -1)
-                for dept in departments:
-                    self.department_combo.addItem(f"📚 {dept['name']}", dept['id'])
-                
-                # Charger les promotions pour ce département
-                promotions = self.db.execute_query(
-                    "SELECT id, name, year FROM promotions WHERE department_id = %s ORDER BY year DESC, name",
-                    (department_id,)
-                )
-                
-                self.promotion_combo.clear()
-                self.promotion_combo.addItem("🎓 Sélectionnez une promotion", -1)
-                for promo in promotions:
-                    self.promotion_combo.addItem(f"🎓 {promo['name']} ({promo['year']})", promo['id'])
-                
-                # Sélectionner les valeurs
-                faculty_index = self.faculty_combo.findData(faculty_id)
-                if faculty_index >= 0:
-                    self.faculty_combo.setCurrentIndex(faculty_index)
-                
-                department_index = self.department_combo.findData(department_id)
-                if department_index >= 0:
-                    self.department_combo.setCurrentIndex(department_index)
-                
-                promotion_index = self.promotion_combo.findData(self.student['promotion_id'])
-                if promotion_index >= 0:
-                    self.promotion_combo.setCurrentIndex(promotion_index)
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur académique: {str(e)}")
+            promotion_index = self.promotion_combo.findData(promotion['id'])
+            if promotion_index >= 0:
+                self.promotion_combo.setCurrentIndex(promotion_index)
+        finally:
+            for combo in (self.faculty_combo, self.department_combo, self.promotion_combo):
+                combo.blockSignals(False)
 
     def load_departments(self):
         faculty_id = self.faculty_combo.currentData()
-        self.department_combo.clear()
+        self.promotion_combo.clear()
+        self.promotion_combo.addItem("🎓 Sélectionnez d'abord un département", -1)
         
         if faculty_id and faculty_id != -1:
-            try:
-                departments = self.db.execute_query(
-                    "SELECT id, name FROM departments WHERE faculty_id = %s ORDER BY name",
-                    (faculty_id,)
-                )
-                self.department_combo.addItem("📚 Sélectionnez un département", -1)
-                for dept in departments:
-                    self.department_combo.addItem(f"📚 {dept['name']}", dept['id'])
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur départements: {str(e)}")
+            self.department_combo.blockSignals(True)
+            self.fill_departments(faculty_id)
+            self.department_combo.blockSignals(False)
         else:
+            self.department_combo.clear()
             self.department_combo.addItem("📚 Sélectionnez d'abord une faculté", -1)
-        
-        self.promotion_combo.clear()
-        self.promotion_combo.addItem("🎓 Sélectionnez d'abord un département", -1)
+
+    def fill_departments(self, faculty_id):
+        self.department_combo.clear()
+        self.department_combo.addItem("📚 Sélectionnez un département", -1)
+        for dept in self.reference_data.departments(faculty_id):
+            self.department_combo.addItem(f"📚 {dept['name']}", dept['id'])
 
     def load_promotions(self):
         department_id = self.department_combo.currentData()
-        self.promotion_combo.clear()
         
         if department_id and department_id != -1:
-            try:
-                promotions = self.db.execute_query(
-                    "SELECT id, name, year FROM promotions WHERE department_id = %s ORDER BY year DESC, name",
-                    (department_id,)
-                )
-                self.promotion_combo.addItem("🎓 Sélectionnez une promotion", -1)
-                for promo in promotions:
-                    self.promotion_combo.addItem(f"🎓 {promo['name']} ({promo['year']})", promo['id'])
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur promotions: {str(e)}")
+            self.fill_promotions(department_id)
         else:
+            self.promotion_combo.clear()
             self.promotion_combo.addItem("🎓 Sélectionnez d'abord un département", -1)
 
+    def fill_promotions(self, department_id):
+        self.promotion_combo.clear()
+        self.promotion_combo.addItem("🎓 Sélectionnez une promotion", -1)
+        for promo in self.reference_data.promotions(department_id):
+            self.promotion_combo.addItem(f"🎓 {promo['name']} ({promo['year']})", promo['id'])
+
     def select_photo(self, event=None):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Sélectionner une photo", 
@@ -647,7 +634,7 @@ class StudentDialog(QDialog):
             errors.append("Le postnom est obligatoire")
         if not data['first_name']:
             errors.append("Le prénom est obligatoire")
-        if not data['registration_number']:
+        if self.student and not data['registration_number']:
             errors.append("Le matricule est obligatoire")
         
         promotion_id = data['promotion_id']